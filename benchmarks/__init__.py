@@ -0,0 +1,3 @@
+"""
+Benchmarks for the calculator's hot paths. Run with 'python -m benchmarks'.
+"""
@@ -0,0 +1,309 @@
+"""
+Benchmark Harness
+
+This module measures throughput and latency percentiles of the calculator's hot
+paths at increasing scales, writes the results to JSON and compares them with a
+stored baseline so regressions are caught before deployment.
+
+Each case runs its operation `operations` times. Throughput is taken from the
+untimed loop, so the per-call cost of reading the clock is not added to it.
+Latency percentiles come from a sample of individually timed calls (at most
+MAX_LATENCY_SAMPLES per run, spread evenly), so memory stays flat even at 1e7
+operations.
+
+Usage:
+    python -m benchmarks --scales 1e3 1e4 1e5 --output benchmarks/results.json
+    python -m benchmarks --baseline benchmarks/baseline.json   # exits 1 on regressions
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from array import array
+from collections import namedtuple
+from decimal import Decimal
+from itertools import cycle
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from calculator import Calculator
+from calculator import cache as cache_module, scheduler as scheduler_module
+from calculator.cache import configure_cache
+from calculator.calculations import calculations
+from calculator.command import BUILTIN_COMMANDS
+from calculator.history import DEFAULT_HISTORY_CAPACITY, RingBufferHistory
+from calculator.operations import add, divide, multiply, subtract
+from calculator.scheduler import configure_scheduler
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+MAX_LATENCY_SAMPLES = 10_000
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_REPEAT = 3
+HISTORY_FILTER_CALLS = 100
+OPERAND_POOL = 1024
+
+Case = namedtuple("Case", ["name", "description", "prepare"])
+Result = namedtuple("Result", ["case", "scale", "operations", "seconds", "throughput", "p50_us", "p99_us"])
+Regression = namedtuple("Regression", ["case", "scale", "metric", "baseline", "current", "change"])
+
+OPERATIONS = {"add": add, "subtract": subtract, "multiply": multiply, "divide": divide}
+
+
+def _operands(seed: int = 1) -> List[Tuple[str, Decimal, Decimal]]:
+    """A fixed pool of (operation, a, b) triples cycled through by every case."""
+    rng = random.Random(seed)
+    names = list(OPERATIONS)
+    return [(names[index % len(names)], Decimal(f"{rng.uniform(-1e6, 1e6):.4f}"),
+             Decimal(f"{rng.uniform(1, 1e6):.4f}")) for index in range(OPERAND_POOL)]
+
+
+@contextlib.contextmanager
+def _display_case(scale: int) -> Iterator[Tuple[Callable[[int], object], int]]:
+    """perform_calculation_and_display end to end, inline, with output discarded."""
+    from main import perform_calculation_and_display  # pylint: disable=import-outside-toplevel
+    pool = [(name, str(a), str(b)) for name, a, b in _operands()]
+    # The shared scheduler and cache are put back exactly as the caller configured them
+    saved = scheduler_module._scheduler, cache_module._cache  # pylint: disable=protected-access
+    configure_scheduler("inline")
+    configure_cache(False)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+            yield lambda index: perform_calculation_and_display(pool[index % OPERAND_POOL][1],
+                                                                pool[index % OPERAND_POOL][2],
+                                                                pool[index % OPERAND_POOL][0]), scale
+    finally:
+        scheduler_module._scheduler, cache_module._cache = saved  # pylint: disable=protected-access
+
+
+@contextlib.contextmanager
+def _execute_case(scale: int):
+    """Command construction plus Command.execute, bypassing the scheduler."""
+    pool = [(BUILTIN_COMMANDS[name], a, b) for name, a, b in _operands()]
+
+    def run(index):
+        command_class, a, b = pool[index % OPERAND_POOL]
+        return command_class(a, b).execute()
+    yield run, scale
+
+
+@contextlib.contextmanager
+def _history(capacity: int):
+    """Swap in a fresh history store for the duration of a case."""
+    previous = calculations.history
+    calculations.use_store(RingBufferHistory(capacity))
+    try:
+        yield
+    finally:
+        calculations.use_store(previous)
+
+
+@contextlib.contextmanager
+def _perform_case(scale: int):
+    """Calculator.perform, which records every calculation in the history."""
+    pool = [(OPERATIONS[name], a, b) for name, a, b in _operands()]
+
+    def run(index):
+        operation, a, b = pool[index % OPERAND_POOL]
+        return Calculator.perform(a, b, operation)
+    with _history(DEFAULT_HISTORY_CAPACITY):
+        yield run, scale
+
+
+@contextlib.contextmanager
+def _filled_history(scale: int):
+    """A fresh history holding `scale` calculations (up to its capacity)."""
+    capacity = min(scale, DEFAULT_HISTORY_CAPACITY)
+    with _history(capacity):
+        for _, (name, a, b) in zip(range(capacity), cycle(_operands())):
+            Calculator.perform(a, b, OPERATIONS[name])
+        yield
+
+
+@contextlib.contextmanager
+def _latest_case(scale: int):
+    """calculations.get_latest on a history holding `scale` entries (up to its capacity)."""
+    with _filled_history(scale):
+        yield lambda index: calculations.get_latest(), scale
+
+
+@contextlib.contextmanager
+def _filter_case(scale: int):
+    """calculations.filter_with_operation on a history holding `scale` entries (up to its capacity)."""
+    names = list(OPERATIONS)
+    with _filled_history(scale):
+        yield lambda index: calculations.filter_with_operation(names[index % len(names)]), HISTORY_FILTER_CALLS
+
+
+CASES: Dict[str, Case] = {case.name: case for case in (
+    Case("display", "perform_calculation_and_display, inline scheduler, output discarded", _display_case),
+    Case("execute", "Command(a, b).execute() for the builtin commands", _execute_case),
+    Case("perform", "Calculator.perform, including history recording", _perform_case),
+    Case("history_latest", "calculations.get_latest on a filled history", _latest_case),
+    Case("history_filter", f"{HISTORY_FILTER_CALLS} calculations.filter_with_operation calls on a filled history",
+         _filter_case),
+)}
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def measure(operation: Callable[[int], object], count: int) -> Tuple[float, List[float]]:
+    """
+    Run an operation `count` times.
+
+    Returns:
+        Tuple[float, List[float]]: Total seconds, and the sorted latencies (seconds) of the sampled calls.
+    """
+    stride = max(1, count // MAX_LATENCY_SAMPLES)
+    latencies = array("d")
+    clock = time.perf_counter
+    started = clock()
+    for block in range(0, count, stride):
+        sample_started = clock()
+        operation(block)
+        latencies.append(clock() - sample_started)
+        for index in range(block + 1, min(block + stride, count)):
+            operation(index)
+    return clock() - started, sorted(latencies)
+
+
+def run_case(case: Case, scale: int, repeat: int = DEFAULT_REPEAT) -> Result:
+    """
+    Prepare and measure one case at one scale, keeping the fastest of `repeat` runs
+    so that scheduling noise on short runs does not read as a regression.
+    """
+    with case.prepare(scale) as (operation, count):
+        operation(0)  # warm up caches and lazy imports outside the measurement
+        seconds, latencies = min((measure(operation, count) for _ in range(repeat)), key=lambda run: run[0])
+    return Result(case.name, scale, count, seconds, count / seconds if seconds > 0 else 0.0,
+                  _percentile(latencies, 0.50) * 1e6, _percentile(latencies, 0.99) * 1e6)
+
+
+def run_benchmarks(cases: Sequence[str], scales: Sequence[int], repeat: int = DEFAULT_REPEAT,
+                   report: Optional[Callable[[Result], None]] = None) -> List[Result]:
+    """
+    Run every requested case at every scale.
+
+    Raises:
+        ValueError: If a case name is unknown.
+    """
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(unknown)}. Choose from {', '.join(CASES)}.")
+    results = []
+    for name in cases:
+        for scale in scales:
+            result = run_case(CASES[name], scale, repeat)
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def save_results(results: Sequence[Result], path: str):
+    """
+    Write results, plus the environment they were measured in, as JSON.
+    """
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result._asdict() for result in results],
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(document, output, indent=2)
+
+
+def load_results(path: str) -> List[Result]:
+    """
+    Read results written by save_results.
+    """
+    with open(path, encoding="utf-8") as source:
+        return [Result(**result) for result in json.load(source)["results"]]
+
+
+def compare(current: Sequence[Result], baseline: Sequence[Result],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Regression]:
+    """
+    Find measurements that got worse than the baseline by more than `tolerance`.
+
+    Throughput regresses when it falls; latency percentiles regress when they
+    rise. Cases or scales missing from the baseline are not compared.
+
+    Args:
+        current (Sequence[Result]): The new measurements.
+        baseline (Sequence[Result]): The stored measurements.
+        tolerance (float): Allowed relative change, e.g. 0.25 for 25%.
+
+    Returns:
+        List[Regression]: One entry per regressed metric.
+    """
+    reference = {(result.case, result.scale): result for result in baseline}
+    regressions = []
+    for result in current:
+        previous = reference.get((result.case, result.scale))
+        if previous is None:
+            continue
+        for metric, higher_is_better in (("throughput", True), ("p50_us", False), ("p99_us", False)):
+            old, new = getattr(previous, metric), getattr(result, metric)
+            if old <= 0:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(Regression(result.case, result.scale, metric, old, new, change))
+    return regressions
+
+
+def format_result(result: Result) -> str:
+    return (f"{result.case:<15} {result.scale:>10,} {result.operations:>10,} ops "
+            f"{result.throughput:>14,.0f} ops/s  p50 {result.p50_us:>9.2f} us  p99 {result.p99_us:>9.2f} us")
+
+
+def _scale(text: str) -> int:
+    value = float(text)
+    if value < 1 or value != int(value):
+        raise argparse.ArgumentTypeError(f"Scale must be a positive whole number, got {text}")
+    return int(value)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command-line entry point. Returns the process exit code.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Calculator benchmarks.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES),
+                        help="Cases to run (default: all)")
+    parser.add_argument("--scales", nargs="+", type=_scale, default=list(DEFAULT_SCALES),
+                        help="Operation counts, e.g. 1e3 1e5 1e7 (default: 1e3 1e4 1e5)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Runs per case and scale; the fastest is kept (default: 3)")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results.json"),
+                        help="Where to write the results (default: benchmarks/results.json)")
+    parser.add_argument("--baseline", help="Compare against results saved earlier and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative change before a metric counts as regressed (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.cases, args.scales, args.repeat, report=lambda result: print(format_result(result)))
+    save_results(results, args.output)
+    print(f"Results written to {args.output}")
+    if not args.baseline:
+        return 0
+    regressions = compare(results, load_results(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression.case} at {regression.scale:,}: {regression.metric} "
+              f"{regression.baseline:.2f} -> {regression.current:.2f} ({regression.change:+.0%})", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
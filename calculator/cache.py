@@ -0,0 +1,169 @@
+"""
+Result Cache Module
+
+This module provides an opt-in memoization cache for command results. Entries are
+keyed on the command name, the exact Decimal operands and the active decimal
+context, so a cached result is identical to what executing the command again
+would produce. The cache is bounded and evicts least recently used entries; an
+optional time-to-live expires entries after a fixed number of seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal, getcontext
+from typing import Dict, Hashable, Optional
+
+from calculator.precision import is_lossy
+
+MISSING = object()
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class ResultCache:
+    """
+    A bounded LRU cache with optional TTL and hit/miss/eviction counters.
+
+    Attributes:
+        maxsize (int): Maximum number of cached results.
+        ttl (Optional[float]): Seconds before an entry expires, or None to never expire.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no usable entry.
+        evictions (int): Entries dropped to respect maxsize.
+        expirations (int): Entries dropped because their TTL elapsed.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize (int): Maximum number of cached results.
+            ttl (Optional[float]): Seconds before an entry expires, or None to never expire.
+
+        Raises:
+            ValueError: If maxsize is not positive or ttl is not positive.
+        """
+        if maxsize <= 0:
+            raise ValueError("Cache size must be a positive number.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be a positive number of seconds.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    @staticmethod
+    def make_key(name: str, a: Decimal, b: Decimal) -> tuple:
+        """
+        Build the cache key for a command invocation.
+
+        Operands are keyed by their (sign, digits, exponent) tuple rather than by
+        value, so Decimal('1.0') and Decimal('1') do not share a result whose
+        representation would differ. The decimal context and lossy mode are part
+        of the key because they change the result.
+
+        Args:
+            name (str): The registered command name.
+            a (Decimal): The first operand.
+            b (Decimal): The second operand.
+
+        Returns:
+            tuple: A hashable key.
+        """
+        context = getcontext()
+        return (name, a.as_tuple(), b.as_tuple(), context.prec, context.rounding, is_lossy())
+
+    def get(self, key: Hashable):
+        """
+        Look up a cached result.
+
+        Args:
+            key (Hashable): A key produced by make_key.
+
+        Returns:
+            The cached result, or MISSING if there is none.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        """
+        Store a result, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): A key produced by make_key.
+            value: The result to cache.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report the cache counters.
+
+        Returns:
+            Dict[str, float]: Size, capacity, hits, misses, evictions, expirations and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[ResultCache] = None
+
+
+def configure_cache(enabled: bool, maxsize: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = None) -> Optional[ResultCache]:
+    """
+    Enable or disable the shared result cache.
+
+    Args:
+        enabled (bool): Whether results should be cached.
+        maxsize (int): Maximum number of cached results.
+        ttl (Optional[float]): Seconds before an entry expires, or None to never expire.
+
+    Returns:
+        Optional[ResultCache]: The shared cache, or None when disabled.
+    """
+    global _cache  # pylint: disable=global-statement
+    _cache = ResultCache(maxsize, ttl) if enabled else None
+    return _cache
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Return the shared result cache, or None when caching is disabled.
+    """
+    return _cache
@@ -30,6 +30,9 @@ class Calculation:
             Provides a string representation of the Calculation instance for easy readability.
     """
 
+    # Slots avoid a per-instance __dict__, which dominates memory in large histories
+    __slots__ = ("a", "b", "operation")
+
     def __init__(self, a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal]):
         """
         Set up a Calculation instance with two values and a specified operation.
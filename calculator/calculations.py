@@ -4,25 +4,30 @@ Calculations Class
 This module defines a class to manage a record of multiple calculations.
 It supports adding, clearing, retrieving, and filtering calculations based on
 the type of operation performed.
+
+The history is held in a bounded, indexed store (see calculator.history), so it
+no longer grows without limit and per-operation lookups do not scan every entry.
 """
 
 from calculator.calculation import Calculation
+from calculator.history import DEFAULT_HISTORY_CAPACITY, HistoryStore, RingBufferHistory
+from calculator.sinks import Sink
 from decimal import Decimal
-from typing import Callable, List
+from typing import Callable, List, Optional
 
 class calculations:
     """
     A class to keep track of a history of calculation instances.
 
     Attributes:
-        history (List[Calculation]): A list that stores individual Calculation instances.
+        history (HistoryStore): The store holding individual Calculation instances.
 
     Methods:
         add_calculation(calculation: Calculation):
-            Appends a new Calculation instance to the history list.
+            Appends a new Calculation instance to the history.
 
         delete_calculation():
-            Empties the history list, removing all stored calculations.
+            Empties the history, removing all stored calculations.
 
         get_latest() -> Calculation:
             Retrieves the most recent Calculation instance from the history, or None if history is empty.
@@ -32,14 +37,26 @@ class calculations:
 
         filter_with_operation(operation: str) -> List[Calculation]:
             Filters the history to return Calculation instances with a specified operation.
+
+        filter_by_time(start: float, end: float) -> List[Calculation]:
+            Filters the history to return Calculation instances added within a time range.
+
+        set_capacity(capacity: Optional[int]):
+            Replaces the history with an empty store of the same backend and the given capacity.
+
+        use_store(store: HistoryStore):
+            Replaces the history with the given store backend.
+
+        export(sink: Sink) -> int:
+            Writes every calculation and its result to an output sink.
     """
 
-    history = []
+    history: HistoryStore = RingBufferHistory(DEFAULT_HISTORY_CAPACITY)
 
     @classmethod
     def add_calculation(cls, calculation: Calculation):
         """
-        Append a Calculation instance to the history list.
+        Append a Calculation instance to the history, evicting the oldest entry if full.
 
         Args:
             calculation (Calculation): The Calculation instance to be added to history.
@@ -49,7 +66,7 @@ class calculations:
     @classmethod
     def delete_calculation(cls):
         """
-        Clear all Calculation instances from the history list.
+        Clear all Calculation instances from the history.
         """
         cls.history.clear()
 
@@ -61,9 +78,7 @@ class calculations:
         Returns:
             Calculation: The latest Calculation in history, or None if no calculations exist.
         """
-        if cls.history:
-            return cls.history[-1]
-        return None
+        return cls.history.latest()
 
     @classmethod
     def print_all_calculation(cls) -> List[Calculation]:
@@ -73,7 +88,7 @@ class calculations:
         Returns:
             List[Calculation]: The list of all calculations stored in history.
         """
-        return cls.history
+        return list(cls.history)
 
     @classmethod
     def filter_with_operation(cls, operation: str) -> List[Calculation]:
@@ -86,4 +101,61 @@ class calculations:
         Returns:
             List[Calculation]: A list of calculations that use the specified operation.
         """
-        return [calc for calc in cls.history if calc.operation.__name__ == operation]
+        return cls.history.by_operation(operation)
+
+    @classmethod
+    def filter_by_time(cls, start: float, end: float) -> List[Calculation]:
+        """
+        Retrieve Calculation instances added between two timestamps.
+
+        Args:
+            start (float): The earliest timestamp (seconds since the epoch), inclusive.
+            end (float): The latest timestamp (seconds since the epoch), inclusive.
+
+        Returns:
+            List[Calculation]: The calculations added within the range, oldest first.
+        """
+        return cls.history.between(start, end)
+
+    @classmethod
+    def set_capacity(cls, capacity: Optional[int]):
+        """
+        Replace the history with an empty store of the same backend and the given capacity.
+
+        Args:
+            capacity (Optional[int]): The maximum number of entries, or None for no limit.
+
+        Raises:
+            ValueError: If the capacity is invalid or the current backend cannot be bounded.
+        """
+        cls.use_store(cls.history.with_capacity(capacity))
+
+    @classmethod
+    def use_store(cls, store: HistoryStore):
+        """
+        Replace the history with the given store backend.
+
+        Args:
+            store (HistoryStore): The backend to use from now on.
+        """
+        cls.history = store
+
+    @classmethod
+    def export(cls, sink: Sink) -> int:
+        """
+        Write every calculation, oldest first, with its result (or error) to an output sink.
+
+        The history is iterated, not copied, and the sink writes a chunk at a time. The sink
+        is flushed but not closed, so more rows can follow.
+
+        Args:
+            sink (Sink): The sink to write to, e.g. calculator.sinks.open_sink("csv", stream).
+
+        Returns:
+            int: The number of calculations written.
+        """
+        from calculator.history_io import history_rows  # pylint: disable=import-outside-toplevel  # imports this module
+        written = sink.rows
+        sink.write_rows(history_rows(cls.history))
+        sink.flush()
+        return sink.rows - written
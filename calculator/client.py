@@ -0,0 +1,181 @@
+"""
+Client Module
+
+This module is a small client for the calculation server. Connections are kept
+in a pool and reused across calls, so only the first request on each connection
+pays the connect cost. calculate_many pipelines a whole list of requests over one
+connection, sending a window of lines before reading their responses. A client
+created with a decimal context (and lossy mode) sends them once on each new
+connection, so the server computes under the client's settings.
+"""
+
+import queue
+import socket
+from decimal import Context, Decimal
+from typing import Iterable, List, Optional, Tuple, Union
+
+from calculator.server import DEFAULT_ADDRESS, format_context_request, parse_address
+
+DEFAULT_WINDOW = 256
+
+
+class CalculationError(ValueError):
+    """An error reported by the server for one request."""
+
+
+class _Connection:
+    """One socket plus a buffered reader for its response lines."""
+
+    def __init__(self, address: str, timeout: float):
+        kind, *location = parse_address(address)
+        if kind == "unix":
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(location[0])
+        else:
+            self.sock = socket.create_connection(tuple(location), timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def exchange(self, requests: List[bytes]) -> List[bytes]:
+        """Send a group of request lines and read one response line for each."""
+        self.sock.sendall(b"".join(requests))
+        responses = []
+        for _ in requests:
+            line = self.reader.readline()
+            if not line:
+                raise ConnectionError("The calculation server closed the connection.")
+            responses.append(line)
+        return responses
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def _parse_response(line: bytes) -> Union[Decimal, CalculationError]:
+    """Turn a response line into a Decimal or a CalculationError."""
+    status, _, payload = line.decode().rstrip("\n").partition(" ")
+    if status == "ok":
+        return Decimal(payload)
+    return CalculationError(payload)
+
+
+class CalculatorClient:
+    """
+    A pooled client for the calculation server.
+
+    Attributes:
+        address (str): The server address ('host:port' or 'unix:/path').
+        timeout (float): Socket timeout in seconds.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, pool_size: int = 4, timeout: float = 10.0,
+                 context: Optional[Context] = None, lossy: bool = False):
+        """
+        Args:
+            address (str): The server address ('host:port' or 'unix:/path').
+            pool_size (int): Maximum number of idle connections kept open.
+            timeout (float): Socket timeout in seconds.
+            context (Optional[Context]): Precision and rounding for the server to compute
+                under; without one the server uses its own context and lossy mode.
+            lossy (bool): Ask the server for float arithmetic; only sent with a context.
+        """
+        self.address = address
+        self.timeout = timeout
+        self._setup = [format_context_request(context, lossy).encode()] if context is not None else []
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    def _acquire(self) -> _Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        connection = _Connection(self.address, self.timeout)
+        if self._setup:
+            try:
+                status, _, message = connection.exchange(self._setup)[0].decode().rstrip("\n").partition(" ")
+            except OSError:
+                connection.close()
+                raise
+            if status != "ok":
+                connection.close()
+                raise CalculationError(message)
+        return connection
+
+    def _release(self, connection: _Connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _exchange(self, requests: List[bytes]) -> List[bytes]:
+        """Run one exchange on a pooled connection, discarding the connection on failure."""
+        connection = self._acquire()
+        try:
+            responses = connection.exchange(requests)
+        except (OSError, ConnectionError):
+            connection.close()
+            raise
+        self._release(connection)
+        return responses
+
+    def calculate(self, operation: str, a, b) -> Decimal:
+        """
+        Run one calculation on the server.
+
+        Args:
+            operation (str): The command name.
+            a: The first operand.
+            b: The second operand.
+
+        Returns:
+            Decimal: The result.
+
+        Raises:
+            CalculationError: If the server reports an error.
+        """
+        result = _parse_response(self._exchange([f"{operation} {a} {b}\n".encode()])[0])
+        if isinstance(result, CalculationError):
+            raise result
+        return result
+
+    def calculate_many(self, requests: Iterable[Tuple[str, object, object]],
+                       window: int = DEFAULT_WINDOW) -> List[Union[Decimal, CalculationError]]:
+        """
+        Pipeline many calculations over one connection.
+
+        Args:
+            requests (Iterable[Tuple[str, object, object]]): (operation, a, b) triples.
+            window (int): Requests sent before their responses are read.
+
+        Returns:
+            List[Union[Decimal, CalculationError]]: One entry per request, in order;
+            failed requests hold their CalculationError instead of a result.
+        """
+        results = []
+        batch = []
+        for operation, a, b in requests:
+            batch.append(f"{operation} {a} {b}\n".encode())
+            if len(batch) >= window:
+                results.extend(_parse_response(line) for line in self._exchange(batch))
+                batch = []
+        if batch:
+            results.extend(_parse_response(line) for line in self._exchange(batch))
+        return results
+
+    def close(self):
+        """
+        Close every pooled connection.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
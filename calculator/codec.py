@@ -0,0 +1,71 @@
+"""
+Codec Module
+
+This module encodes calculator values into fixed-width binary fields so they can
+be stored in flat files and shared buffers without pickling. Decimals are stored
+as their exact ASCII text, NUL-padded to a fixed width, and the built-in
+operations are stored as one-byte codes.
+"""
+
+from decimal import Decimal
+from typing import Callable
+
+from calculator.operations import add, subtract, multiply, divide
+
+OPERAND_WIDTH = 48
+
+OPERATIONS = (add, subtract, multiply, divide)
+_OPERATION_CODES = {operation: code for code, operation in enumerate(OPERATIONS)}
+
+
+def encode_decimal(value: Decimal, width: int = OPERAND_WIDTH) -> bytes:
+    """
+    Encode a Decimal as NUL-padded ASCII of a fixed width.
+
+    Args:
+        value (Decimal): The value to encode.
+        width (int): The field width in bytes.
+
+    Returns:
+        bytes: Exactly `width` bytes.
+
+    Raises:
+        ValueError: If the value's text does not fit in the field.
+    """
+    text = str(value).encode("ascii")
+    if len(text) > width:
+        raise ValueError(f"Value {value} does not fit in a {width}-byte field.")
+    return text.ljust(width, b"\0")
+
+
+def decode_decimal(field) -> Decimal:
+    """
+    Decode a field written by encode_decimal.
+
+    Args:
+        field: A bytes-like object holding one encoded field.
+
+    Returns:
+        Decimal: The decoded value.
+    """
+    return Decimal(bytes(field).rstrip(b"\0").decode("ascii"))
+
+
+def operation_code(operation: Callable) -> int:
+    """
+    Return the one-byte code of a built-in operation.
+
+    Raises:
+        ValueError: If the operation is not one of the built-in operations.
+    """
+    code = _OPERATION_CODES.get(operation)
+    if code is None:
+        raise ValueError(f"Operation {getattr(operation, '__name__', operation)} has no binary encoding.")
+    return code
+
+
+def operation_for(code: int) -> Callable:
+    """
+    Return the built-in operation for a one-byte code.
+    """
+    return OPERATIONS[code]
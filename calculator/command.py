@@ -1,58 +1,214 @@
 # calculator/command.py
 from abc import ABC, abstractmethod
-from decimal import Decimal
+from collections import deque
+from decimal import Decimal, getcontext, localcontext
+from itertools import islice
 from calculator.command_registry import register_command
+from calculator.precision import compute as precision_compute, is_lossy
+
+# NumPy is only needed for the lossy float64 batch path, so it is imported on first use
+np = None
+
+def import_numpy():
+    """Imports NumPy on first use and returns it, or None when it is not installed."""
+    global np  # pylint: disable=global-statement
+    if np is None:
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+DEFAULT_BATCH_CHUNK = 4096
+DEFAULT_BATCH_WINDOW = 8
+
+def _chunks(a_values, b_values, chunk_size):
+    pairs = zip(a_values, b_values)
+    while True:
+        chunk = list(islice(pairs, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _submit_windowed(executor, command_class, chunks, context, window, lossy=False):
+    """Yields each chunk's results in order, keeping at most `window` chunks submitted at once."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(execute_chunk, command_class, chunk, context, lossy))
+        while len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def execute_chunk(command_class, chunk, context=None, lossy=False):
+    """Runs one chunk of operand pairs under a decimal context, reporting failures per element instead of raising."""
+    compute, int_kernel = command_class.compute, command_class.int_kernel
+    results = []
+    with localcontext(context or getcontext()) as active:
+        for a, b in chunk:
+            try:
+                if lossy or (int_kernel is not None and type(a) is int and type(b) is int):
+                    results.append(precision_compute(command_class, a, b, active, lossy))
+                else:
+                    results.append(compute(a, b))
+            except Exception as e:
+                results.append(e)
+    return results
 
 class Command(ABC):
+    # Relative cost hints used by the adaptive execution policy
+    cost_weight = 1.0
+    scales_with_precision = False
+    # Vectorised float64 kernel used by execute_batch(exact=False)
+    numpy_kernel = None
+    # Exact kernel for two Python ints, returning None when the result is not an int. It must
+    # be a single operation: Decimal rounds only its result, so intermediates would diverge.
+    int_kernel = None
+
     @abstractmethod
     def execute(self) -> Decimal:
         raise NotImplementedError("Each command must implement the execute method.")
 
+    @staticmethod
+    def compute(a: Decimal, b: Decimal) -> Decimal:
+        raise NotImplementedError("Each command must implement the compute method to support batches.")
+
     def execute_in_process(self, result_queue):
+        """Runs the command as a process target. Metrics are recorded by the scheduler, not here."""
         try:
             result = self.execute()
-            result_queue.put(result)
         except Exception as e:
-            result_queue.put(e)
+            result = e
+        result_queue.put(result)
+
+    @classmethod
+    def execute_batch(cls, a_values, b_values, exact=True, chunk_size=DEFAULT_BATCH_CHUNK, executor=None,
+                      context=None, window=DEFAULT_BATCH_WINDOW, lossy=None):
+        """
+        Applies the command to whole columns of operands and returns a column of results.
+
+        With exact=True the Decimal kernel runs over chunks of operand pairs, optionally
+        spread across an executor with at most `window` chunks in flight, and any element that fails holds its exception instead
+        of a result. Chunks run under the given decimal context (by default the caller's),
+        and pairs of Python ints take the exact int fast path. lossy (by default the
+        configured mode) runs the kernel in binary floating point. With exact=False the
+        operands are converted to NumPy float64 arrays and a vectorised kernel is applied;
+        failing elements (such as division by zero) become NaN.
+        """
+        if not exact:
+            if import_numpy() is None:
+                raise ImportError("NumPy is required for the float64 batch path (exact=False).")
+            if cls.numpy_kernel is None:
+                raise ValueError(f"{cls.__name__} has no float64 batch kernel.")
+            return cls.numpy_kernel(np.asarray(a_values, dtype=np.float64), np.asarray(b_values, dtype=np.float64))
+        chunks = _chunks(a_values, b_values, chunk_size)
+        context = context or getcontext()
+        lossy = is_lossy() if lossy is None else lossy
+        if executor is None:
+            chunk_results = (execute_chunk(cls, chunk, context, lossy) for chunk in chunks)
+        else:
+            chunk_results = _submit_windowed(executor, cls, chunks, context, window, lossy)
+        return [result for results in chunk_results for result in results]
 
 class AddCommand(Command):
     def __init__(self, a: Decimal, b: Decimal):
         self.a = a
         self.b = b
 
-    def execute(self) -> Decimal:
-        return self.a + self.b
+    @staticmethod
+    def compute(a: Decimal, b: Decimal) -> Decimal:
+        return a + b
 
-register_command("add", AddCommand)
+    @staticmethod
+    def numpy_kernel(a, b):
+        return np.add(a, b)
+
+    @staticmethod
+    def int_kernel(a: int, b: int) -> int:
+        return a + b
+
+    def execute(self) -> Decimal:
+        return self.compute(self.a, self.b)
 
 class SubtractCommand(Command):
     def __init__(self, a: Decimal, b: Decimal):
         self.a = a
         self.b = b
 
-    def execute(self) -> Decimal:
-        return self.a - self.b
+    @staticmethod
+    def compute(a: Decimal, b: Decimal) -> Decimal:
+        return a - b
 
-register_command("subtract", SubtractCommand)
+    @staticmethod
+    def numpy_kernel(a, b):
+        return np.subtract(a, b)
+
+    @staticmethod
+    def int_kernel(a: int, b: int) -> int:
+        return a - b
+
+    def execute(self) -> Decimal:
+        return self.compute(self.a, self.b)
 
 class MultiplyCommand(Command):
+    cost_weight = 2.0
+
     def __init__(self, a: Decimal, b: Decimal):
         self.a = a
         self.b = b
 
-    def execute(self) -> Decimal:
-        return self.a * self.b
+    @staticmethod
+    def compute(a: Decimal, b: Decimal) -> Decimal:
+        return a * b
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return np.multiply(a, b)
 
-register_command("multiply", MultiplyCommand)
+    @staticmethod
+    def int_kernel(a: int, b: int) -> int:
+        return a * b
+
+    def execute(self) -> Decimal:
+        return self.compute(self.a, self.b)
 
 class DivideCommand(Command):
+    cost_weight = 4.0
+    scales_with_precision = True
+
     def __init__(self, a: Decimal, b: Decimal):
         self.a = a
         self.b = b
 
-    def execute(self) -> Decimal:
-        if self.b == 0:
+    @staticmethod
+    def compute(a: Decimal, b: Decimal) -> Decimal:
+        if b == 0:
             raise ValueError("Cannot divide by zero")
-        return self.a / self.b
+        return a / b
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return np.divide(a, b, out=np.full_like(a, np.nan), where=b != 0)
+
+    @staticmethod
+    def int_kernel(a: int, b: int):
+        if b == 0 or a % b:
+            return None  # inexact (or failing) divisions take the Decimal path
+        return a // b
+
+    def execute(self) -> Decimal:
+        return self.compute(self.a, self.b)
+
+# Static dispatch table for the builtin commands. They are registered once, with a
+# priority above plugins, so a plugin can only replace one by asking explicitly.
+BUILTIN_PRIORITY = 100
+BUILTIN_COMMANDS = {
+    "add": AddCommand,
+    "subtract": SubtractCommand,
+    "multiply": MultiplyCommand,
+    "divide": DivideCommand,
+}
 
-register_command("divide", DivideCommand)
+for _name, _command_class in BUILTIN_COMMANDS.items():
+    register_command(_name, _command_class, BUILTIN_PRIORITY)
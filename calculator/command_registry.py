@@ -1,7 +1,124 @@
 # calculator/command_registry.py
+import importlib
+import logging
+import time
+from collections import namedtuple
 
-command_registry = {}
+DEFAULT_PRIORITY = 0
 
-def register_command(name, command_class):
+# A rejected registration: `kept` stays registered under `name`, `rejected` was ignored
+Conflict = namedtuple("Conflict", ["name", "kept", "rejected"])
+
+
+class CommandRegistry(dict):
+    """
+    A dict of command name -> command class that can also hold lazy entries.
+
+    A lazy entry maps a command name to the module that registers it. The module
+    is imported the first time the command is looked up, so plugins that are
+    never used are never imported.
+
+    Each registration carries a priority. A registration for a name that is
+    already taken by a different class only replaces it with a strictly higher
+    priority; otherwise it is rejected. Either way the clash is logged and
+    recorded in `conflicts`, so dispatch never depends on import order.
+    Re-registering the same class keeps the higher of its two priorities.
+
+    `version` changes whenever an entry is set or removed, so caches of resolved
+    commands can tell when they are stale.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.lazy = {}
+        self.import_times = {}
+        self.priorities = {}
+        self.conflicts = []
+        self.version = 0
+
+    def __setitem__(self, name, command_class):
+        super().__setitem__(name, command_class)
+        self.version += 1
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.version += 1
+
+    def register(self, name, command_class, priority=DEFAULT_PRIORITY):
+        """Registers a command class, resolving clashes by priority."""
+        existing = dict.get(self, name)
+        # Entries set directly with `registry[name] = cls` carry the default priority
+        current = self.priorities.get(name, DEFAULT_PRIORITY)
+        if existing is command_class:
+            priority = max(priority, current)
+        elif existing is not None:
+            if priority <= current:
+                self.conflicts.append(Conflict(name, existing, command_class))
+                logging.warning(f"Command '{name}' is already registered by {existing.__module__}.{existing.__qualname__}; "
+                                f"ignoring {command_class.__module__}.{command_class.__qualname__} (priority {priority})")
+                return
+            self.conflicts.append(Conflict(name, command_class, existing))
+            logging.warning(f"Command '{name}' from {existing.__module__}.{existing.__qualname__} overridden by "
+                            f"{command_class.__module__}.{command_class.__qualname__} (priority {priority})")
+        self[name] = command_class
+        self.priorities[name] = priority
+        self.lazy.pop(name, None)
+
+    def register_lazy(self, name, module_name):
+        """Records that looking up `name` should import `module_name`."""
+        if not dict.__contains__(self, name):
+            self.lazy[name] = module_name
+
+    def _load(self, name):
+        module_name = self.lazy.pop(name, None)
+        if module_name is None:
+            return
+        started = time.perf_counter()
+        importlib.import_module(module_name)
+        self.import_times[module_name] = time.perf_counter() - started
+        for registered in [lazy_name for lazy_name in self.lazy if dict.__contains__(self, lazy_name)]:
+            del self.lazy[registered]
+
+    def load_all(self):
+        """Imports every pending lazy plugin."""
+        for name in list(self.lazy):
+            self._load(name)
+
+    def get(self, name, default=None):
+        command_class = dict.get(self, name)
+        if command_class is None and name in self.lazy:
+            self._load(name)
+            command_class = dict.get(self, name)
+        return default if command_class is None else command_class
+
+    def __getitem__(self, name):
+        if name in self.lazy and not dict.__contains__(self, name):
+            self._load(name)
+        return super().__getitem__(name)
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or name in self.lazy
+
+    def keys(self):
+        return list(super().keys()) + [name for name in self.lazy if not dict.__contains__(self, name)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        self.load_all()
+        return super().items()
+
+    def values(self):
+        self.load_all()
+        return super().values()
+
+
+command_registry = CommandRegistry()
+
+def register_command(name, command_class, priority=DEFAULT_PRIORITY):
     """Registers a command in the global command registry."""
-    command_registry[name] = command_class
+    command_registry.register(name, command_class, priority)
@@ -0,0 +1,228 @@
+"""
+Dependency Graph Module
+
+This module evaluates a set of named calculations that depend on one another.
+Each node applies a registered command (by name) or an arithmetic operation
+(as a Calculation) to constants and/or the results of other nodes. Nodes whose
+inputs are ready run in parallel on an executor, and as soon as a node finishes
+its result is handed to its dependents, which are submitted immediately rather
+than waiting for a whole level of the graph to complete.
+
+After a run, the result reports the critical path (the chain of dependent nodes
+that bounded the run time) and how much parallelism was achieved. Durations and
+parallelism come from when each node actually started and finished on a worker,
+so time spent queued behind a busy pool is not counted.
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Union
+
+import calculator.command  # pylint: disable=unused-import  # registers the builtin commands
+from calculator.calculation import Calculation
+from calculator.command_registry import command_registry
+from calculator.executor import get_executor
+
+GraphResult = namedtuple("GraphResult", [
+    "values", "errors", "critical_path", "critical_path_seconds",
+    "max_parallelism", "average_parallelism", "elapsed",
+])
+
+Node = namedtuple("Node", ["name", "operation", "inputs"])
+
+
+class GraphError(ValueError):
+    """Raised for graphs that reference unknown nodes or contain cycles."""
+
+
+def _timed(task: Callable[[], Decimal]):
+    """Run a node's task on a worker and return (value, error, started, finished)."""
+    started = time.perf_counter()
+    try:
+        return task(), None, started, time.perf_counter()
+    except Exception as e:  # pylint: disable=broad-except
+        return None, e, started, time.perf_counter()
+
+
+def _peak_overlap(intervals: List[tuple]) -> int:
+    """The largest number of (started, finished) intervals that overlap at any moment."""
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    running = peak = 0
+    for _, change in events:
+        running += change
+        peak = max(peak, running)
+    return peak
+
+
+class CalculationGraph:
+    """
+    A directed acyclic graph of named calculations.
+
+    Inputs given as strings refer to other nodes by name; any other value
+    (Decimal, int) is a constant operand.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+
+    def add(self, name: str, operation: Union[str, Callable], a, b) -> "CalculationGraph":
+        """
+        Add a node.
+
+        Args:
+            name (str): The node name, used by dependents to refer to its result.
+            operation (Union[str, Callable]): A registered command name, or an
+                arithmetic function such as calculator.operations.add.
+            a: A constant or the name of another node.
+            b: A constant or the name of another node.
+
+        Returns:
+            CalculationGraph: The graph, so calls can be chained.
+
+        Raises:
+            GraphError: If the name is already used.
+        """
+        if name in self.nodes:
+            raise GraphError(f"Duplicate node name: {name}")
+        self.nodes[name] = Node(name, operation, (a, b))
+        return self
+
+    def _dependencies(self, node: Node) -> List[str]:
+        return [value for value in node.inputs if isinstance(value, str)]
+
+    def topological_order(self) -> List[str]:
+        """
+        Return the node names in an order where every node follows its dependencies.
+
+        Raises:
+            GraphError: If a node depends on an unknown node or the graph has a cycle.
+        """
+        indegree = {}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            dependencies = self._dependencies(node)
+            for dependency in dependencies:
+                if dependency not in self.nodes:
+                    raise GraphError(f"Node {node.name} depends on unknown node {dependency}")
+                dependents[dependency].append(node.name)
+            indegree[node.name] = len(dependencies)
+        order = [name for name, count in indegree.items() if count == 0]
+        for name in order:
+            for dependent in dependents[name]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    order.append(dependent)
+        if len(order) != len(self.nodes):
+            raise GraphError("The calculation graph contains a cycle.")
+        return order
+
+    @staticmethod
+    def _task(node: Node, values: Dict[str, Decimal]):
+        """Build the callable that computes a node from its resolved inputs."""
+        a, b = (Decimal(values[value]) if isinstance(value, str) else Decimal(value) for value in node.inputs)
+        if callable(node.operation):
+            return Calculation.create(a, b, node.operation).operate
+        command_class = command_registry.get(node.operation)
+        if command_class is None:
+            raise GraphError(f"Invalid operation type: {node.operation}")
+        return command_class(a, b).execute
+
+    def run(self, executor: Optional[Executor] = None,
+            on_result: Optional[Callable[[str, Decimal], None]] = None) -> GraphResult:
+        """
+        Evaluate every node, running independent nodes in parallel.
+
+        A node whose dependency failed is not run; it is reported as failed too.
+
+        Args:
+            executor (Optional[Executor]): Where nodes run; defaults to the shared executor.
+            on_result (Optional[Callable[[str, Decimal], None]]): Called as each node succeeds.
+
+        Returns:
+            GraphResult: Values, errors, critical path and parallelism figures.
+
+        Raises:
+            GraphError: If the graph is invalid.
+        """
+        order = self.topological_order()
+        executor = executor or get_executor()
+        remaining = {name: len(self._dependencies(node)) for name, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for dependency in self._dependencies(node):
+                dependents[dependency].append(node.name)
+
+        values: Dict[str, Decimal] = {}
+        errors: Dict[str, Exception] = {}
+        durations: Dict[str, float] = {}
+        intervals = []  # (started, finished) of every node that ran on a worker
+        in_flight = {}
+        run_started = time.perf_counter()
+
+        def submit(name: str):
+            try:
+                task = self._task(self.nodes[name], values)
+            except Exception as e:  # pylint: disable=broad-except
+                finish(name, error=e)
+                return
+            in_flight[executor.submit(_timed, task)] = name
+
+        def finish(name: str, value=None, error=None):
+            # An explicit stack, so a long chain of failing dependents cannot exhaust the call stack
+            stack = [(name, value, error)]
+            while stack:
+                name, value, error = stack.pop()
+                # Nodes that never ran add no time
+                durations.setdefault(name, 0.0)
+                if error is not None:
+                    errors[name] = error
+                else:
+                    values[name] = value
+                    if on_result is not None:
+                        on_result(name, value)
+                for dependent in dependents[name]:
+                    if error is not None:
+                        if dependent not in errors:
+                            errors[dependent] = GraphError(f"Dependency {name} failed: {error}")
+                            stack.append((dependent, None, errors[dependent]))
+                        continue
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0 and dependent not in errors:
+                        submit(dependent)
+
+        for name in [name for name, count in remaining.items() if count == 0]:
+            submit(name)
+        while in_flight:
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = in_flight.pop(future)
+                value, error = None, future.exception()
+                if error is None:
+                    value, error, started, finished = future.result()
+                    durations[name] = finished - started
+                    intervals.append((started, finished))
+                finish(name, value, error)
+
+        elapsed = time.perf_counter() - run_started
+        path, path_seconds = self._critical_path(order, durations)
+        return GraphResult(values, errors, path, path_seconds, _peak_overlap(intervals),
+                           sum(durations.values()) / elapsed if elapsed > 0 else 0.0, elapsed)
+
+    def _critical_path(self, order: List[str], durations: Dict[str, float]):
+        """Find the dependency chain with the largest total measured duration."""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in order:
+            best = max(self._dependencies(self.nodes[name]), key=lambda dependency: finish[dependency], default=None)
+            previous[name] = best
+            finish[name] = durations.get(name, 0.0) + (finish[best] if best is not None else 0.0)
+        if not finish:
+            return [], 0.0
+        last = max(finish, key=finish.get)
+        path = []
+        while last is not None:
+            path.append(last)
+            last = previous[last]
+        return path[::-1], finish[path[0]]
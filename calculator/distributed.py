@@ -0,0 +1,358 @@
+"""
+Distributed Module
+
+This module spreads batches of calculations across several worker nodes.
+
+A node is a calculation server (`python main.py --serve host:port`). It is
+reached through a Transport; the default SocketTransport speaks the server's
+line protocol over a pooled, pipelined connection. Other transports can be
+plugged in by subclassing Transport.
+
+The Coordinator cuts the input into shards and runs one thread per node. Each
+thread pulls the next shard from a shared queue, so fast nodes take more work.
+If a node is lost (its connection fails), the node is retired and its shard goes
+back on the queue for the surviving nodes, up to `max_retries` times per shard.
+A shard that fails for any other reason is retried the same way, but the node
+stays in service.
+Results are reassembled in input order, with a bounded number of shards in
+flight. Per-node record counts, busy time and throughput are kept in NodeStats.
+
+Nodes compute under the coordinator's decimal context (precision and rounding)
+and lossy mode, not their own: each SocketTransport sends them when it connects,
+so remote results match the local batch path for the same settings.
+
+LocalCluster starts several localhost server processes that stand in for nodes,
+so the whole path can be exercised on one machine.
+"""
+
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from decimal import Context, Decimal, getcontext
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from calculator.client import CalculationError, CalculatorClient
+from calculator.precision import is_lossy
+from calculator.streaming import Outcome, Record
+
+DEFAULT_SHARD_SIZE = 1024
+DEFAULT_MAX_RETRIES = 3
+MALFORMED_RECORD = "Invalid input format. Use: <operation> <num1> <num2>"
+
+NodeStats = namedtuple("NodeStats", ["node", "records", "shards", "seconds", "throughput", "failures", "alive"])
+
+Request = Tuple[str, object, object]
+Response = Union[Decimal, CalculationError]
+
+
+class DistributedError(RuntimeError):
+    """Raised when a shard cannot be completed on any node."""
+
+
+class Transport(ABC):
+    """
+    A connection to one worker node.
+
+    Attributes:
+        name (str): How the node is identified in statistics and errors.
+    """
+
+    name = "node"
+
+    @abstractmethod
+    def send_batch(self, requests: List[Request]) -> List[Response]:
+        """
+        Run a shard of (operation, a, b) requests on the node.
+
+        Returns:
+            List[Response]: One Decimal or CalculationError per request, in order.
+
+        Raises:
+            OSError: If the node cannot be reached; the coordinator then treats it as lost.
+        """
+
+    def close(self):
+        """Release the connection."""
+
+
+class SocketTransport(Transport):
+    """
+    Talks to a calculation server over TCP or a Unix socket, pipelining each shard.
+
+    With a context, the server computes under its precision and rounding and the given lossy mode.
+    """
+
+    def __init__(self, address: str, timeout: float = 30.0, context: Optional[Context] = None,
+                 lossy: bool = False):
+        self.name = address
+        self._client = CalculatorClient(address, pool_size=1, timeout=timeout, context=context, lossy=lossy)
+
+    def send_batch(self, requests: List[Request]) -> List[Response]:
+        return self._client.calculate_many(requests)
+
+    def close(self):
+        self._client.close()
+
+
+class _Node:
+    """A transport plus its counters. Only its own thread updates the counters."""
+
+    def __init__(self, transport: Transport):
+        self.transport = transport
+        self.records = 0
+        self.shards = 0
+        self.seconds = 0.0
+        self.failures = 0
+        self.alive = True
+
+    def stats(self) -> NodeStats:
+        return NodeStats(self.transport.name, self.records, self.shards, self.seconds,
+                         self.records / self.seconds if self.seconds > 0 else 0.0, self.failures, self.alive)
+
+
+class Coordinator:
+    """
+    Shard batches of calculations across worker nodes and reassemble the results in order.
+
+    Attributes:
+        shard_size (int): Requests per shard.
+        max_retries (int): Times a shard is re-sent after losing a node.
+        window (int): Maximum shards in flight.
+    """
+
+    def __init__(self, nodes: Sequence[Union[str, Transport]], shard_size: int = DEFAULT_SHARD_SIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES, window: Optional[int] = None,
+                 context: Optional[Context] = None, lossy: Optional[bool] = None):
+        """
+        Args:
+            nodes (Sequence[Union[str, Transport]]): Node addresses ('host:port' or 'unix:/path') or transports.
+            shard_size (int): Requests per shard.
+            max_retries (int): Times a shard is re-sent after losing a node.
+            window (Optional[int]): Maximum shards in flight; defaults to twice the number of nodes.
+            context (Optional[Context]): The decimal context nodes given by address compute under;
+                defaults to the caller's.
+            lossy (Optional[bool]): Use float arithmetic on those nodes; defaults to the configured mode.
+
+        Raises:
+            ValueError: If no nodes are given or the shard size is not positive.
+        """
+        if not nodes:
+            raise ValueError("A coordinator needs at least one node.")
+        if shard_size < 1:
+            raise ValueError(f"Shard size must be positive, got {shard_size}")
+        context = (context or getcontext()).copy()
+        lossy = is_lossy() if lossy is None else lossy
+        self._nodes = [_Node(node if isinstance(node, Transport)
+                             else SocketTransport(node, context=context, lossy=lossy)) for node in nodes]
+        self.shard_size = shard_size
+        self.max_retries = max_retries
+        self.window = window or 2 * len(self._nodes)
+        self._lock = threading.Lock()
+
+    def stats(self) -> List[NodeStats]:
+        """
+        Per-node counters: records and shards completed, busy seconds, records per second, failures.
+        """
+        return [node.stats() for node in self._nodes]
+
+    def run(self, requests: Iterable[Request]) -> Iterator[Response]:
+        """
+        Execute (operation, a, b) requests across the nodes, yielding results in input order.
+
+        Only one batch runs at a time per coordinator.
+
+        Yields:
+            Response: A Decimal, or the CalculationError the node reported for that request.
+
+        Raises:
+            DistributedError: If a shard exhausts its retries or every node is lost.
+        """
+        with self._lock:
+            yield from self._run(iter(requests))
+
+    def _run(self, requests: Iterator[Request]) -> Iterator[Response]:
+        work: queue.Queue = queue.Queue()
+        done: queue.Queue = queue.Queue()
+        live = [node for node in self._nodes if node.alive]
+        if not live:
+            raise DistributedError("Every node has been lost.")
+        threads = [threading.Thread(target=self._serve, args=(node, work, done), daemon=True) for node in live]
+        for thread in threads:
+            thread.start()
+        completed: Dict[int, List[Response]] = {}
+        submitted = next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and submitted - next_index < self.window:
+                    shard = list(islice(requests, self.shard_size))
+                    if not shard:
+                        exhausted = True
+                        break
+                    work.put((submitted, shard, 0))
+                    submitted += 1
+                if exhausted and next_index == submitted:
+                    return
+                index, shard, attempts, results, error = done.get()
+                if error is None:
+                    completed[index] = results
+                    while next_index in completed:
+                        yield from completed.pop(next_index)
+                        next_index += 1
+                    continue
+                if attempts >= self.max_retries:
+                    raise DistributedError(f"Shard {index} failed after {attempts + 1} attempts: {error}")
+                if not any(node.alive for node in live):
+                    raise DistributedError(f"Every node has been lost; last error: {error}")
+                work.put((index, shard, attempts + 1))
+        finally:
+            for _ in threads:
+                work.put(None)
+
+    @staticmethod
+    def _serve(node: _Node, work: queue.Queue, done: queue.Queue):
+        """Node thread: run shards until told to stop or the node is lost."""
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            index, shard, attempts = item
+            started = time.perf_counter()
+            try:
+                results = node.transport.send_batch(shard)
+            except (OSError, ConnectionError) as e:
+                node.failures += 1
+                node.alive = False
+                node.transport.close()
+                logging.warning(f"Lost node {node.transport.name}: {e}")
+                done.put((index, shard, attempts, None, e))
+                return
+            except Exception as e:  # pylint: disable=broad-except
+                # The node is still reachable; the shard is retried like any failed shard
+                node.failures += 1
+                logging.warning(f"Shard {index} failed on node {node.transport.name}: {e}")
+                done.put((index, shard, attempts, None, e))
+                continue
+            node.seconds += time.perf_counter() - started
+            node.records += len(shard)
+            node.shards += 1
+            done.put((index, shard, attempts, results, None))
+
+    def execute_records(self, records: Iterable[Record]) -> Iterator[Outcome]:
+        """
+        Execute batch records (see calculator.streaming.read_records) on the nodes, in input order.
+
+        This makes a coordinator usable as the `transport` of calculator.streaming.run_batch.
+        Malformed records are reported locally and never sent.
+        """
+        pending = deque()  # records read but not yet answered, oldest first
+
+        def requests():
+            for record in records:
+                pending.append(record)
+                if record.a is not None:
+                    yield record.operation, record.a, record.b
+
+        for result in self.run(requests()):
+            record = pending.popleft()
+            while record.a is None:
+                yield Outcome(record, None, MALFORMED_RECORD)
+                record = pending.popleft()
+            if isinstance(result, CalculationError):
+                yield Outcome(record, None, str(result))
+            else:
+                yield Outcome(record, result, None)
+        while pending:
+            yield Outcome(pending.popleft(), None, MALFORMED_RECORD)
+
+    def close(self):
+        """
+        Close every node's transport.
+        """
+        for node in self._nodes:
+            node.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _serve_node(connection, address: str):
+    """Run a calculation server as a stand-in node. This runs in a LocalCluster process."""
+    import asyncio  # pylint: disable=import-outside-toplevel
+    from calculator.scheduler import configure_scheduler  # pylint: disable=import-outside-toplevel
+    from calculator.server import CalculationServer  # pylint: disable=import-outside-toplevel
+
+    configure_scheduler("inline")  # the node process is the worker; no nested pool
+
+    async def serve():
+        server = CalculationServer(address)
+        await server.start()
+        connection.send(server.bound_address)
+        connection.close()
+        await server.serve_forever()
+    asyncio.run(serve())
+
+
+class LocalCluster:
+    """
+    Several localhost calculation servers, each in its own process, standing in for nodes.
+
+    Attributes:
+        addresses (List[str]): The nodes' bound addresses.
+    """
+
+    def __init__(self, nodes: int = 2, host: str = "127.0.0.1", start_timeout: float = 10.0):
+        """
+        Start the node processes and wait until each is listening.
+
+        Raises:
+            DistributedError: If a node does not start in time.
+        """
+        from multiprocessing import get_context  # pylint: disable=import-outside-toplevel
+        processes = get_context()
+        self._processes = []
+        self.addresses: List[str] = []
+        try:
+            for _ in range(nodes):
+                receiver, sender = processes.Pipe(duplex=False)
+                process = processes.Process(target=_serve_node, args=(sender, f"{host}:0"), daemon=True)
+                process.start()
+                sender.close()
+                self._processes.append(process)
+                if not receiver.poll(start_timeout):
+                    raise DistributedError(f"Node process {process.pid} did not start within {start_timeout}s.")
+                self.addresses.append(receiver.recv())
+                receiver.close()
+        except Exception:
+            self.close()
+            raise
+
+    def kill(self, index: int):
+        """
+        Stop one node abruptly, as if its host had been lost.
+        """
+        process = self._processes[index]
+        process.kill()
+        process.join()
+
+    def close(self):
+        """
+        Stop every node process.
+        """
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,152 @@
+"""
+Executor Module
+
+This module manages the long-lived worker pool used to run calculator commands.
+Instead of spawning a new process for every operation, commands are submitted to
+a shared executor that is created once and reused across REPL commands and batch
+runs until it is shut down.
+
+Three execution modes are supported:
+    - 'process': a warm pool of worker processes (the default).
+    - 'thread': a pool of worker threads.
+    - 'inline': commands run synchronously in the calling thread.
+"""
+
+import atexit
+import logging
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+DEFAULT_MODE = "process"
+
+
+class InlineExecutor(Executor):
+    """
+    An Executor that runs each submitted callable immediately in the calling thread.
+
+    The returned Future is already resolved, so callers can treat inline execution
+    exactly like pooled execution.
+    """
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Run the callable right away and wrap its outcome in a completed Future.
+
+        Args:
+            fn (Callable): The callable to execute.
+
+        Returns:
+            Future: A Future holding either the result or the raised exception.
+        """
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:  # pylint: disable=broad-except
+            future.set_exception(e)
+        return future
+
+
+def _process_pool(max_workers: Optional[int] = None) -> Executor:
+    """Create a ProcessPoolExecutor, importing multiprocessing only when a pool is actually built."""
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+EXECUTOR_MODES = {
+    "process": _process_pool,
+    "thread": ThreadPoolExecutor,
+    "inline": lambda max_workers=None: InlineExecutor(),
+}
+
+_executor: Optional[Executor] = None
+_mode: Optional[str] = None
+# The (mode, max_workers) used when the shared executor is created on first use
+_deferred: Tuple[Optional[str], Optional[int]] = (None, None)
+
+
+def create_executor(mode: str = DEFAULT_MODE, max_workers: Optional[int] = None) -> Executor:
+    """
+    Build a new executor for the requested mode.
+
+    Args:
+        mode (str): One of 'process', 'thread' or 'inline'.
+        max_workers (Optional[int]): Pool size; defaults to the standard library choice.
+
+    Returns:
+        Executor: A new executor instance.
+
+    Raises:
+        ValueError: If the mode is not recognised.
+    """
+    factory = EXECUTOR_MODES.get(mode)
+    if factory is None:
+        raise ValueError(f"Unknown executor mode: {mode}. Choose from {', '.join(EXECUTOR_MODES)}.")
+    return factory(max_workers=max_workers)
+
+
+def configure_executor(mode: Optional[str] = None, max_workers: Optional[int] = None,
+                       lazy: bool = False) -> Optional[Executor]:
+    """
+    Replace the shared executor with one using the given mode.
+
+    Args:
+        mode (Optional[str]): The execution mode; defaults to 'process'.
+        max_workers (Optional[int]): Pool size for pooled modes.
+        lazy (bool): Only record the settings; the executor is created by the first get_executor().
+            Runs that never offload work then never build a pool (or import multiprocessing).
+
+    Returns:
+        Optional[Executor]: The newly configured shared executor, or None when lazy.
+
+    Raises:
+        ValueError: If the mode is not recognised.
+    """
+    global _executor, _mode, _deferred  # pylint: disable=global-statement
+    mode = mode or DEFAULT_MODE
+    if lazy:
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode: {mode}. Choose from {', '.join(EXECUTOR_MODES)}.")
+        shutdown_executor()
+        _deferred = (mode, max_workers)
+        return None
+    new_executor = create_executor(mode, max_workers)
+    shutdown_executor()
+    _executor, _mode = new_executor, mode
+    logging.info(f"Executor configured: mode={mode}, max_workers={max_workers}")
+    return _executor
+
+
+def get_executor() -> Executor:
+    """
+    Return the shared executor, creating a default one on first use.
+
+    Returns:
+        Executor: The shared executor.
+    """
+    if _executor is None:
+        return configure_executor(*_deferred)
+    return _executor
+
+
+def get_executor_mode() -> Optional[str]:
+    """
+    Return the mode of the shared executor, or None if none has been created yet.
+    """
+    return _mode
+
+
+def shutdown_executor(wait: bool = True):
+    """
+    Shut down the shared executor and release its workers.
+
+    Args:
+        wait (bool): Whether to wait for pending work to finish.
+    """
+    global _executor, _mode  # pylint: disable=global-statement
+    if _executor is not None:
+        logging.info(f"Shutting down {_mode} executor.")
+        _executor.shutdown(wait=wait)
+    _executor, _mode = None, None
+
+
+atexit.register(shutdown_executor)
@@ -0,0 +1,293 @@
+"""
+Expressions Module
+
+This module evaluates infix expressions built on the registered commands, such as
+'(a + 2) * mean(b, 4) / $1'. Supported syntax:
+    - numbers, parentheses and the operators + - * / (mapped to add, subtract,
+      multiply and divide), plus unary minus
+    - calls to any registered two-operand command: mean(x, y)
+    - variables, and references to earlier results: '_' for the last result and
+      '$n' for the n-th result of a session
+
+An expression is compiled once into a flat plan: a list of instructions that
+each apply one command kernel to constants, variables or earlier registers.
+Constant sub-expressions are folded at compile time and repeated
+sub-expressions are computed only once. Plans are cached by expression text
+(and decimal context), so evaluating the same expression again skips parsing
+and compilation entirely.
+"""
+
+import re
+from decimal import Decimal, getcontext
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from calculator.command_registry import command_registry
+
+PLAN_CACHE_SIZE = 1024
+
+OPERATORS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+
+TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<reference>\$\d+)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<symbol>[-+*/(),])
+    )""", re.VERBOSE)
+
+# Operands of an instruction: ("const", Decimal), ("var", name) or ("reg", index)
+Operand = Tuple[str, object]
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that cannot be parsed, compiled or evaluated."""
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """
+    Split an expression into (kind, text) tokens.
+
+    Raises:
+        ExpressionError: On characters that do not form a token.
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise ExpressionError(f"Unexpected character at position {position}: {text[position:]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing nested tuples: ('num', Decimal), ('var', name) or ('call', name, left, right)."""
+
+    def __init__(self, text: str):
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None or (expected is not None and token[1] != expected):
+            found = "end of expression" if token is None else repr(token[1])
+            raise ExpressionError(f"Expected {expected or 'a value'} but found {found}")
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        node = self.expression()
+        if self.peek() is not None:
+            raise ExpressionError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in (("symbol", "+"), ("symbol", "-")):
+            node = ("call", OPERATORS[self.take()[1]], node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in (("symbol", "*"), ("symbol", "/")):
+            node = ("call", OPERATORS[self.take()[1]], node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ("symbol", "-"):
+            self.take()
+            operand = self.unary()
+            if operand[0] == "num":
+                return ("num", -operand[1])
+            return ("call", "subtract", ("num", Decimal(0)), operand)
+        return self.atom()
+
+    def atom(self):
+        kind, text = self.take()
+        if kind == "number":
+            return ("num", Decimal(text))
+        if kind == "reference":
+            return ("var", text)
+        if kind == "name":
+            if self.peek() == ("symbol", "("):
+                self.take("(")
+                left = self.expression()
+                self.take(",")
+                right = self.expression()
+                self.take(")")
+                return ("call", text, left, right)
+            return ("var", text)
+        if text == "(":
+            node = self.expression()
+            self.take(")")
+            return node
+        raise ExpressionError(f"Unexpected {text!r}")
+
+
+class Plan:
+    """
+    A compiled expression.
+
+    Attributes:
+        text (str): The source expression.
+        instructions (List[tuple]): (command name, kernel, left operand, right operand) in execution order.
+        result (Operand): Where the final value is found.
+        variables (frozenset): The variable names the plan reads.
+    """
+
+    __slots__ = ("text", "instructions", "result", "variables")
+
+    def __init__(self, text: str, instructions: List[tuple], result: Operand):
+        self.text = text
+        self.instructions = instructions
+        self.result = result
+        self.variables = frozenset(
+            operand[1] for _, _, *operands in instructions for operand in operands if operand[0] == "var"
+        ) | ({result[1]} if result[0] == "var" else frozenset())
+
+    def evaluate(self, variables: Optional[Mapping[str, Decimal]] = None) -> Decimal:
+        """
+        Run the plan.
+
+        Args:
+            variables (Optional[Mapping[str, Decimal]]): Values for the plan's variables.
+
+        Returns:
+            Decimal: The value of the expression.
+
+        Raises:
+            ExpressionError: If a variable is missing.
+        """
+        variables = variables or {}
+        missing = self.variables.difference(variables)
+        if missing:
+            raise ExpressionError(f"Unknown variable(s): {', '.join(sorted(missing))}")
+        registers = []
+        for _, kernel, left, right in self.instructions:
+            registers.append(kernel(_load(left, registers, variables), _load(right, registers, variables)))
+        return _load(self.result, registers, variables)
+
+
+def _load(operand: Operand, registers: List[Decimal], variables: Mapping[str, Decimal]) -> Decimal:
+    kind, value = operand
+    if kind == "const":
+        return value
+    if kind == "reg":
+        return registers[value]
+    return variables[value]
+
+
+def _compile(text: str) -> Plan:
+    """Parse and lower an expression into a flat plan with folding and CSE."""
+    instructions: List[tuple] = []
+    seen: Dict[tuple, Operand] = {}
+
+    def lower(node) -> Operand:
+        if node[0] == "num":
+            return ("const", node[1])
+        if node[0] == "var":
+            return ("var", node[1])
+        _, name, left_node, right_node = node
+        command_class = command_registry.get(name)
+        if command_class is None:
+            raise ExpressionError(f"Unknown command: {name}")
+        left, right = lower(left_node), lower(right_node)
+        if left[0] == "const" and right[0] == "const":
+            try:
+                return ("const", command_class.compute(left[1], right[1]))
+            except Exception:  # pylint: disable=broad-except
+                pass  # leave failing constants (e.g. 1/0) to fail at evaluation time
+        # Key constants by their exact digits so 1 and 1.0 are not merged
+        key = (name,) + tuple(operand[1].as_tuple() if operand[0] == "const" else operand for operand in (left, right))
+        if key not in seen:
+            instructions.append((name, command_class.compute, left, right))
+            seen[key] = ("reg", len(instructions) - 1)
+        return seen[key]
+
+    return Plan(text, instructions, lower(_Parser(text).parse()))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _cached_plan(text: str, precision: int, rounding: str, registry_version: int) -> Plan:
+    return _compile(text)
+
+
+def compile_expression(text: str) -> Plan:
+    """
+    Return the compiled plan for an expression, reusing a cached plan when possible.
+
+    The cache key includes the context precision and rounding because constant
+    folding happens at compile time, and the command registry's version because
+    plans bind the commands they resolved.
+
+    Raises:
+        ExpressionError: If the expression is invalid or calls an unknown command.
+    """
+    context = getcontext()
+    return _cached_plan(text.strip(), context.prec, context.rounding, command_registry.version)
+
+
+def evaluate(text: str, variables: Optional[Mapping[str, Decimal]] = None) -> Decimal:
+    """
+    Compile (or fetch from cache) and evaluate an expression.
+    """
+    return compile_expression(text).evaluate(variables)
+
+
+class ExpressionSession:
+    """
+    Variables and numbered results for an interactive session.
+
+    Only the names an expression actually reads are resolved, so evaluation
+    cost does not grow with the length of the session.
+
+    Attributes:
+        variables (Dict[str, Decimal]): User-assigned variables.
+        results (List[Decimal]): Every result so far; '$1' is the first and '_' the last.
+    """
+
+    def __init__(self):
+        self.variables: Dict[str, Decimal] = {}
+        self.results: List[Decimal] = []
+
+    def lookup(self, name: str) -> Optional[Decimal]:
+        """
+        Resolve a name visible to expressions: a variable, '_' or '$n'.
+        """
+        if name == "_":
+            return self.results[-1] if self.results else None
+        if name.startswith("$"):
+            index = int(name[1:])
+            return self.results[index - 1] if 1 <= index <= len(self.results) else None
+        return self.variables.get(name)
+
+    def evaluate(self, text: str) -> Decimal:
+        """
+        Evaluate an expression and record the result.
+        """
+        plan = compile_expression(text)
+        scope = {name: self.lookup(name) for name in plan.variables}
+        result = plan.evaluate({name: value for name, value in scope.items() if value is not None})
+        self.results.append(result)
+        return result
+
+    def assign(self, name: str, text: str) -> Decimal:
+        """
+        Evaluate an expression, record the result and store it in a variable.
+
+        Raises:
+            ExpressionError: If the name is not a valid variable name.
+        """
+        if not re.fullmatch(r"[A-Za-z]\w*", name):
+            raise ExpressionError(f"Invalid variable name: {name}")
+        self.variables[name] = self.evaluate(text)
+        return self.variables[name]
@@ -0,0 +1,345 @@
+"""
+History Module
+
+This module provides the storage backends behind the calculations history.
+
+RingBufferHistory keeps at most `capacity` Calculation instances and evicts the
+oldest entry once it is full. It maintains secondary indexes by operation name
+and by insertion time, so the latest entry is found in O(1), filtering by
+operation costs O(k) for k matching entries, and time-range queries use a
+binary search instead of scanning the whole history.
+
+ColumnarHistory offers the same interface with a compact memory layout: the
+operation of each entry is stored as a one-byte code in an array('B'), operands
+are packed as ASCII text in one contiguous buffer, and Calculation objects are
+only built when an entry is read.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional
+
+from calculator.calculation import Calculation
+
+DEFAULT_HISTORY_CAPACITY = 100_000
+
+Entry = namedtuple("Entry", ["timestamp", "calculation"])
+
+
+class HistoryStore(ABC):
+    """
+    Interface shared by all history backends.
+
+    Methods:
+        append(calculation: Calculation):
+            Stores a new Calculation, evicting old entries if the store is full.
+
+        clear():
+            Removes every stored Calculation.
+
+        latest() -> Optional[Calculation]:
+            Returns the most recently stored Calculation, or None.
+
+        by_operation(name: str) -> List[Calculation]:
+            Returns the stored Calculations whose operation has the given name.
+
+        between(start: float, end: float) -> List[Calculation]:
+            Returns the Calculations stored between two timestamps (inclusive).
+
+        with_capacity(capacity: Optional[int]) -> HistoryStore:
+            Returns an empty store of the same backend with another capacity.
+    """
+
+    capacity: Optional[int] = None
+
+    @abstractmethod
+    def append(self, calculation: Calculation):
+        """Store a Calculation."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every stored Calculation."""
+
+    @abstractmethod
+    def latest(self) -> Optional[Calculation]:
+        """Return the most recent Calculation, or None if the store is empty."""
+
+    @abstractmethod
+    def by_operation(self, name: str) -> List[Calculation]:
+        """Return the Calculations performed with the named operation, oldest first."""
+
+    @abstractmethod
+    def between(self, start: float, end: float) -> List[Calculation]:
+        """Return the Calculations stored between two timestamps, oldest first."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Calculation]:
+        """Iterate over stored Calculations, oldest first."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of stored Calculations."""
+
+    def with_capacity(self, capacity: Optional[int]) -> "HistoryStore":
+        """
+        Return an empty store of the same backend bounded to `capacity` entries.
+
+        Raises:
+            ValueError: If the backend cannot be bounded.
+        """
+        raise ValueError(f"{type(self).__name__} does not support a capacity.")
+
+
+class RingBufferHistory(HistoryStore):
+    """
+    A bounded history that evicts the oldest Calculation once full.
+
+    Entries are addressed by a monotonically increasing sequence number. Live
+    entries occupy the contiguous range [first, next), which makes eviction O(1)
+    and lets time-range queries binary search over sequence numbers.
+
+    Attributes:
+        capacity (Optional[int]): Maximum number of entries, or None for no limit.
+    """
+
+    def __init__(self, capacity: Optional[int] = DEFAULT_HISTORY_CAPACITY):
+        """
+        Args:
+            capacity (Optional[int]): Maximum number of entries, or None for no limit.
+
+        Raises:
+            ValueError: If capacity is not a positive number.
+        """
+        if capacity is not None and capacity <= 0:
+            raise ValueError("History capacity must be a positive number.")
+        self.capacity = capacity
+        self._entries: Dict[int, Entry] = {}
+        self._by_operation: Dict[str, deque] = {}
+        self._first = 0
+        self._next = 0
+        self._last_timestamp = 0.0
+
+    def append(self, calculation: Calculation):
+        # Clamp to the previous timestamp so the time index stays sorted
+        timestamp = max(time.time(), self._last_timestamp)
+        self._last_timestamp = timestamp
+        seq = self._next
+        self._entries[seq] = Entry(timestamp, calculation)
+        self._by_operation.setdefault(calculation.operation.__name__, deque()).append(seq)
+        self._next += 1
+        if self.capacity is not None and len(self._entries) > self.capacity:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        """Drop the oldest entry from the store and from its operation index."""
+        entry = self._entries.pop(self._first)
+        name = entry.calculation.operation.__name__
+        index = self._by_operation[name]
+        index.popleft()
+        if not index:
+            del self._by_operation[name]
+        self._first += 1
+
+    def with_capacity(self, capacity: Optional[int]) -> "HistoryStore":
+        return type(self)(capacity)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_operation.clear()
+        self._first = self._next
+
+    def latest(self) -> Optional[Calculation]:
+        if not self._entries:
+            return None
+        return self._entries[self._next - 1].calculation
+
+    def by_operation(self, name: str) -> List[Calculation]:
+        return [self._entries[seq].calculation for seq in self._by_operation.get(name, ())]
+
+    def _bisect(self, timestamp: float) -> int:
+        """Return the first live sequence number whose timestamp is >= timestamp."""
+        low, high = self._first, self._next
+        while low < high:
+            middle = (low + high) // 2
+            if self._entries[middle].timestamp < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def between(self, start: float, end: float) -> List[Calculation]:
+        first = self._bisect(start)
+        calculations = []
+        for seq in range(first, self._next):
+            entry = self._entries[seq]
+            if entry.timestamp > end:
+                break
+            calculations.append(entry.calculation)
+        return calculations
+
+    def __iter__(self) -> Iterator[Calculation]:
+        # Walk sequence numbers rather than the dict so appends during iteration are safe
+        for seq in range(self._first, self._next):
+            entry = self._entries.get(seq)
+            if entry is not None:
+                yield entry.calculation
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ColumnarHistory(HistoryStore):
+    """
+    A bounded history stored column by column instead of as Python objects.
+
+    Each entry costs one byte for its operation code, eight bytes for its
+    timestamp, sixteen bytes of offsets and the text of its two operands.
+    Reads return freshly built Calculation instances, so callers see the same
+    objects they would get from RingBufferHistory. Evicted entries are dropped
+    logically and the columns are compacted once half of them are dead.
+
+    Attributes:
+        capacity (Optional[int]): Maximum number of entries, or None for no limit.
+    """
+
+    def __init__(self, capacity: Optional[int] = DEFAULT_HISTORY_CAPACITY):
+        """
+        Args:
+            capacity (Optional[int]): Maximum number of entries, or None for no limit.
+
+        Raises:
+            ValueError: If capacity is not a positive number.
+        """
+        if capacity is not None and capacity <= 0:
+            raise ValueError("History capacity must be a positive number.")
+        self.capacity = capacity
+        self._operations: List[Callable] = []
+        self._codes: Dict[Callable, int] = {}
+        self._reset()
+
+    def _reset(self):
+        """Drop every column."""
+        self._opcodes = array("B")
+        self._timestamps = array("d")
+        self._ends = array("Q")            # end offset of a, then of b, for every entry
+        self._operands = bytearray()
+        self._by_operation: Dict[int, array] = {}
+        self._operation_heads: Dict[int, int] = {}
+        self._base = 0                     # sequence number of physical row 0
+        self._head = 0                     # physical rows before this one are evicted
+
+    def _code_for(self, operation: Callable) -> int:
+        """Return the one-byte code for an operation, assigning one if needed."""
+        code = self._codes.get(operation)
+        if code is None:
+            if len(self._operations) > 255:
+                raise ValueError("ColumnarHistory supports at most 256 distinct operations.")
+            code = len(self._operations)
+            self._operations.append(operation)
+            self._codes[operation] = code
+        return code
+
+    def append(self, calculation: Calculation):
+        code = self._code_for(calculation.operation)
+        last = self._timestamps[-1] if self._timestamps else 0.0
+        self._timestamps.append(max(time.time(), last))
+        self._opcodes.append(code)
+        self._operands += str(calculation.a).encode("ascii")
+        self._ends.append(len(self._operands))
+        self._operands += str(calculation.b).encode("ascii")
+        self._ends.append(len(self._operands))
+        self._by_operation.setdefault(code, array("Q")).append(self._base + len(self._opcodes) - 1)
+        if self.capacity is not None and len(self) > self.capacity:
+            evicted = self._opcodes[self._head]
+            self._operation_heads[evicted] = self._operation_heads.get(evicted, 0) + 1
+            self._head += 1
+            if self._head >= len(self._opcodes) // 2:
+                self._compact()
+
+    def _compact(self):
+        """Physically remove evicted rows from every column."""
+        cut = self._head
+        byte_cut = self._ends[2 * cut - 1]
+        del self._opcodes[:cut]
+        del self._timestamps[:cut]
+        self._ends = array("Q", (end - byte_cut for end in self._ends[2 * cut:]))
+        del self._operands[:byte_cut]
+        for code, heads in self._operation_heads.items():
+            del self._by_operation[code][:heads]
+        self._operation_heads.clear()
+        self._base += cut
+        self._head = 0
+
+    def _view(self, row: int) -> Calculation:
+        """Build a Calculation for a physical row."""
+        start = self._ends[2 * row - 1] if row else 0
+        middle, end = self._ends[2 * row], self._ends[2 * row + 1]
+        buffer = memoryview(self._operands)
+        return Calculation(Decimal(str(buffer[start:middle], "ascii")),
+                           Decimal(str(buffer[middle:end], "ascii")),
+                           self._operations[self._opcodes[row]])
+
+    def with_capacity(self, capacity: Optional[int]) -> "HistoryStore":
+        return type(self)(capacity)
+
+    def clear(self):
+        self._reset()
+
+    def latest(self) -> Optional[Calculation]:
+        if not len(self):
+            return None
+        return self._view(len(self._opcodes) - 1)
+
+    def by_operation(self, name: str) -> List[Calculation]:
+        calculations = []
+        for code, operation in enumerate(self._operations):
+            if operation.__name__ != name or code not in self._by_operation:
+                continue
+            index = self._by_operation[code]
+            for seq in index[self._operation_heads.get(code, 0):]:
+                calculations.append(self._view(seq - self._base))
+        return calculations
+
+    def between(self, start: float, end: float) -> List[Calculation]:
+        first = bisect_left(self._timestamps, start, self._head)
+        last = bisect_right(self._timestamps, end, first)
+        return [self._view(row) for row in range(first, last)]
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for seq in range(self._base + self._head, self._base + len(self._opcodes)):
+            row = seq - self._base
+            if self._head <= row < len(self._opcodes):
+                yield self._view(row)
+
+    def __len__(self) -> int:
+        return len(self._opcodes) - self._head
+
+
+HISTORY_BACKENDS = {
+    "ring": RingBufferHistory,
+    "columnar": ColumnarHistory,
+}
+
+
+def create_history(backend: str = "ring", capacity: Optional[int] = DEFAULT_HISTORY_CAPACITY) -> HistoryStore:
+    """
+    Build an empty history store.
+
+    Args:
+        backend (str): One of 'ring' or 'columnar'.
+        capacity (Optional[int]): Maximum number of entries, or None for no limit.
+
+    Returns:
+        HistoryStore: The new store.
+
+    Raises:
+        ValueError: If the backend is not recognised.
+    """
+    store_class = HISTORY_BACKENDS.get(backend)
+    if store_class is None:
+        raise ValueError(f"Unknown history backend: {backend}. Choose from {', '.join(HISTORY_BACKENDS)}.")
+    return store_class(capacity)
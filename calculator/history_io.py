@@ -0,0 +1,269 @@
+"""
+History I/O Module
+
+This module checkpoints the calculations history to a file and restores it,
+streaming in chunks so a multi-million entry history is never held as a list.
+
+export_history walks the store lazily and writes each calculation with its
+result through an output sink (see calculator.sinks). The columnar format is the
+default; CSV and JSON lines are also available. The file can be compressed:
+zstd when the standard library provides it (compression.zstd, Python 3.14+),
+otherwise gzip.
+
+read_history yields the rows of an exported file (or of a batch results file)
+in chunks. The format and compression are detected from the file's first bytes.
+import_history appends the rows to a history store. replay re-executes the rows
+on the worker pool, a bounded window of chunks at a time, and reports every
+recomputed result that differs from the recorded one.
+
+Timestamps are not exported; imported entries are stamped when they are appended.
+"""
+
+import csv
+import gzip
+import io
+import json
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Executor
+from decimal import Context, Decimal, getcontext, localcontext
+from itertools import chain, islice
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from calculator.calculation import Calculation
+from calculator.calculations import calculations
+from calculator.codec import OPERATIONS
+from calculator.executor import InlineExecutor
+from calculator.history import HistoryStore
+from calculator.sinks import DEFAULT_SINK_CHUNK, MAGIC, Row, SINKS, open_sink, read_columnar
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+COMPRESSIONS = ("auto", "none", "gzip", "zstd")
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_REPLAY_WINDOW = 8
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+Mismatch = namedtuple("Mismatch", ["index", "row", "replayed"])
+ReplayReport = namedtuple("ReplayReport", ["records", "mismatches", "examples", "elapsed", "throughput"])
+
+_OPERATIONS = {operation.__name__: operation for operation in OPERATIONS}
+
+
+def _open_write(path: str, compression: str) -> BinaryIO:
+    """Open `path` for binary writing through the requested compressor."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Choose from {', '.join(COMPRESSIONS)}.")
+    if compression == "auto":
+        compression = "gzip" if zstd is None else "zstd"
+    if compression == "zstd":
+        if zstd is None:
+            raise ValueError("zstd compression needs the compression.zstd module (Python 3.14+).")
+        return zstd.open(path, "wb")
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=DEFAULT_GZIP_LEVEL)
+    return open(path, "wb")  # pylint: disable=consider-using-with
+
+
+def _open_read(path: str) -> BinaryIO:
+    """Open `path` for binary reading, decompressing according to its magic bytes."""
+    with open(path, "rb") as probe:
+        magic = probe.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, "rb")
+    if magic == ZSTD_MAGIC:
+        if zstd is None:
+            raise ValueError(f"{path} is zstd-compressed, which needs the compression.zstd module (Python 3.14+).")
+        return zstd.open(path, "rb")
+    return open(path, "rb")  # pylint: disable=consider-using-with
+
+
+def history_rows(store: Iterable[Calculation]) -> Iterator[tuple]:
+    """
+    Turn calculations into (operation, a, b, result, error) rows, recomputing each result.
+
+    This is the one row format for history exports, used by export_history and Calculations.export.
+    """
+    for calculation in store:
+        try:
+            result, error = calculation.operate(), None
+        except Exception as e:  # pylint: disable=broad-except
+            result, error = None, str(e)
+        yield calculation.operation.__name__, calculation.a, calculation.b, result, error
+
+
+def export_history(path: str, store: Optional[HistoryStore] = None, output_format: str = "columnar",
+                   compression: str = "auto", chunk_size: int = DEFAULT_SINK_CHUNK) -> int:
+    """
+    Write a history store to a file, a chunk at a time.
+
+    Args:
+        path (str): The file to write.
+        store (Optional[HistoryStore]): The store to export; defaults to the calculations history.
+        output_format (str): One of calculator.sinks.SINKS.
+        compression (str): 'auto' (zstd if available, else gzip), 'none', 'gzip' or 'zstd'.
+        chunk_size (int): Rows encoded and written per chunk.
+
+    Returns:
+        int: The number of calculations written.
+
+    Raises:
+        ValueError: If the format or compression is unknown or unavailable.
+    """
+    if output_format not in SINKS:
+        raise ValueError(f"Unknown output format: {output_format}. Choose from {', '.join(SINKS)}.")
+    if store is None:
+        store = calculations.history
+    with _open_write(path, compression) as binary:
+        stream = binary if SINKS[output_format].binary else io.TextIOWrapper(binary, "utf-8", newline="")
+        with open_sink(output_format, stream, chunk_size) as sink:
+            sink.write_rows(history_rows(store))
+        if stream is not binary:
+            stream.detach()  # leave the compressed stream for the outer `with` to close
+    return sink.rows
+
+
+def _optional(value: Optional[str]) -> Optional[str]:
+    return value if value else None
+
+
+def _read_rows(binary: BinaryIO) -> Iterator[Row]:
+    """Yield the rows of a decompressed stream in the columnar, CSV or JSON-lines format."""
+    if binary.peek(len(MAGIC))[:len(MAGIC)] == MAGIC:
+        yield from read_columnar(binary)
+        return
+    text = io.TextIOWrapper(binary, "utf-8", newline="")
+    first = text.readline()
+    if first.startswith("{"):
+        for line in chain([first], text):
+            if line.strip():
+                document = json.loads(line)
+                yield Row(document["operation"], document["a"], document["b"], document["result"],
+                          document["error"])
+    elif first.rstrip("\r\n") == ",".join(Row._fields):
+        for operation, a, b, result, error in csv.reader(text):
+            yield Row(operation, _optional(a), _optional(b), _optional(result), _optional(error))
+    else:
+        raise ValueError("Not an exported history: expected columnar, CSV or JSON lines.")
+
+
+def read_history(path: str, chunk_size: int = DEFAULT_SINK_CHUNK) -> Iterator[List[Row]]:
+    """
+    Yield the rows of an exported history (or batch results) file in chunks.
+
+    Values are strings, or None where missing.
+
+    Raises:
+        ValueError: If the file is not in a readable format.
+    """
+    with _open_read(path) as binary:
+        rows = _read_rows(binary)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _calculation(row: Row) -> Calculation:
+    operation = _OPERATIONS.get(row.operation)
+    if operation is None or row.a is None:
+        raise ValueError(f"Cannot import history row: {row}")
+    return Calculation(Decimal(row.a), Decimal(row.b), operation)
+
+
+def import_history(path: str, store: Optional[HistoryStore] = None, chunk_size: int = DEFAULT_SINK_CHUNK) -> int:
+    """
+    Append the calculations of an exported file to a history store, a chunk at a time.
+
+    A bounded store keeps only its newest `capacity` entries, as with live appends.
+
+    Args:
+        path (str): The exported file.
+        store (Optional[HistoryStore]): The store to fill; defaults to the calculations history.
+        chunk_size (int): Rows read per chunk.
+
+    Returns:
+        int: The number of calculations appended.
+
+    Raises:
+        ValueError: If the file is unreadable or holds an operation the history cannot store.
+    """
+    if store is None:
+        store = calculations.history
+    count = 0
+    for chunk in read_history(path, chunk_size):
+        for row in chunk:
+            store.append(_calculation(row))
+        count += len(chunk)
+    return count
+
+
+def replay_chunk(rows: List[Row], context: Optional[Context] = None) -> List[tuple]:
+    """
+    Recompute a chunk of rows and return (position, replayed) for each one whose result or error differs.
+
+    This runs on the worker pool during replay.
+    """
+    mismatches = []
+    with localcontext(context or getcontext()):
+        for position, row in enumerate(rows):
+            try:
+                replayed = str(_calculation(row).operate())
+                recorded = row.result
+            except Exception as e:  # pylint: disable=broad-except
+                replayed, recorded = str(e), row.error
+            if replayed != recorded:
+                mismatches.append((position, replayed))
+    return mismatches
+
+
+def replay(path: str, executor: Optional[Executor] = None, chunk_size: int = DEFAULT_SINK_CHUNK,
+           window: int = DEFAULT_REPLAY_WINDOW, context: Optional[Context] = None,
+           max_examples: int = 10) -> ReplayReport:
+    """
+    Re-execute an exported history on a worker pool and compare every result with the recorded one.
+
+    Results are compared as text, so a result that is numerically equal but written differently
+    (e.g. under another precision) counts as a mismatch.
+
+    Args:
+        path (str): The exported file.
+        executor (Optional[Executor]): Where chunks run; defaults to inline execution.
+        chunk_size (int): Rows per task.
+        window (int): Maximum number of chunks in flight at once.
+        context (Optional[Context]): The decimal context to replay under; defaults to the caller's.
+        max_examples (int): Mismatches kept in the report.
+
+    Returns:
+        ReplayReport: Records checked, number of mismatches, the first mismatches, elapsed seconds
+        and records per second.
+    """
+    executor = executor or InlineExecutor()
+    context = context or getcontext()
+    started = time.perf_counter()
+    records = mismatches = 0
+    examples: List[Mismatch] = []
+    pending = deque()  # (offset of the chunk's first row, chunk, future)
+
+    def collect():
+        nonlocal mismatches
+        offset, chunk, future = pending.popleft()
+        for position, replayed in future.result():
+            mismatches += 1
+            if len(examples) < max_examples:
+                examples.append(Mismatch(offset + position, chunk[position], replayed))
+
+    for chunk in read_history(path, chunk_size):
+        pending.append((records, chunk, executor.submit(replay_chunk, chunk, context)))
+        records += len(chunk)
+        while len(pending) >= window:
+            collect()
+    while pending:
+        collect()
+    elapsed = time.perf_counter() - started
+    return ReplayReport(records, mismatches, examples, elapsed, records / elapsed if elapsed > 0 else 0.0)
@@ -0,0 +1,350 @@
+"""
+History Log Module
+
+This module provides a durable history backend: an append-only binary log of
+fixed-width records that survives restarts.
+
+Opening a log never parses it. The number of entries follows from the file size,
+and records are read on demand through a read-only memory map. A partial record
+left at the end by a crash is truncated on open. Because every record has the
+same width, the latest entry, time-range queries and raw record ranges are served
+straight from the map without copying the file. Operation queries search an
+index of the one-byte opcode column. The index is copied out of the map through a
+strided memoryview on the first query, then extended as records are appended.
+
+Appends are buffered and written with one fsync per group of records (group
+commit), instead of one fsync per calculation. Buffered records are committed
+when the log is closed, and open logs are closed at interpreter exit.
+
+Every calculation can be stored. One whose operands are wider than the record's
+fields, or whose operation is not a built-in one, is written as an escape record
+(opcode ESCAPE_CODE). An escape record points to a variable-length entry in a
+side file next to the log (`<path>.overflow`). That entry holds the operation's
+name, its import reference (`module:qualname`) and the operands as text. The side
+file is committed before the log records that point into it. On read, the
+operation is imported again. If that fails (a lambda, a local function, or a
+plugin that is no longer installed), a stand-in with the same name is returned.
+The stand-in raises ValueError when operated.
+"""
+
+import atexit
+import importlib
+import mmap
+import os
+import struct
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional
+
+from calculator.calculation import Calculation
+from calculator.codec import (OPERAND_WIDTH, OPERATIONS, decode_decimal, encode_decimal,
+                              operation_code, operation_for)
+from calculator.history import HistoryStore
+
+MAGIC = b"CALCLOG1"
+HEADER = struct.Struct("<8sII")          # magic, record size, reserved
+RECORD = struct.Struct(f"<dB7x{OPERAND_WIDTH}s{OPERAND_WIDTH}s")  # timestamp, opcode, a, b
+OPCODE_OFFSET = 8
+ESCAPE_CODE = 255
+OVERFLOW_SUFFIX = ".overflow"
+OVERFLOW_POINTER = struct.Struct("<QI")  # offset and length of the entry, stored in the a field
+OVERFLOW_SEPARATOR = "\0"
+
+
+def _reference(operation: Callable) -> str:
+    """Return the import reference of an operation, e.g. 'calculator.plugins.power:PowerCommand.compute'."""
+    return f"{getattr(operation, '__module__', '')}:{getattr(operation, '__qualname__', '')}"
+
+
+def _resolve(reference: str, name: str) -> Callable:
+    """Import an operation by reference, or build a stand-in that reports it as unavailable."""
+    module_name, _, qualname = reference.partition(":")
+    try:
+        if "<" in qualname:
+            raise ImportError(qualname)
+        target = importlib.import_module(module_name)
+        for attribute in qualname.split("."):
+            target = getattr(target, attribute)
+        return target
+    except (ImportError, AttributeError, ValueError):
+        pass
+
+    def unavailable(a, b):
+        raise ValueError(f"Operation {name} ({reference}) is not available in this process.")
+    unavailable.__name__ = name
+    return unavailable
+
+
+class MappedLogHistory(HistoryStore):
+    """
+    A persistent, append-only history read back through mmap.
+
+    Attributes:
+        path (str): The log file.
+        sync_every (int): Number of buffered records that triggers a group commit.
+        sync_interval (float): Seconds after which buffered records are committed on the next append.
+    """
+
+    def __init__(self, path: str, sync_every: int = 256, sync_interval: float = 1.0):
+        """
+        Open (or create) a history log.
+
+        Args:
+            path (str): The log file.
+            sync_every (int): Number of buffered records that triggers a group commit.
+            sync_interval (float): Maximum age in seconds of buffered records before a commit.
+
+        Raises:
+            ValueError: If the file exists but is not a compatible history log.
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = open(path, "a+b")  # pylint: disable=consider-using-with
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.write(HEADER.pack(MAGIC, RECORD.size, 0))
+            self._sync()
+            size = HEADER.size
+        else:
+            self._file.seek(0)
+            header = self._file.read(HEADER.size)
+            magic, record_size, _ = HEADER.unpack(header) if len(header) == HEADER.size else (None, None, None)
+            if magic != MAGIC or record_size != RECORD.size:
+                self._file.close()
+                raise ValueError(f"{path} is not a compatible history log.")
+        self._on_disk = (size - HEADER.size) // RECORD.size
+        if size != HEADER.size + self._on_disk * RECORD.size:
+            # A crash left part of a record; appends would land out of alignment after it
+            self._file.truncate(HEADER.size + self._on_disk * RECORD.size)
+            self._sync()
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._last_sync = time.monotonic()
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+        self._last_timestamp = self._timestamp(self._on_disk - 1) if self._on_disk else 0.0
+        # The overflow side file is only opened once an escape record is written or read
+        self._overflow = None
+        self._overflow_path = path + OVERFLOW_SUFFIX
+        self._overflow_on_disk = os.path.getsize(self._overflow_path) if os.path.exists(self._overflow_path) else 0
+        self._overflow_pending = bytearray()
+        self._operations: Dict[str, Callable] = {}
+        self._opcode_index: Optional[bytearray] = None
+        if self._overflow_on_disk:
+            self._truncate_overflow()
+        atexit.register(self.close)
+
+    def _truncate_overflow(self):
+        """Drop overflow bytes that no committed record points to, such as an entry cut short by a crash."""
+        last = self._opcodes().rfind(ESCAPE_CODE)
+        end = 0
+        if last != -1:
+            offset, length = OVERFLOW_POINTER.unpack_from(RECORD.unpack_from(*self._raw(last))[2])
+            end = offset + length
+        if end < self._overflow_on_disk:
+            overflow = self._overflow_file()
+            overflow.truncate(end)
+            overflow.flush()
+            os.fsync(overflow.fileno())
+            self._overflow_on_disk = end
+
+    def _sync(self):
+        """Flush Python buffers and fsync the log file."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def _overflow_file(self):
+        if self._overflow is None:
+            self._overflow = open(self._overflow_path, "a+b")  # pylint: disable=consider-using-with
+        return self._overflow
+
+    def flush(self):
+        """
+        Commit buffered records to disk with a single write and fsync.
+
+        Overflow entries are committed first, so a committed record never points past the side file.
+        """
+        if not self._pending_count:
+            return
+        if self._overflow_pending:
+            overflow = self._overflow_file()
+            overflow.write(self._overflow_pending)
+            overflow.flush()
+            os.fsync(overflow.fileno())
+            self._overflow_on_disk += len(self._overflow_pending)
+            self._overflow_pending.clear()
+        self._file.write(self._pending)
+        self._sync()
+        self._on_disk += self._pending_count
+        self._pending.clear()
+        self._pending_count = 0
+
+    def close(self):
+        """
+        Commit buffered records and close the log.
+        """
+        if self._file.closed:
+            return
+        atexit.unregister(self.close)
+        self.flush()
+        self._map = None
+        self._file.close()
+        if self._overflow is not None:
+            self._overflow.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _view(self) -> memoryview:
+        """Return a memoryview over every committed record, remapping if the file grew."""
+        if self._map is None or self._mapped != self._on_disk:
+            # Older maps are released once no views into them remain
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = self._on_disk
+        return memoryview(self._map)[HEADER.size:HEADER.size + self._on_disk * RECORD.size]
+
+    def _raw(self, index: int):
+        """Return (buffer, offset) locating a record on disk or in the pending buffer."""
+        if index < self._on_disk:
+            return self._view(), index * RECORD.size
+        return self._pending, (index - self._on_disk) * RECORD.size
+
+    def _timestamp(self, index: int) -> float:
+        buffer, offset = self._raw(index)
+        return struct.unpack_from("<d", buffer, offset)[0]
+
+    def _overflow_entry(self, pointer) -> List[str]:
+        """Read the [name, reference, a, b] fields of the overflow entry an escape record points to."""
+        offset, length = OVERFLOW_POINTER.unpack_from(pointer)
+        if offset >= self._overflow_on_disk:
+            start = offset - self._overflow_on_disk
+            data = bytes(self._overflow_pending[start:start + length])
+        else:
+            overflow = self._overflow_file()
+            overflow.seek(offset)
+            data = overflow.read(length)
+        return data.decode("utf-8").split(OVERFLOW_SEPARATOR)
+
+    def _calculation(self, index: int) -> Calculation:
+        buffer, offset = self._raw(index)
+        _, code, a, b = RECORD.unpack_from(buffer, offset)
+        if code != ESCAPE_CODE:
+            return Calculation(decode_decimal(a), decode_decimal(b), operation_for(code))
+        name, reference, a, b = self._overflow_entry(a)
+        operation = self._operations.get(reference)
+        if operation is None:
+            operation = self._operations[reference] = _resolve(reference, name)
+        return Calculation(Decimal(a), Decimal(b), operation)
+
+    def _escape(self, calculation: Calculation) -> tuple:
+        """Queue an overflow entry for the calculation and return its escape record's fields."""
+        operation = calculation.operation
+        name = getattr(operation, "__name__", repr(operation))
+        entry = OVERFLOW_SEPARATOR.join((name, _reference(operation), str(calculation.a),
+                                         str(calculation.b))).encode("utf-8")
+        pointer = OVERFLOW_POINTER.pack(self._overflow_on_disk + len(self._overflow_pending), len(entry))
+        self._overflow_pending += entry
+        return ESCAPE_CODE, pointer, b""
+
+    def append(self, calculation: Calculation):
+        timestamp = max(time.time(), self._last_timestamp)
+        self._last_timestamp = timestamp
+        try:
+            fields = (operation_code(calculation.operation), encode_decimal(calculation.a),
+                      encode_decimal(calculation.b))
+        except ValueError:
+            fields = self._escape(calculation)
+        self._pending += RECORD.pack(timestamp, *fields)
+        self._pending_count += 1
+        if self._opcode_index is not None:
+            self._opcode_index.append(fields[0])
+        if self._pending_count >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.flush()
+
+    def clear(self):
+        self._pending.clear()
+        self._pending_count = 0
+        self._map = None
+        self._file.truncate(HEADER.size)
+        self._sync()
+        self._on_disk = 0
+        self._opcode_index = None
+        self._overflow_pending.clear()
+        if self._overflow_on_disk:
+            self._overflow_file().truncate(0)
+            self._overflow_on_disk = 0
+
+    def latest(self) -> Optional[Calculation]:
+        if not len(self):
+            return None
+        return self._calculation(len(self) - 1)
+
+    def _opcodes(self) -> bytearray:
+        """Return the opcode index of every record, committed and pending, building it on first use."""
+        if self._opcode_index is None:
+            index = bytearray(self._view()[OPCODE_OFFSET::RECORD.size].tobytes() if self._on_disk else b"")
+            index += memoryview(self._pending)[OPCODE_OFFSET::RECORD.size].tobytes()
+            self._opcode_index = index
+        return self._opcode_index
+
+    def by_operation(self, name: str) -> List[Calculation]:
+        codes = [code for code, operation in enumerate(OPERATIONS) if operation.__name__ == name]
+        opcodes = self._opcodes()
+        indexes = []
+        # Escape records hold operands too wide for the fields or operations without a code
+        for target in (bytes(codes[:1]) if codes else None, bytes([ESCAPE_CODE])):
+            if target is None:
+                continue
+            index = opcodes.find(target)
+            while index != -1:
+                indexes.append(index)
+                index = opcodes.find(target, index + 1)
+        calculations = [self._calculation(index) for index in sorted(indexes)]
+        return [calculation for calculation in calculations if calculation.operation.__name__ == name]
+
+    def _bisect(self, timestamp: float) -> int:
+        """Return the first record index whose timestamp is >= timestamp."""
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def between(self, start: float, end: float) -> List[Calculation]:
+        calculations = []
+        for index in range(self._bisect(start), len(self)):
+            if self._timestamp(index) > end:
+                break
+            calculations.append(self._calculation(index))
+        return calculations
+
+    def raw_range(self, start: int, stop: int) -> memoryview:
+        """
+        Return committed records [start, stop) as a zero-copy view of the mapped file.
+
+        Args:
+            start (int): The first record index.
+            stop (int): One past the last record index.
+
+        Returns:
+            memoryview: The raw fixed-width records; decode them with RECORD.unpack_from.
+            Records with opcode ESCAPE_CODE point into the overflow side file instead.
+        """
+        self.flush()
+        stop = min(stop, self._on_disk)
+        return self._view()[start * RECORD.size:stop * RECORD.size]
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for index in range(len(self)):
+            yield self._calculation(index)
+
+    def __len__(self) -> int:
+        return self._on_disk + self._pending_count
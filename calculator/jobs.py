@@ -0,0 +1,164 @@
+"""
+Jobs Module
+
+This module provides an asyncio engine that accepts calculations without waiting
+for them to finish. Each submitted calculation becomes a Job with an id that is
+returned immediately; the work runs through the scheduler (inline for cheap
+commands, on the worker pool for expensive ones) and a callback fires when it
+completes. Many jobs can be in flight at once, so a slow high-precision
+operation no longer blocks the next command.
+"""
+
+import asyncio
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, List, Optional
+
+from calculator.cache import MISSING, get_result_cache
+from calculator.command_registry import command_registry
+from calculator.scheduler import Scheduler, get_scheduler
+
+
+class JobRejected(ValueError):
+    """Raised for submissions that never reach a command (bad numbers or unknown operations)."""
+
+
+class Job:
+    """
+    A submitted calculation.
+
+    Attributes:
+        id (int): The job id.
+        operation (str): The command name.
+        value1 (str): The first operand as entered.
+        value2 (str): The second operand as entered.
+        future (asyncio.Future): Resolves to the result or raises the command's error.
+    """
+
+    def __init__(self, job_id: int, operation: str, value1: str, value2: str, future: asyncio.Future):
+        self.id = job_id
+        self.operation = operation
+        self.value1 = value1
+        self.value2 = value2
+        self.future = future
+
+    @property
+    def status(self) -> str:
+        """'running', 'done' or 'failed'."""
+        if not self.future.done():
+            return "running"
+        return "failed" if self.future.exception() is not None else "done"
+
+    def describe(self) -> str:
+        """
+        Describe the job's outcome in the same words as the synchronous REPL.
+        """
+        if not self.future.done():
+            return f"{self.operation} {self.value1} {self.value2} is still running"
+        error = self.future.exception()
+        if isinstance(error, JobRejected):
+            return str(error)
+        if error is not None:
+            return f"An error occurred: {error}"
+        return f"The result of {self.value1} {self.operation} {self.value2} is {self.future.result()}"
+
+
+class AsyncEngine:
+    """
+    Submit calculations and track them as jobs on the running event loop.
+
+    Attributes:
+        on_complete (Optional[Callable[[Job], None]]): Called on the event loop as each job finishes.
+    """
+
+    def __init__(self, scheduler: Optional[Scheduler] = None, on_complete: Optional[Callable[[Job], None]] = None):
+        """
+        Args:
+            scheduler (Optional[Scheduler]): Defaults to the shared scheduler.
+            on_complete (Optional[Callable[[Job], None]]): Completion callback.
+        """
+        self._scheduler = scheduler
+        self.on_complete = on_complete
+        self._jobs: Dict[int, Job] = {}
+        self._next_id = 1
+
+    def submit(self, operation: str, value1: str, value2: str) -> Job:
+        """
+        Start a calculation and return its Job immediately.
+
+        Invalid input produces a job that has already failed, so every
+        submission can be waited on the same way.
+
+        Args:
+            operation (str): The command name.
+            value1 (str): The first operand.
+            value2 (str): The second operand.
+
+        Returns:
+            Job: The new job.
+        """
+        loop = asyncio.get_running_loop()
+        job = Job(self._next_id, operation, value1, value2, loop.create_future())
+        self._next_id += 1
+        self._jobs[job.id] = job
+        try:
+            job.future = self._start(operation, Decimal(value1), Decimal(value2), loop)
+        except InvalidOperation:
+            job.future.set_exception(JobRejected(f"Invalid input: {value1} or {value2} is not a valid number."))
+        except Exception as e:  # pylint: disable=broad-except
+            job.future.set_exception(e)
+        if self.on_complete is not None:
+            job.future.add_done_callback(lambda _: self.on_complete(job))
+        return job
+
+    def _start(self, operation: str, a: Decimal, b: Decimal, loop) -> asyncio.Future:
+        """Resolve and schedule the command, consulting the result cache first."""
+        cache = get_result_cache()
+        key = cache.make_key(operation, a, b) if cache is not None else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not MISSING:
+                future = loop.create_future()
+                future.set_result(cached)
+                return future
+        command_class = command_registry.get(operation)
+        if not command_class:
+            raise JobRejected(f"Invalid operation type: {operation}")
+        scheduler = self._scheduler or get_scheduler()
+        future = asyncio.wrap_future(scheduler.submit(command_class(a, b), name=operation), loop=loop)
+        if cache is not None:
+            def remember(done):
+                if not done.cancelled() and done.exception() is None:
+                    cache.put(key, done.result())
+            future.add_done_callback(remember)
+        return future
+
+    async def wait(self, job_id: int) -> Job:
+        """
+        Wait for a job to finish.
+
+        Args:
+            job_id (int): The job id.
+
+        Returns:
+            Job: The finished job.
+
+        Raises:
+            KeyError: If there is no job with that id.
+        """
+        job = self._jobs[job_id]
+        await asyncio.wait([job.future])
+        return job
+
+    async def wait_all(self):
+        """
+        Wait for every job that is still running.
+        """
+        running = [job.future for job in self._jobs.values() if not job.future.done()]
+        if running:
+            await asyncio.wait(running)
+
+    def jobs(self) -> List[Job]:
+        """
+        Return every job submitted so far, oldest first.
+        """
+        return list(self._jobs.values())
@@ -0,0 +1,173 @@
+"""
+Log Pipeline Module
+
+This module keeps log I/O off the calculation hot path.
+
+In queue mode the root logger's handlers (the rotating file and the console
+from logging.conf) are moved behind a QueueListener running on a background
+thread. The calling thread only puts the LogRecord on an in-memory queue. The
+message is not formatted there either: records are enqueued with their %-style
+arguments and formatted by the listener. Log with lazy arguments, e.g.
+logger.info("%s = %s", a, b), not f-strings, so that disabled levels and
+sampled-out records cost nothing. Arguments should be immutable (Decimals,
+strings, numbers), because they are formatted after the call returns.
+
+Per-calculation events go to the EVENTS_LOGGER logger. A SamplingFilter on it
+keeps one in every N records below WARNING. Warnings and errors are always
+kept.
+
+The "json" format writes one JSON object per line, for log shippers and other
+structured consumers.
+
+A DeferredHandler stands in for the real handlers during fast starts. Reading
+logging.conf, creating the logs directory and opening files only happen once a
+record actually has to be written.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import queue
+from typing import Callable, Optional
+
+EVENTS_LOGGER = "calculator.events"
+LOG_MODES = ("sync", "queue")
+LOG_FORMATS = ("text", "json")
+
+_listener = None  # the running logging.handlers.QueueListener, if any
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in every `rate` records below `always_level`; keep every record at or above it.
+    """
+
+    def __init__(self, rate: int, always_level: int = logging.WARNING):
+        super().__init__()
+        if rate < 1:
+            raise ValueError(f"Sampling rate must be at least 1, got {rate}")
+        self.rate = rate
+        self.always_level = always_level
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.always_level or next(self._counter) % self.rate == 0
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Format each record as one JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return json.dumps(document, default=str)
+
+
+def _lazy_queue_handler(records: queue.SimpleQueue) -> logging.Handler:
+    """
+    A QueueHandler for an in-process queue. Records are enqueued unformatted.
+
+    The standard QueueHandler formats the message in the calling thread so the
+    record can be pickled. An in-process queue needs no pickling, so formatting
+    is left to the listener thread.
+    """
+    from logging.handlers import QueueHandler  # pylint: disable=import-outside-toplevel
+    handler = QueueHandler(records)
+    handler.prepare = lambda record: record
+    return handler
+
+
+class DeferredHandler(logging.Handler):
+    """
+    A placeholder root handler that builds the real handlers when the first record reaches it.
+
+    The root logger's level is kept across the configuration, so a fast start keeps logging
+    warnings and errors only.
+
+    Args:
+        configure (Callable[[], None]): Installs the real handlers on the root logger.
+    """
+
+    def __init__(self, configure: Callable[[], None]):
+        super().__init__()
+        self._configure = configure
+
+    def emit(self, record: logging.LogRecord):
+        root = logging.getLogger()
+        # A fresh list: the logger is still iterating over the current one
+        root.handlers = [handler for handler in root.handlers if handler is not self]
+        level = root.level
+        self._configure()
+        # fileConfig and basicConfig reset the root level; keep the fast start's threshold
+        root.setLevel(level)
+        for handler in root.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def stop_queue_logging():
+    """
+    Flush the queue and stop the listener thread, restoring its handlers on the root logger.
+    """
+    global _listener  # pylint: disable=global-statement
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if getattr(handler, "queue", None) is listener.queue:
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
+def configure_pipeline(mode: str = "sync", log_format: str = "text", sample_rate: int = 1):
+    """
+    Rearrange the handlers already installed on the root logger.
+
+    Args:
+        mode (str): 'sync' writes in the calling thread; 'queue' hands records to a background thread.
+        log_format (str): 'text' keeps the configured formatters; 'json' writes JSON lines.
+        sample_rate (int): Keep one in every `sample_rate` per-calculation events below WARNING.
+
+    Raises:
+        ValueError: If the mode, format or rate is invalid.
+    """
+    global _listener  # pylint: disable=global-statement
+    if mode not in LOG_MODES:
+        raise ValueError(f"Unknown log mode: {mode}. Choose from {', '.join(LOG_MODES)}.")
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format}. Choose from {', '.join(LOG_FORMATS)}.")
+    events = logging.getLogger(EVENTS_LOGGER)
+    for existing in [item for item in events.filters if isinstance(item, SamplingFilter)]:
+        events.removeFilter(existing)
+    if sample_rate != 1:
+        events.addFilter(SamplingFilter(sample_rate))
+
+    stop_queue_logging()
+    root = logging.getLogger()
+    if log_format == "json":
+        for handler in root.handlers:
+            handler.setFormatter(JsonLinesFormatter())
+    if mode == "queue":
+        from logging.handlers import QueueListener  # pylint: disable=import-outside-toplevel
+        handlers = list(root.handlers)
+        records = queue.SimpleQueue()
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(_lazy_queue_handler(records))
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+atexit.register(stop_queue_logging)
@@ -0,0 +1,268 @@
+"""
+Metrics Module
+
+This module keeps in-process counters and latency histograms for the hot paths,
+labelled by command name. A calculation is broken into stages:
+    - parse:       converting the operands to Decimal
+    - lookup:      resolving the command in the registry
+    - queue_wait:  from submission until a worker starts the command
+    - spawn:       like queue_wait, for the first command a new worker process
+                   runs (dominated by starting the process)
+    - execute:     running the command
+    - transfer:    from the worker finishing until the caller has the result
+
+Metrics can be printed in the REPL or exported in the Prometheus text format.
+They are disabled by default. While disabled, get_metrics() returns a registry
+whose methods do nothing, so instrumented code pays only a few no-op calls.
+"""
+
+import atexit
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+STAGES = ("parse", "lookup", "queue_wait", "spawn", "execute", "transfer")
+# Upper bounds in seconds, from 1 microsecond to 10 seconds
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNTER_HELP = {
+    "requests": "Calculations requested.",
+    "errors": "Calculations that failed.",
+    "cache_hits": "Calculations answered from the result cache.",
+}
+
+
+class Histogram:
+    """
+    A fixed-bucket latency histogram.
+
+    Attributes:
+        bounds (Tuple[float, ...]): Bucket upper bounds in seconds.
+        counts (List[int]): Observations per bucket; the last entry counts values above every bound.
+        total (float): Sum of all observations.
+        count (int): Number of observations.
+    """
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+
+class Stopwatch:
+    """
+    Times consecutive stages of one calculation and records them when it finishes.
+    """
+
+    __slots__ = ("_metrics", "_last", "_laps", "_counts")
+
+    def __init__(self, metrics: "MetricsRegistry"):
+        self._metrics = metrics
+        self._last = time.perf_counter()
+        self._laps: List[Tuple[str, float]] = []
+        self._counts: List[str] = []
+
+    def lap(self, stage: str):
+        """Record the time since the previous lap (or the start) under `stage`."""
+        now = time.perf_counter()
+        self._laps.append((stage, now - self._last))
+        self._last = now
+
+    def count(self, counter: str):
+        """Increment a counter once the command name is known."""
+        self._counts.append(counter)
+
+    def finish(self, command: str):
+        """Record every lap and counter under the command name."""
+        for stage, seconds in self._laps:
+            self._metrics.observe(stage, command, seconds)
+        for counter in self._counts:
+            self._metrics.increment(counter, command)
+
+
+class _NullStopwatch:
+    __slots__ = ()
+
+    def lap(self, stage: str):
+        pass
+
+    def count(self, counter: str):
+        pass
+
+    def finish(self, command: str):
+        pass
+
+
+class MetricsRegistry:
+    """
+    Counters and stage histograms, labelled by command name. Safe to update from several threads.
+
+    Attributes:
+        enabled (bool): Always True; see NullMetrics for the disabled registry.
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def stopwatch(self) -> Stopwatch:
+        return Stopwatch(self)
+
+    def increment(self, counter: str, command: str, amount: int = 1):
+        key = (counter, command)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, stage: str, command: str, seconds: float):
+        key = (stage, command)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def summary(self) -> List[str]:
+        """
+        Format the metrics as human-readable lines for the REPL.
+        """
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: (item[0][1], STAGES.index(item[0][0])
+                                                                          if item[0][0] in STAGES else len(STAGES)))
+        lines = [f"  {command} {counter}: {value}" for (counter, command), value in counters]
+        for (stage, command), histogram in histograms:
+            lines.append(f"  {command} {stage}: n={histogram.count} mean={1e6 * histogram.total / histogram.count:.1f}us "
+                         f"p50<={1e6 * histogram.quantile(0.5):g}us p99<={1e6 * histogram.quantile(0.99):g}us")
+        return lines
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: (item[0][1], item[0][0]))
+            lines = []
+            for name in sorted({counter for counter, _ in self.counters}):
+                lines.append(f"# HELP calculator_{name}_total {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE calculator_{name}_total counter")
+                lines.extend(f'calculator_{name}_total{{command="{command}"}} {value}'
+                             for (counter, command), value in counters if counter == name)
+            if histograms:
+                lines.append("# HELP calculator_stage_seconds Time spent in each stage of a calculation.")
+                lines.append("# TYPE calculator_stage_seconds histogram")
+            for (stage, command), histogram in histograms:
+                labels = f'command="{command}",stage="{stage}"'
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'calculator_stage_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                lines.append(f'calculator_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"calculator_stage_seconds_sum{{{labels}}} {histogram.total:.9f}")
+                lines.append(f"calculator_stage_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """
+        Write the Prometheus text to a file, replacing it atomically so scrapers never see a partial file.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as output:
+            output.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+
+class NullMetrics:
+    """
+    The registry used while metrics are disabled: every operation is a no-op.
+    """
+
+    enabled = False
+    _stopwatch = _NullStopwatch()
+
+    def stopwatch(self) -> _NullStopwatch:
+        return self._stopwatch
+
+    def increment(self, counter: str, command: str, amount: int = 1):
+        pass
+
+    def observe(self, stage: str, command: str, seconds: float):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+_metrics = NULL_METRICS
+_export_path: Optional[str] = None
+
+
+def configure_metrics(enabled: bool = False, path: Optional[str] = None):
+    """
+    Enable or disable metrics.
+
+    Args:
+        enabled (bool): Collect metrics.
+        path (Optional[str]): Write Prometheus text here on export_metrics() and at exit; implies enabled.
+
+    Returns:
+        The active registry (NULL_METRICS when disabled).
+    """
+    global _metrics, _export_path  # pylint: disable=global-statement
+    _metrics = MetricsRegistry() if enabled or path else NULL_METRICS
+    _export_path = path
+    return _metrics
+
+
+def get_metrics():
+    """
+    Return the active registry: a MetricsRegistry, or NULL_METRICS when disabled.
+    """
+    return _metrics
+
+
+def export_metrics() -> Optional[str]:
+    """
+    Write the metrics to the configured file, if any.
+
+    Returns:
+        Optional[str]: The path written, or None.
+    """
+    if _export_path is None or not _metrics.enabled:
+        return None
+    _metrics.write_prometheus(_export_path)
+    return _export_path
+
+
+atexit.register(export_metrics)
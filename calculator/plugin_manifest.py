@@ -0,0 +1,91 @@
+"""
+Plugin Manifest Module
+
+This module maps command names to the plugin modules that register them without
+importing those modules. Plugin sources are scanned for register_command("name", ...)
+calls, and the result is cached in a JSON manifest. The manifest is rebuilt only
+when a plugin file is added, removed or modified (detected by mtime), so a normal
+startup reads one small file instead of importing every plugin.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Dict
+
+REGISTRATION = re.compile(r"""register_command\(\s*["']([^"']+)["']""")
+
+
+def plugin_files(plugins_dir: str) -> Dict[str, int]:
+    """
+    List the plugin source files with their modification times.
+
+    Args:
+        plugins_dir (str): The plugins directory.
+
+    Returns:
+        Dict[str, int]: File name -> mtime in nanoseconds.
+    """
+    return {
+        entry.name: entry.stat().st_mtime_ns
+        for entry in os.scandir(plugins_dir)
+        if entry.name.endswith('.py') and entry.name != '__init__.py'
+    }
+
+
+def build_manifest(plugins_dir: str, package: str = "calculator.plugins") -> dict:
+    """
+    Scan every plugin source for the commands it registers.
+
+    Args:
+        plugins_dir (str): The plugins directory.
+        package (str): The package the plugin modules belong to.
+
+    Returns:
+        dict: {'files': {name: mtime}, 'commands': {command name: module name}}.
+    """
+    files = plugin_files(plugins_dir)
+    commands = {}
+    for filename in sorted(files):
+        with open(os.path.join(plugins_dir, filename), encoding="utf-8") as source:
+            for name in REGISTRATION.findall(source.read()):
+                commands.setdefault(name, f"{package}.{filename[:-3]}")
+    return {"files": files, "commands": commands}
+
+
+def default_manifest_path(plugins_dir: str) -> str:
+    """
+    Return where the manifest is cached: alongside the bytecode cache of the plugins.
+    """
+    return os.path.join(plugins_dir, "__pycache__", "manifest.json")
+
+
+def load_manifest(plugins_dir: str, manifest_path: str = None) -> dict:
+    """
+    Return the cached manifest, rebuilding it if any plugin file changed.
+
+    Args:
+        plugins_dir (str): The plugins directory.
+        manifest_path (str): Where the manifest is cached; defaults to the plugins' __pycache__.
+
+    Returns:
+        dict: {'files': {name: mtime}, 'commands': {command name: module name}}.
+    """
+    manifest_path = manifest_path or default_manifest_path(plugins_dir)
+    try:
+        with open(manifest_path, encoding="utf-8") as cached:
+            manifest = json.load(cached)
+        if manifest.get("files") == plugin_files(plugins_dir):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    logging.info("Rebuilding plugin manifest.")
+    manifest = build_manifest(plugins_dir)
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as cached:
+            json.dump(manifest, cached)
+    except OSError as e:
+        logging.warning(f"Could not cache plugin manifest: {e}")
+    return manifest
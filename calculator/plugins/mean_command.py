@@ -1,15 +1,13 @@
-# calculator/plugins/add_command.py
+# calculator/plugins/mean_command.py
 
-from decimal import Decimal
-from calculator.command import Command
 from calculator.command_registry import register_command
+from calculator.reductions import MeanReducer, ReductionCommand
 
-class MeanCommand(Command):
-    def __init__(self, a: Decimal, b: Decimal):
-        self.a = a
-        self.b = b
+class MeanCommand(ReductionCommand):
+    reducer = MeanReducer()
 
-    def execute(self) -> Decimal:
-        return (self.a + self.b)/2
+    @staticmethod
+    def numpy_kernel(a, b):
+        return (a + b) / 2
 
 register_command("mean", MeanCommand)
@@ -0,0 +1,49 @@
+# calculator/plugins/reduction_commands.py
+
+from calculator.command import import_numpy
+from calculator.command_registry import register_command
+from calculator.reductions import (MaxReducer, MinReducer, ProductReducer, ReductionCommand, SumReducer,
+                                   VarianceReducer)
+
+class SumCommand(ReductionCommand):
+    reducer = SumReducer()
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return import_numpy().add(a, b)
+
+class ProductCommand(ReductionCommand):
+    cost_weight = 2.0
+    reducer = ProductReducer()
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return import_numpy().multiply(a, b)
+
+class MinCommand(ReductionCommand):
+    reducer = MinReducer()
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return import_numpy().minimum(a, b)
+
+class MaxCommand(ReductionCommand):
+    reducer = MaxReducer()
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return import_numpy().maximum(a, b)
+
+class VarianceCommand(ReductionCommand):
+    cost_weight = 4.0
+    reducer = VarianceReducer()
+
+    @staticmethod
+    def numpy_kernel(a, b):
+        return (a - b) ** 2 / 2
+
+register_command("sum", SumCommand)
+register_command("product", ProductCommand)
+register_command("min", MinCommand)
+register_command("max", MaxCommand)
+register_command("variance", VarianceCommand)
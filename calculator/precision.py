@@ -0,0 +1,185 @@
+"""
+Precision Module
+
+This module manages the decimal context that calculations run under and the
+fast paths that can bypass general Decimal arithmetic.
+
+Decimal contexts are thread-local, so a context set with decimal.localcontext()
+in the caller is not seen by a thread or process worker. Work submitted through
+the scheduler or the batch helpers therefore carries its context with it and
+runs under it via run_in_context, which is picklable for process pools.
+
+Fast paths, chosen per call by compute():
+    - int: when both operands are Python ints and the command has an int_kernel,
+      the result is computed with exact int arithmetic. It is used only if it
+      would be identical to the Decimal result under the active context (the
+      result fits in the precision and is not a signed zero); otherwise the
+      Decimal kernel runs.
+    - float: when lossy mode is requested, operands are converted to float and
+      the command's kernel runs in binary floating point.
+
+Operand text enters the int path through parse_operand, which parses plain
+integer literals straight to int (cheaper than parsing a Decimal) and anything
+else to Decimal. The CLI, REPL, server, batch and shared-memory paths all parse
+their operands with it. Integral Decimal operands are deliberately left on the
+Decimal path: with the C decimal module, converting them to int and back costs
+more than the arithmetic.
+"""
+
+import decimal
+import re
+from contextlib import nullcontext
+from decimal import Context, Decimal, getcontext, localcontext
+from functools import lru_cache
+from typing import Optional
+
+ROUNDING_MODES = {
+    mode[len("ROUND_"):].lower(): mode
+    for mode in (
+        decimal.ROUND_CEILING, decimal.ROUND_DOWN, decimal.ROUND_FLOOR, decimal.ROUND_HALF_DOWN,
+        decimal.ROUND_HALF_EVEN, decimal.ROUND_HALF_UP, decimal.ROUND_UP, decimal.ROUND_05UP,
+    )
+}
+
+_lossy = False
+
+# Plain integer literals short enough that int() is cheaper than Decimal()
+_INTEGER = re.compile(r"[+-]?[0-9]{1,18}")
+
+
+def parse_rounding(name: str) -> str:
+    """
+    Resolve a rounding mode name such as 'half_up' or 'ROUND_HALF_UP'.
+
+    Raises:
+        ValueError: If the name is not a decimal rounding mode.
+    """
+    key = name.lower()
+    key = key[len("round_"):] if key.startswith("round_") else key
+    if key not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode: {name}. Choose from {', '.join(ROUNDING_MODES)}.")
+    return ROUNDING_MODES[key]
+
+
+def make_context(precision: Optional[int] = None, rounding: Optional[str] = None,
+                 base: Optional[Context] = None) -> Context:
+    """
+    Build a decimal context from the current one (or base) with the given overrides.
+
+    Args:
+        precision (Optional[int]): Significant digits.
+        rounding (Optional[str]): A rounding mode name, e.g. 'half_up'.
+        base (Optional[Context]): The context to start from; defaults to the current one.
+
+    Returns:
+        Context: A new context.
+
+    Raises:
+        ValueError: If the precision is not positive or the rounding mode is unknown.
+    """
+    context = (base or getcontext()).copy()
+    if precision is not None:
+        if precision < 1:
+            raise ValueError(f"Precision must be at least 1, got {precision}.")
+        context.prec = precision
+    if rounding is not None:
+        context.rounding = parse_rounding(rounding)
+    return context
+
+
+def configure_precision(precision: Optional[int] = None, rounding: Optional[str] = None, lossy: bool = False) -> Context:
+    """
+    Set the calling thread's decimal context and the default lossy mode.
+
+    Requests submitted from this thread capture the context, so workers use it too.
+
+    Returns:
+        Context: The context now in effect.
+    """
+    global _lossy  # pylint: disable=global-statement
+    context = make_context(precision, rounding)
+    decimal.setcontext(context)
+    _lossy = lossy
+    return context
+
+
+def is_lossy() -> bool:
+    """
+    Whether lossy float arithmetic is the default for new requests.
+    """
+    return _lossy
+
+
+def parse_operand(text: str):
+    """
+    Parse operand text, returning an int for plain integer literals and a Decimal otherwise.
+
+    A negative zero stays a Decimal, which keeps its sign.
+
+    Raises:
+        decimal.InvalidOperation: If the text is not a number.
+    """
+    if _INTEGER.fullmatch(text):
+        value = int(text)
+        if value or not text.startswith("-"):
+            return value
+    return Decimal(text)
+
+
+def uses_fast_path(a, b, lossy: bool = False) -> bool:
+    """
+    Whether compute() should dispatch these operands rather than calling the command's kernel directly.
+    """
+    return lossy or type(a) is int or type(b) is int  # pylint: disable=unidiomatic-typecheck
+
+
+@lru_cache(maxsize=64)
+def _int_limit(precision: int) -> int:
+    return 10 ** precision
+
+
+def compute(command_class, a, b, context: Optional[Context] = None, lossy: bool = False):
+    """
+    Apply a command's kernel to two operands, taking a fast path when one applies.
+
+    Args:
+        command_class (Type[Command]): The command whose kernel to use.
+        a: The first operand (Decimal, or int for the int fast path).
+        b: The second operand.
+        context (Optional[Context]): The decimal context; defaults to the current one.
+        lossy (bool): Use float arithmetic.
+
+    Returns:
+        Decimal: The result.
+    """
+    context = context or getcontext()
+    if lossy:
+        try:
+            result = command_class.compute(float(a), float(b))
+        except (TypeError, AttributeError):
+            pass  # the kernel needs Decimal operands; fall back to exact arithmetic
+        else:
+            return Decimal(repr(result))
+    int_kernel = getattr(command_class, "int_kernel", None)
+    if int_kernel is not None and type(a) is int and type(b) is int:  # pylint: disable=unidiomatic-typecheck
+        result = int_kernel(a, b)
+        # A zero may carry a sign in Decimal (e.g. -5 * 0), so leave it to the exact path
+        if result and -_int_limit(context.prec) < result < _int_limit(context.prec):
+            return Decimal(result)
+    with localcontext(context) if context is not getcontext() else nullcontext():
+        return command_class.compute(Decimal(a), Decimal(b))
+
+
+def run_in_context(context: Optional[Context], function, *args):
+    """
+    Call a function under a decimal context. This is the unit of work sent to workers.
+
+    Args:
+        context (Optional[Context]): The context captured by the submitter; None runs under the worker's own.
+        function (Callable): A picklable callable.
+        *args: Its arguments.
+    """
+    if context is None:
+        return function(*args)
+    with localcontext(context):
+        return function(*args)
@@ -0,0 +1,263 @@
+"""
+Reductions Module
+
+This module reduces long sequences of Decimals (sum, product, min, max, mean,
+variance) in bounded memory, optionally spread across an executor.
+
+The input is streamed in chunks. Each chunk is reduced on a worker to a small
+partial state, in a single pass (Welford's algorithm for variance). Partial
+states are then merged pairwise in a binary tree: a stack holds at most one
+state per tree level, so merging needs O(log n) memory and every value passes
+through O(log n) combines. This limits the rounding error that builds up in a
+long running total. Variance partials are merged with the parallel formula of
+Chan et al., which is as stable as a single Welford pass.
+
+Reduction commands take any number of operands and can be registered like any
+other command. compute(a, b) still reduces a pair, so they also work in batches
+and expressions.
+"""
+
+import operator
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor
+from decimal import Context, Decimal, getcontext, localcontext
+from functools import reduce
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from calculator.command import Command
+
+DEFAULT_REDUCE_CHUNK = 16384
+DEFAULT_REDUCE_WINDOW = 8
+
+
+class Reducer(ABC):
+    """
+    A reduction expressed as chunk partials that can be merged in any grouping.
+    """
+
+    @abstractmethod
+    def partial(self, values: List[Decimal]):
+        """Reduce one non-empty chunk to a partial state."""
+
+    @abstractmethod
+    def combine(self, left, right):
+        """Merge two partial states; left covers the earlier values."""
+
+    @abstractmethod
+    def finish(self, state) -> Decimal:
+        """Turn the final state into the result. state is None for empty input."""
+
+
+def _require(state, name: str):
+    if state is None:
+        raise ValueError(f"{name} requires at least one value")
+    return state
+
+
+class SumReducer(Reducer):
+    def partial(self, values):
+        return reduce(operator.add, values)
+
+    def combine(self, left, right):
+        return left + right
+
+    def finish(self, state):
+        return Decimal(0) if state is None else state
+
+
+class ProductReducer(Reducer):
+    def partial(self, values):
+        return reduce(operator.mul, values)
+
+    def combine(self, left, right):
+        return left * right
+
+    def finish(self, state):
+        return Decimal(1) if state is None else state
+
+
+class MinReducer(Reducer):
+    def partial(self, values):
+        return min(values)
+
+    def combine(self, left, right):
+        return min(left, right)
+
+    def finish(self, state):
+        return _require(state, "min")
+
+
+class MaxReducer(Reducer):
+    def partial(self, values):
+        return max(values)
+
+    def combine(self, left, right):
+        return max(left, right)
+
+    def finish(self, state):
+        return _require(state, "max")
+
+
+class MeanReducer(Reducer):
+    """State: (count, total)."""
+
+    def partial(self, values):
+        return len(values), reduce(operator.add, values)
+
+    def combine(self, left, right):
+        return left[0] + right[0], left[1] + right[1]
+
+    def finish(self, state):
+        count, total = _require(state, "mean")
+        return total / count
+
+
+class VarianceReducer(Reducer):
+    """
+    Sample variance. State: (count, mean, sum of squared deviations).
+    """
+
+    def partial(self, values):
+        count, mean, m2 = 0, Decimal(0), Decimal(0)
+        for value in values:
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        return count, mean, m2
+
+    def combine(self, left, right):
+        count_a, mean_a, m2_a = left
+        count_b, mean_b, m2_b = right
+        count = count_a + count_b
+        delta = mean_b - mean_a
+        return count, mean_a + delta * count_b / count, m2_a + m2_b + delta * delta * count_a * count_b / count
+
+    def finish(self, state):
+        count, _, m2 = _require(state, "variance")
+        if count < 2:
+            raise ValueError("variance requires at least two values")
+        return m2 / (count - 1)
+
+
+def reduce_chunk(reducer: Reducer, chunk: List, context: Optional[Context] = None, parse: bool = False):
+    """
+    Reduce one chunk to a partial state. This runs on a worker.
+
+    Args:
+        reducer (Reducer): The reduction.
+        chunk (List): The values, or lines of text when parse is set.
+        context (Optional[Context]): The decimal context to run under.
+        parse (bool): The chunk holds lines of whitespace-separated numbers ('#' starts a
+            comment line) to split and convert here, off the reading thread.
+    """
+    if parse:
+        chunk = [Decimal(token) for line in chunk if not line.lstrip().startswith("#") for token in line.split()]
+        if not chunk:
+            return None
+    with localcontext(context or getcontext()):
+        return reducer.partial(chunk)
+
+
+class _PairwiseMerger:
+    """Merge partial states in a balanced binary tree as they arrive, keeping one state per level."""
+
+    def __init__(self, reducer: Reducer):
+        self.reducer = reducer
+        self.stack: List[tuple] = []  # (level, state), levels strictly decreasing
+
+    def push(self, state):
+        if state is None:
+            return  # a chunk with no values (only comments or blank lines)
+        level = 0
+        while self.stack and self.stack[-1][0] == level:
+            _, left = self.stack.pop()
+            state = self.reducer.combine(left, state)
+            level += 1
+        self.stack.append((level, state))
+
+    def result(self):
+        state = None
+        while self.stack:
+            _, left = self.stack.pop()
+            state = left if state is None else self.reducer.combine(left, state)
+        return state
+
+
+def _chunks(values: Iterable, chunk_size: int) -> Iterator[List]:
+    values = iter(values)
+    while True:
+        chunk = list(islice(values, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parallel_reduce(reducer: Reducer, values: Iterable, executor: Optional[Executor] = None,
+                    chunk_size: int = DEFAULT_REDUCE_CHUNK, window: int = DEFAULT_REDUCE_WINDOW,
+                    context: Optional[Context] = None, parse: bool = False) -> Decimal:
+    """
+    Reduce a stream of values, chunk by chunk, with at most `window` chunks in flight.
+
+    Args:
+        reducer (Reducer): The reduction.
+        values (Iterable): The values; consumed lazily.
+        executor (Optional[Executor]): Where chunks are reduced; defaults to the calling thread.
+        chunk_size (int): Values per chunk.
+        window (int): Maximum number of chunks in flight at once.
+        context (Optional[Context]): The decimal context; defaults to the caller's.
+        parse (bool): values are lines of text (e.g. an open file) holding whitespace-separated
+            numbers, which are split and converted on the workers.
+
+    Returns:
+        Decimal: The result.
+
+    Raises:
+        ValueError: If the reduction is undefined for the input (e.g. the mean of nothing).
+    """
+    context = context or getcontext()
+    merger = _PairwiseMerger(reducer)
+    if executor is None:
+        for chunk in _chunks(values, chunk_size):
+            merger.push(reduce_chunk(reducer, chunk, context, parse))
+    else:
+        pending = deque()
+        for chunk in _chunks(values, chunk_size):
+            pending.append(executor.submit(reduce_chunk, reducer, chunk, context, parse))
+            if len(pending) >= window:
+                merger.push(pending.popleft().result())
+        while pending:
+            merger.push(pending.popleft().result())
+    with localcontext(context):
+        return reducer.finish(merger.result())
+
+
+class ReductionCommand(Command):
+    """
+    A command over any number of operands, e.g. ReductionCommand(a, b, c, ...).
+    """
+
+    reducer: Reducer = None
+    # The REPL passes every operand to commands that set this
+    variadic = True
+
+    def __init__(self, *values: Decimal):
+        self.values = values
+
+    @classmethod
+    def compute(cls, a: Decimal, b: Decimal) -> Decimal:
+        return cls.reducer.finish(cls.reducer.partial([a, b]))
+
+    @classmethod
+    def reduce(cls, values: Iterable, executor: Optional[Executor] = None,
+               chunk_size: int = DEFAULT_REDUCE_CHUNK, context: Optional[Context] = None,
+               parse: bool = False) -> Decimal:
+        """
+        Reduce a (possibly very long) stream of values, optionally across an executor.
+        """
+        return parallel_reduce(cls.reducer, values, executor, chunk_size, context=context, parse=parse)
+
+    def execute(self) -> Decimal:
+        return self.reduce(self.values)
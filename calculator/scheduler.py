@@ -0,0 +1,320 @@
+"""
+Scheduler Module
+
+This module decides, command by command, whether work should run inline in the
+calling thread or be offloaded to the shared executor. Cheap commands such as
+adding two small Decimals are far faster inline than a round trip to a worker,
+while heavy commands (very high precision division, large operands) benefit from
+running on a worker.
+
+The decision is delegated to a pluggable ExecutionPolicy. Every decision is
+recorded so it can be inspected after the fact.
+"""
+
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from concurrent.futures import Executor, Future
+from contextlib import nullcontext
+from decimal import Context, Decimal, getcontext, localcontext
+from typing import Dict, Optional
+
+from calculator.executor import get_executor
+from calculator.metrics import get_metrics
+from calculator.precision import compute, is_lossy, run_in_context, uses_fast_path
+
+Decision = namedtuple("Decision", ["command", "cost", "predicted", "offload", "reason"])
+
+
+def _execute(command, lossy: bool = False):
+    """Run a command, through the int or float fast path when its operands or lossy mode call for one."""
+    if hasattr(command, "a") and hasattr(command, "b") and uses_fast_path(command.a, command.b, lossy):
+        return compute(type(command), command.a, command.b, lossy=lossy)
+    return command.execute()
+
+
+# The process that has already run a command; compared by pid because forked workers inherit it
+_warm_pid = None
+
+
+def _timed_execute(command, context: Optional[Context] = None, lossy: bool = False):
+    """
+    Execute a command and report when the execution itself started and finished.
+
+    This runs inside the worker so the measured time excludes transport overhead.
+    The submitter's decimal context travels with the command because contexts are
+    local to each thread and process. perf_counter is system-wide on the supported
+    platforms, so the timestamps can be compared with the submitter's clock.
+
+    Returns:
+        tuple: (result, started, finished, cold), where cold is True for the first
+        command run by a freshly spawned worker process.
+    """
+    global _warm_pid  # pylint: disable=global-statement
+    cold = False
+    if _warm_pid != os.getpid():
+        # Worker processes always have multiprocessing loaded; the parent need not import it
+        multiprocessing = sys.modules.get("multiprocessing")
+        cold = multiprocessing is not None and multiprocessing.parent_process() is not None
+        _warm_pid = os.getpid()
+    started = time.perf_counter()
+    result = run_in_context(context, _execute, command, lossy)
+    return result, started, time.perf_counter(), cold
+
+
+def operand_digits(command) -> int:
+    """
+    Count the significant digits of every Decimal operand held by a command,
+    including those in operand sequences (as held by reduction commands).
+
+    Args:
+        command (Command): The command to inspect.
+
+    Returns:
+        int: The total number of coefficient digits across the operands.
+    """
+    digits = 0
+    for value in vars(command).values():
+        if isinstance(value, Decimal):
+            digits += len(value.as_tuple().digits)
+        elif isinstance(value, (list, tuple)):
+            digits += sum(len(item.as_tuple().digits) for item in value if isinstance(item, Decimal))
+    return digits
+
+
+class ExecutionPolicy(ABC):
+    """
+    Base class for policies that choose between inline and offloaded execution.
+
+    Attributes:
+        decisions (deque): The most recent Decision records, newest last.
+    """
+
+    name = "policy"
+
+    def __init__(self, max_decisions: int = 1000):
+        self.decisions = deque(maxlen=max_decisions)
+
+    @abstractmethod
+    def evaluate(self, command) -> Decision:
+        """
+        Work out whether the command should be offloaded.
+
+        Args:
+            command (Command): The command about to run.
+
+        Returns:
+            Decision: The decision and the reasoning behind it.
+        """
+
+    def decide(self, command) -> bool:
+        """
+        Decide where to run the command and record the decision.
+
+        Args:
+            command (Command): The command about to run.
+
+        Returns:
+            bool: True to offload to the executor, False to run inline.
+        """
+        decision = self.evaluate(command)
+        self.decisions.append(decision)
+        return decision.offload
+
+    def record(self, command, elapsed: float):
+        """
+        Feed back an observed execution time. Policies that learn override this.
+        """
+
+
+class InlinePolicy(ExecutionPolicy):
+    """Run every command in the calling thread."""
+
+    name = "inline"
+
+    def evaluate(self, command) -> Decision:
+        return Decision(type(command).__name__, None, None, False, "always inline")
+
+
+class OffloadPolicy(ExecutionPolicy):
+    """Send every command to the executor."""
+
+    name = "offload"
+
+    def evaluate(self, command) -> Decision:
+        return Decision(type(command).__name__, None, None, True, "always offload")
+
+
+class AdaptivePolicy(ExecutionPolicy):
+    """
+    Estimate each command's cost and offload only the expensive ones.
+
+    The cost is the command's `cost_weight` times the digits of its operands, plus
+    the context precision for commands whose work grows with precision (such as
+    division). Once timings have been recorded for a command type, the policy
+    predicts the run time from the observed seconds-per-cost and offloads when
+    that prediction exceeds `offload_seconds`. Before any timing exists it falls
+    back to comparing the raw cost against `cost_threshold`.
+
+    Attributes:
+        cost_threshold (float): Cost above which untimed commands are offloaded.
+        offload_seconds (float): Predicted run time above which commands are offloaded.
+        smoothing (float): Weight given to each new timing in the moving average.
+    """
+
+    name = "adaptive"
+
+    def __init__(self, cost_threshold: float = 5000, offload_seconds: float = 0.001,
+                 smoothing: float = 0.2, max_decisions: int = 1000):
+        super().__init__(max_decisions)
+        self.cost_threshold = cost_threshold
+        self.offload_seconds = offload_seconds
+        self.smoothing = smoothing
+        self.timings: Dict[str, float] = {}
+
+    @staticmethod
+    def estimate_cost(command) -> float:
+        """
+        Estimate the relative cost of running a command.
+
+        Args:
+            command (Command): The command to estimate.
+
+        Returns:
+            float: A unitless cost figure.
+        """
+        cost = max(operand_digits(command), 1)
+        if getattr(command, "scales_with_precision", False):
+            cost += getcontext().prec
+        return cost * getattr(command, "cost_weight", 1.0)
+
+    def evaluate(self, command) -> Decision:
+        name = type(command).__name__
+        cost = self.estimate_cost(command)
+        per_cost = self.timings.get(name)
+        if per_cost is None:
+            offload = cost > self.cost_threshold
+            return Decision(name, cost, None, offload, "static cost estimate")
+        predicted = per_cost * cost
+        return Decision(name, cost, predicted, predicted > self.offload_seconds, "recorded timings")
+
+    def record(self, command, elapsed: float):
+        name = type(command).__name__
+        sample = elapsed / self.estimate_cost(command)
+        previous = self.timings.get(name)
+        self.timings[name] = sample if previous is None else previous + self.smoothing * (sample - previous)
+
+
+POLICIES = {
+    "adaptive": AdaptivePolicy,
+    "inline": InlinePolicy,
+    "offload": OffloadPolicy,
+}
+
+
+class Scheduler:
+    """
+    Route commands either inline or to an executor according to a policy.
+
+    Attributes:
+        policy (ExecutionPolicy): The policy making the routing decisions.
+    """
+
+    def __init__(self, policy: Optional[ExecutionPolicy] = None, executor: Optional[Executor] = None):
+        """
+        Args:
+            policy (Optional[ExecutionPolicy]): Defaults to an AdaptivePolicy.
+            executor (Optional[Executor]): Defaults to the shared executor.
+        """
+        self.policy = policy or AdaptivePolicy()
+        self._executor = executor
+
+    @property
+    def executor(self) -> Executor:
+        """The executor used for offloaded commands."""
+        return self._executor or get_executor()
+
+    def submit(self, command, context: Optional[Context] = None, lossy: Optional[bool] = None,
+               name: Optional[str] = None) -> Future:
+        """
+        Schedule a command and return a Future for its result.
+
+        Args:
+            command (Command): The command to run.
+            context (Optional[Context]): The decimal context to run under; defaults to the caller's.
+            lossy (Optional[bool]): Use float arithmetic; defaults to the configured mode.
+            name (Optional[str]): The command name metrics are labelled with; defaults to the class name.
+
+        Returns:
+            Future: Resolves to the command's result or raises its exception.
+        """
+        future = Future()
+        lossy = is_lossy() if lossy is None else lossy
+        name = name or type(command).__name__
+        with localcontext(context) if context is not None else nullcontext():
+            offload = self.policy.decide(command)
+        if offload:
+            submitted = time.perf_counter()
+            self.executor.submit(_timed_execute, command, context or getcontext(), lossy).add_done_callback(
+                lambda done: self._complete(command, done, future, name, submitted))
+            return future
+        try:
+            result, started, finished, _ = _timed_execute(command, context, lossy)
+        except Exception as e:  # pylint: disable=broad-except
+            future.set_exception(e)
+        else:
+            self.policy.record(command, finished - started)
+            get_metrics().observe("execute", name, finished - started)
+            future.set_result(result)
+        return future
+
+    def _complete(self, command, done: Future, future: Future, name: str, submitted: float):
+        """Unpack a worker's timed result into the caller's Future, recording the stage timings."""
+        error = done.exception()
+        if error is not None:
+            future.set_exception(error)
+            return
+        result, started, finished, cold = done.result()
+        self.policy.record(command, finished - started)
+        metrics = get_metrics()
+        if metrics.enabled:
+            metrics.observe("spawn" if cold else "queue_wait", name, max(started - submitted, 0.0))
+            metrics.observe("execute", name, finished - started)
+            metrics.observe("transfer", name, max(time.perf_counter() - finished, 0.0))
+        future.set_result(result)
+
+
+_scheduler: Optional[Scheduler] = None
+
+
+def configure_scheduler(policy: Optional[str] = None) -> Scheduler:
+    """
+    Replace the shared scheduler with one using the named policy.
+
+    Args:
+        policy (Optional[str]): One of 'adaptive', 'inline' or 'offload'; defaults to 'adaptive'.
+
+    Returns:
+        Scheduler: The new shared scheduler.
+
+    Raises:
+        ValueError: If the policy name is not recognised.
+    """
+    global _scheduler  # pylint: disable=global-statement
+    policy = policy or "adaptive"
+    policy_class = POLICIES.get(policy)
+    if policy_class is None:
+        raise ValueError(f"Unknown execution policy: {policy}. Choose from {', '.join(POLICIES)}.")
+    _scheduler = Scheduler(policy_class())
+    return _scheduler
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Return the shared scheduler, creating an adaptive one on first use.
+    """
+    if _scheduler is None:
+        return configure_scheduler()
+    return _scheduler
@@ -0,0 +1,256 @@
+"""
+Server Module
+
+This module runs the calculator as a long-lived server so clients no longer pay
+interpreter startup, environment loading and logging setup on every call.
+
+Wire protocol (newline-delimited UTF-8, over TCP or a Unix socket):
+    request:   '<operation> <num1> <num2>\\n'
+    response:  'ok <result>\\n' or 'err <message>\\n'
+
+A client can set the decimal precision, rounding and lossy mode of its
+connection with '@context <precision> <rounding> <lossy 0|1>\\n' (answered with
+'ok context'). Later requests on that connection run under those settings
+instead of the server's own.
+
+Requests may be pipelined: a client can send many lines without waiting, and
+responses come back in request order. Each request is dispatched through the
+command registry and the shared scheduler, so cheap commands answer inline and
+expensive ones run on the warm worker pool.
+
+Error messages are folded onto one line. A request longer than the stream limit
+gets an 'err' response, and then the connection is closed, because the framing
+of the rest of the stream is lost.
+"""
+
+import asyncio
+import logging
+from decimal import Context, Decimal, InvalidOperation
+from typing import List, Optional, Tuple
+
+import calculator.command  # pylint: disable=unused-import  # registers the builtin commands
+from calculator.command_registry import command_registry
+from calculator.precision import make_context, parse_operand
+from calculator.scheduler import Scheduler, get_scheduler
+from calculator.settings import DEFAULT_ADDRESS
+DEFAULT_PIPELINE_DEPTH = 1024
+CONTEXT_REQUEST = "@context"
+
+
+def parse_address(address: str) -> Tuple[str, ...]:
+    """
+    Parse a server address.
+
+    Args:
+        address (str): 'host:port' for TCP or 'unix:/path/to/socket' for a Unix socket.
+
+    Returns:
+        Tuple[str, ...]: ('tcp', host, port) or ('unix', path).
+
+    Raises:
+        ValueError: If the address is malformed.
+    """
+    if address.startswith("unix:"):
+        return ("unix", address[len("unix:"):])
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"Invalid server address: {address}. Use host:port or unix:/path.")
+    return ("tcp", host or "127.0.0.1", int(port))
+
+
+def format_context_request(context: Context, lossy: bool) -> str:
+    """
+    Encode the request line that sets a connection's decimal context and lossy mode.
+    """
+    return f"{CONTEXT_REQUEST} {context.prec} {context.rounding} {int(lossy)}\n"
+
+
+class _Session:
+    """The decimal context and lossy mode of one connection; None means the server's own."""
+
+    def __init__(self):
+        self.context: Optional[Context] = None
+        self.lossy: Optional[bool] = None
+
+    def configure(self, parts: List[str]):
+        """
+        Apply the fields of an @context request.
+
+        Raises:
+            ValueError: If the request is malformed or names an unknown rounding mode.
+        """
+        if len(parts) != 4 or not parts[1].isdigit() or parts[3] not in ("0", "1"):
+            raise ValueError(f"Invalid context request. Use: {CONTEXT_REQUEST} <precision> <rounding> <lossy 0|1>")
+        self.context = make_context(int(parts[1]), parts[2])
+        self.lossy = parts[3] == "1"
+
+
+def format_response(future: asyncio.Future) -> bytes:
+    """
+    Encode a finished request as a protocol response line.
+    """
+    error = future.exception()
+    if error is not None:
+        # A multi-line message would break the line framing
+        return f"err {' '.join(str(error).splitlines())}\n".encode()
+    return f"ok {future.result()}\n".encode()
+
+
+class CalculationServer:
+    """
+    An asyncio server that answers calculation requests.
+
+    Attributes:
+        address (str): The address to listen on.
+        pipeline_depth (int): Maximum unanswered requests buffered per connection.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, scheduler: Optional[Scheduler] = None,
+                 pipeline_depth: int = DEFAULT_PIPELINE_DEPTH):
+        """
+        Args:
+            address (str): 'host:port' or 'unix:/path'.
+            scheduler (Optional[Scheduler]): Defaults to the shared scheduler.
+            pipeline_depth (int): Maximum unanswered requests buffered per connection.
+        """
+        self.address = address
+        self.pipeline_depth = pipeline_depth
+        self._scheduler = scheduler
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def bound_address(self) -> str:
+        """The address actually listened on (with the real port when port 0 was requested)."""
+        kind, *_ = parse_address(self.address)
+        if kind == "unix":
+            return self.address
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def start(self):
+        """
+        Start listening.
+        """
+        kind, *location = parse_address(self.address)
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._handle, path=location[0])
+        else:
+            self._server = await asyncio.start_server(self._handle, host=location[0], port=location[1])
+        logging.info(f"Calculation server listening on {self.bound_address}")
+
+    async def serve_forever(self):
+        """
+        Start listening (if needed) and serve until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        """
+        Stop accepting connections.
+        """
+        if self._server is not None:
+            self._server.close()
+
+    def dispatch(self, line: str, session: Optional[_Session] = None) -> asyncio.Future:
+        """
+        Start one request and return a future for its result.
+
+        Args:
+            line (str): '<operation> <num1> <num2>', or an @context request when a session is given.
+            session (Optional[_Session]): The connection's settings; without one the server's own apply.
+
+        Returns:
+            asyncio.Future: Resolves to the result or raises the error to report.
+        """
+        loop = asyncio.get_running_loop()
+        parts = line.split()
+        try:
+            if session is not None and parts and parts[0] == CONTEXT_REQUEST:
+                session.configure(parts)
+                future = loop.create_future()
+                future.set_result("context")
+                return future
+            if len(parts) != 3:
+                raise ValueError("Invalid input format. Use: <operation> <num1> <num2>")
+            operation, value1, value2 = parts
+            command_class = command_registry.get(operation)
+            if not command_class:
+                raise ValueError(f"Invalid operation type: {operation}")
+            try:
+                # Integer text takes the exact int fast path for commands that have one
+                parse = parse_operand if getattr(command_class, "int_kernel", None) else Decimal
+                command = command_class(parse(value1), parse(value2))
+            except InvalidOperation as e:
+                raise ValueError(f"Invalid input: {value1} or {value2} is not a valid number.") from e
+            scheduler = self._scheduler or get_scheduler()
+            context, lossy = (session.context, session.lossy) if session is not None else (None, None)
+            return asyncio.wrap_future(scheduler.submit(command, context, lossy, name=operation), loop=loop)
+        except Exception as e:  # pylint: disable=broad-except
+            future = loop.create_future()
+            future.set_exception(e)
+            return future
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection: read requests while earlier responses are still being computed."""
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.pipeline_depth)
+        sender = asyncio.create_task(self._send(pending, writer))
+        session = _Session()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # the line overran the stream limit
+                    rejected = asyncio.get_running_loop().create_future()
+                    rejected.set_exception(ValueError("Request line too long."))
+                    await pending.put(rejected)
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(self.dispatch(line.decode(errors="replace"), session))
+        except ConnectionError:
+            pass
+        finally:
+            await pending.put(None)
+            await sender
+            writer.close()
+
+    @staticmethod
+    async def _send(pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        """Write responses in request order, draining only when the pipeline is empty."""
+        broken = False
+        while True:
+            future = await pending.get()
+            if future is None:
+                break
+            await asyncio.wait([future])
+            if broken:
+                continue  # keep consuming so the reader never blocks on a full queue
+            try:
+                writer.write(format_response(future))
+                if pending.empty():
+                    await writer.drain()
+            except ConnectionError:
+                broken = True
+        if not broken:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+
+def run_server(address: str = DEFAULT_ADDRESS):
+    """
+    Run a calculation server until interrupted.
+
+    Args:
+        address (str): 'host:port' or 'unix:/path'.
+    """
+    server = CalculationServer(address)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logging.info("Calculation server stopped.")
@@ -0,0 +1,133 @@
+"""
+Settings Module
+
+This module reads the calculator's configuration once, into a typed, immutable
+Settings object. Only the variables the calculator uses are read. The
+environment is never copied or logged as a whole.
+
+If a .env file is found in the working directory or one of its parents, it is
+loaded first. python-dotenv is only imported in that case, so runs without a
+.env file do not pay for it.
+"""
+
+import os
+from functools import lru_cache
+from typing import Mapping, NamedTuple, Optional
+
+from calculator.cache import DEFAULT_CACHE_SIZE
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+TRUE_VALUES = ("1", "true", "yes")
+
+
+class Settings(NamedTuple):
+    """
+    The calculator's configuration. Every field has a matching environment
+    variable, listed in ENVIRONMENT_VARIABLES.
+    """
+
+    environment: Optional[str] = None
+    executor: Optional[str] = None
+    workers: Optional[int] = None
+    policy: Optional[str] = None
+    cache: bool = False
+    cache_size: int = DEFAULT_CACHE_SIZE
+    cache_ttl: Optional[float] = None
+    precision: Optional[int] = None
+    rounding: Optional[str] = None
+    lossy: bool = False
+    metrics: bool = False
+    metrics_file: Optional[str] = None
+    log_mode: str = "sync"
+    log_format: str = "text"
+    log_sample: int = 1
+    fast_start: bool = False
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> "Settings":
+        """
+        Build settings from an environment mapping. Unset or empty variables keep their defaults.
+
+        Raises:
+            ValueError: If a variable cannot be parsed.
+        """
+        values = {}
+        for field, (variable, parse) in ENVIRONMENT_VARIABLES.items():
+            raw = environ.get(variable, "").strip()
+            if not raw:
+                continue
+            try:
+                values[field] = parse(raw)
+            except ValueError as e:
+                raise ValueError(f"Invalid value for {variable}: {raw!r}") from e
+        return cls(**values)
+
+
+def _flag(raw: str) -> bool:
+    return raw.lower() in TRUE_VALUES
+
+
+def _optional_int(raw: str) -> Optional[int]:
+    """An int where 0 means 'not set'."""
+    return int(raw) or None
+
+
+def _optional_float(raw: str) -> Optional[float]:
+    """A float where 0 means 'not set'."""
+    return float(raw) or None
+
+
+# Settings field -> (environment variable, parser)
+ENVIRONMENT_VARIABLES = {
+    "environment": ("ENVIRONMENT", str),
+    "executor": ("CALCULATOR_EXECUTOR", str),
+    "workers": ("CALCULATOR_WORKERS", _optional_int),
+    "policy": ("CALCULATOR_POLICY", str),
+    "cache": ("CALCULATOR_CACHE", _flag),
+    "cache_size": ("CALCULATOR_CACHE_SIZE", int),
+    "cache_ttl": ("CALCULATOR_CACHE_TTL", _optional_float),
+    "precision": ("CALCULATOR_PRECISION", _optional_int),
+    "rounding": ("CALCULATOR_ROUNDING", str),
+    "lossy": ("CALCULATOR_LOSSY", _flag),
+    "metrics": ("CALCULATOR_METRICS", _flag),
+    "metrics_file": ("CALCULATOR_METRICS_FILE", str),
+    "log_mode": ("CALCULATOR_LOG_MODE", str),
+    "log_format": ("CALCULATOR_LOG_FORMAT", str),
+    "log_sample": ("CALCULATOR_LOG_SAMPLE", int),
+    "fast_start": ("CALCULATOR_FAST_START", _flag),
+}
+
+
+def find_dotenv(start: Optional[str] = None) -> Optional[str]:
+    """
+    Return the nearest .env file in `start` (default: the working directory) or its parents.
+    """
+    directory = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Load .env (if any) and read the settings from the environment, once per process.
+    """
+    path = find_dotenv()
+    if path is not None:
+        from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+        load_dotenv(path)
+    return Settings.from_environ(os.environ)
+
+
+def reload_settings() -> Settings:
+    """
+    Forget the cached settings and read them again.
+    """
+    get_settings.cache_clear()
+    return get_settings()
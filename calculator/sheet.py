@@ -0,0 +1,206 @@
+"""
+Sheet Module
+
+This module keeps a spreadsheet-like set of named cells and recomputes them
+incrementally. Input cells hold values; formula cells hold a Calculation over
+constants and other cells. The sheet tracks which formulas read which cells, so
+changing an input marks only its downstream formulas dirty. Nothing is computed
+at that point: a dirty formula is recomputed the next time it (or something
+that depends on it) is read, and a formula whose inputs came back with
+unchanged values is not recomputed at all. The cost of an update is therefore
+bounded by the part of the sheet that is both affected and read.
+"""
+
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Set, Union
+
+import calculator.command  # pylint: disable=unused-import  # registers the builtin commands
+from calculator.calculation import Calculation
+from calculator.command_registry import command_registry
+
+
+class SheetError(ValueError):
+    """Raised for unknown cells, invalid operations and circular references."""
+
+
+class _Cell:
+    """One named cell: an input value or a formula with its cached result."""
+
+    __slots__ = ("name", "operation", "operands", "value", "error", "dirty", "version", "seen", "dependents")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.operation: Optional[Callable[[Decimal, Decimal], Decimal]] = None
+        self.operands: tuple = ()
+        self.value: Optional[Decimal] = None
+        self.error: Optional[Exception] = None
+        self.dirty = False
+        self.version = 0  # bumped whenever the value changes
+        self.seen: Optional[tuple] = None  # input versions the cached value was computed from
+        self.dependents: Set[str] = set()
+
+    def references(self) -> List[str]:
+        return [operand for operand in self.operands if isinstance(operand, str)]
+
+
+class Sheet:
+    """
+    Named input and formula cells with lazy, incremental recomputation.
+
+    Attributes:
+        recomputations (int): How many times a formula has actually been evaluated.
+    """
+
+    def __init__(self):
+        self._cells: Dict[str, _Cell] = {}
+        self.recomputations = 0
+
+    def _cell(self, name: str) -> _Cell:
+        if name not in self._cells:
+            self._cells[name] = _Cell(name)
+        return self._cells[name]
+
+    def set(self, name: str, value) -> None:
+        """
+        Set an input cell, marking every formula downstream of it dirty.
+
+        Setting a cell to the value it already holds changes nothing.
+
+        Args:
+            name (str): The cell name.
+            value: The new value (anything Decimal accepts).
+        """
+        cell = self._cell(name)
+        value = Decimal(value)
+        if cell.operation is None and cell.error is None and cell.value is not None and cell.value == value:
+            return
+        self._detach(cell)
+        # An input is never dirty, and a formula defined here later must not reuse old input versions
+        cell.operation, cell.operands, cell.error = None, (), None
+        cell.dirty, cell.seen = False, None
+        cell.value = value
+        cell.version += 1
+        self._invalidate(cell.dependents)
+
+    def define(self, name: str, operation: Union[str, Callable[[Decimal, Decimal], Decimal]], a, b) -> None:
+        """
+        Define a formula cell.
+
+        Args:
+            name (str): The cell name.
+            operation (Union[str, Callable]): A registered command name, or an
+                arithmetic function such as calculator.operations.add.
+            a: A constant or the name of another cell.
+            b: A constant or the name of another cell.
+
+        Raises:
+            SheetError: If the operation is unknown or the formula would refer to itself.
+        """
+        if isinstance(operation, str):
+            command_class = command_registry.get(operation)
+            if command_class is None:
+                raise SheetError(f"Invalid operation type: {operation}")
+            operation = command_class.compute
+        operands = tuple(operand if isinstance(operand, str) else Decimal(operand) for operand in (a, b))
+        if self._reaches(operands, name):
+            raise SheetError(f"Circular reference: {name} depends on itself")
+        cell = self._cell(name)
+        self._detach(cell)
+        cell.operation, cell.operands, cell.seen = operation, operands, None
+        for reference in cell.references():
+            self._cell(reference).dependents.add(name)
+        self._invalidate([name])
+
+    def get(self, name: str) -> Decimal:
+        """
+        Read a cell, recomputing it and any dirty inputs first.
+
+        Raises:
+            SheetError: If the cell (or a cell it reads) has no value.
+            Exception: The error raised by the cell's formula, if it failed.
+        """
+        if name not in self._cells:
+            raise SheetError(f"Unknown cell: {name}")
+        cell = self._refresh(self._cells[name])
+        if cell.error is not None:
+            raise cell.error
+        if cell.value is None:
+            # Referenced by a formula but never set
+            raise SheetError(f"Cell {name} has no value")
+        return cell.value
+
+    def dirty(self) -> List[str]:
+        """
+        Return the names of formulas waiting to be recomputed.
+        """
+        return [name for name, cell in self._cells.items() if cell.dirty]
+
+    def _detach(self, cell: _Cell):
+        """Stop the cell's current inputs from notifying it."""
+        for reference in cell.references():
+            self._cells[reference].dependents.discard(cell.name)
+
+    def _reaches(self, operands: tuple, target: str) -> bool:
+        """Whether any referenced cell is target or downstream of it."""
+        # Walking dependents from the target keeps this O(1) for brand new cells
+        references = {operand for operand in operands if isinstance(operand, str)}
+        stack = [target]
+        visited = set()
+        while stack:
+            name = stack.pop()
+            if name in references:
+                return True
+            if name in visited or name not in self._cells:
+                continue
+            visited.add(name)
+            stack.extend(self._cells[name].dependents)
+        return False
+
+    def _invalidate(self, names):
+        """Mark formulas and everything downstream of them dirty."""
+        stack = list(names)
+        while stack:
+            cell = self._cells[stack.pop()]
+            if cell.dirty:
+                continue  # its dependents were marked when it was
+            cell.dirty = True
+            stack.extend(cell.dependents)
+
+    def _refresh(self, root: _Cell) -> _Cell:
+        """Bring a cell up to date, visiting dirty inputs first without recursion."""
+        stack = [root]
+        while stack:
+            cell = stack[-1]
+            if not cell.dirty:
+                stack.pop()
+                continue
+            pending = [self._cell(reference) for reference in cell.references() if self._cell(reference).dirty]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            self._recompute(cell)
+        return root
+
+    def _recompute(self, cell: _Cell):
+        """Evaluate a formula whose inputs are all up to date."""
+        cell.dirty = False
+        inputs = [self._cell(operand) if isinstance(operand, str) else operand for operand in cell.operands]
+        seen = tuple(item.version for item in inputs if isinstance(item, _Cell))
+        if seen == cell.seen:
+            return  # every input came back unchanged
+        cell.seen = seen
+        failed = next((item for item in inputs if isinstance(item, _Cell) and item.value is None), None)
+        error, value = None, None
+        if failed is not None:
+            error = failed.error or SheetError(f"Cell {failed.name} has no value")
+        else:
+            operands = [item.value if isinstance(item, _Cell) else item for item in inputs]
+            self.recomputations += 1
+            try:
+                value = Calculation.create(operands[0], operands[1], cell.operation).operate()
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+        if value != cell.value or error is not cell.error or cell.value is None:
+            cell.value, cell.error = value, error
+            cell.version += 1
@@ -0,0 +1,290 @@
+"""
+Shared Memory Transport Module
+
+This module runs batches of builtin calculations on long-lived worker processes
+without pickling anything per calculation.
+
+Each worker owns a ring buffer in one multiprocessing.shared_memory segment.
+A ring slot is a fixed-width record encoded like the history log (see
+calculator.codec): an opcode byte, a status byte, the two operands as
+NUL-padded ASCII, and a field the worker writes the result into in place.
+The parent writes a group of records, advances the ring's head counter and
+rings the worker's doorbell (a semaphore) once per group. The worker processes
+every record up to the head, advances its tail counter and signals back once.
+Per calculation, nothing is pickled, no queue feeder thread is involved and
+no pipe is written.
+
+Records the ring cannot carry are computed in the parent, in order. These
+are plugin commands, operands wider than the field, and results that fail or
+do not fit. Error messages are therefore the same as in the executor-based
+batch path.
+
+Usage:
+    with SharedMemoryTransport(workers=4) as transport:
+        for outcome in transport.execute_records(read_records(lines)):
+            ...
+"""
+
+import os
+import struct
+import time
+from collections import deque
+from decimal import Context, Decimal, getcontext, localcontext
+from itertools import islice
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Iterator, List, Optional
+
+from calculator.codec import OPERAND_WIDTH, OPERATIONS
+from calculator.command import BUILTIN_COMMANDS
+from calculator.command_registry import command_registry
+from calculator.precision import compute, is_lossy, parse_operand, uses_fast_path
+from calculator.streaming import Outcome, Record, _execute_record
+
+RESULT_WIDTH = 64
+# opcode, status, padding, a, b, result
+RECORD = struct.Struct(f"<BB6x{OPERAND_WIDTH}s{OPERAND_WIDTH}s{RESULT_WIDTH}s")
+RESULT = struct.Struct(f"<{RESULT_WIDTH}s")
+STATUS_OFFSET = 1
+RESULT_OFFSET = 8 + 2 * OPERAND_WIDTH
+# head (written by the parent), tail (written by the worker), closing flag; padded to a cache line
+RING_HEADER = struct.Struct("<QQB")
+RING_HEADER_SIZE = 64
+COUNTER = struct.Struct("<Q")
+FLAG = struct.Struct("<B")
+TAIL_OFFSET = 8
+CLOSING_OFFSET = 16
+
+STATUS_PENDING, STATUS_OK, STATUS_FAILED = 0, 1, 2
+
+DEFAULT_RING_CAPACITY = 4096
+DEFAULT_GROUP_SIZE = 256
+
+_OPCODES = {operation.__name__: code for code, operation in enumerate(OPERATIONS)}
+_COMMANDS = [BUILTIN_COMMANDS[operation.__name__] for operation in OPERATIONS]
+
+
+class TransportError(RuntimeError):
+    """Raised when a transport worker dies or the transport is used after closing."""
+
+
+def _worker_main(name: str, offset: int, capacity: int, doorbell, done, context: Context, lossy: bool):
+    """
+    Serve one ring until the parent sets its closing flag. This runs in a worker process.
+    """
+    segment = SharedMemory(name)
+    buffer = segment.buf
+    slots = offset + RING_HEADER_SIZE
+    tail = 0
+    try:
+        with localcontext(context) as active:
+            while True:
+                doorbell.acquire()
+                head, _, closing = RING_HEADER.unpack_from(buffer, offset)
+                while tail < head:
+                    position = slots + (tail % capacity) * RECORD.size
+                    opcode, _, a, b, _ = RECORD.unpack_from(buffer, position)
+                    status = STATUS_FAILED
+                    try:
+                        a = parse_operand(a.rstrip(b"\0").decode("ascii"))
+                        b = parse_operand(b.rstrip(b"\0").decode("ascii"))
+                        command_class = _COMMANDS[opcode]
+                        result = compute(command_class, a, b, active, lossy) if uses_fast_path(a, b, lossy) \
+                            else command_class.compute(a, b)
+                        text = str(result).encode("ascii")
+                        if len(text) <= RESULT_WIDTH:
+                            RESULT.pack_into(buffer, position + RESULT_OFFSET, text)
+                            status = STATUS_OK
+                    except Exception:  # pylint: disable=broad-except
+                        pass  # the parent recomputes failed records to report the error
+                    FLAG.pack_into(buffer, position + STATUS_OFFSET, status)
+                    tail += 1
+                COUNTER.pack_into(buffer, offset + TAIL_OFFSET, tail)
+                done.release()
+                if closing:
+                    return
+    finally:
+        del buffer
+        segment.close()
+
+
+class _Ring:
+    """The parent's view of one worker's ring."""
+
+    def __init__(self, offset: int, doorbell, done, process):
+        self.offset = offset
+        self.doorbell = doorbell
+        self.done = done
+        self.process = process
+        self.head = 0       # records written
+        self.consumed = 0   # records whose results were read back
+
+
+class SharedMemoryTransport:
+    """
+    Long-lived worker processes fed through shared memory ring buffers.
+
+    The transport runs one batch at a time; it is not safe to share between threads.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        capacity (int): Slots per ring.
+        group_size (int): Records written per doorbell.
+    """
+
+    def __init__(self, workers: Optional[int] = None, capacity: int = DEFAULT_RING_CAPACITY,
+                 group_size: int = DEFAULT_GROUP_SIZE, context: Optional[Context] = None,
+                 lossy: Optional[bool] = None, poll_interval: float = 1.0):
+        """
+        Create the shared segment and start the workers.
+
+        Args:
+            workers (Optional[int]): Worker processes; defaults to the CPU count.
+            capacity (int): Slots per ring.
+            group_size (int): Records per doorbell; at most `capacity`.
+            context (Optional[Context]): The decimal context the workers compute under; defaults to the caller's.
+            lossy (Optional[bool]): Use float arithmetic; defaults to the configured mode.
+            poll_interval (float): Seconds between liveness checks while waiting on a worker.
+
+        Raises:
+            ValueError: If the sizes are invalid.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        if capacity < 1 or not 1 <= group_size <= capacity:
+            raise ValueError(f"Invalid ring sizes: capacity={capacity}, group_size={group_size}")
+        self.capacity = capacity
+        self.group_size = group_size
+        self.poll_interval = poll_interval
+        self._context = (context or getcontext()).copy()
+        self._lossy = is_lossy() if lossy is None else lossy
+        ring_size = RING_HEADER_SIZE + capacity * RECORD.size
+        self._segment = SharedMemory(create=True, size=ring_size * self.workers)
+        self._buffer = self._segment.buf
+        self._rings: List[_Ring] = []
+        self._closed = False
+        processes = get_context()
+        for index in range(self.workers):
+            offset = index * ring_size
+            RING_HEADER.pack_into(self._buffer, offset, 0, 0, 0)
+            doorbell, done = processes.Semaphore(0), processes.Semaphore(0)
+            process = processes.Process(target=_worker_main, daemon=True,
+                                        args=(self._segment.name, offset, capacity, doorbell, done,
+                                              self._context, self._lossy))
+            process.start()
+            self._rings.append(_Ring(offset, doorbell, done, process))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute_records(self, records: Iterable[Record]) -> Iterator[Outcome]:
+        """
+        Execute a stream of records, yielding outcomes in input order.
+
+        At most `capacity` records per worker are in flight, so memory stays flat.
+
+        Args:
+            records (Iterable[Record]): The records, e.g. from calculator.streaming.read_records.
+
+        Yields:
+            Outcome: The outcome of every record.
+
+        Raises:
+            TransportError: If the transport is closed or a worker dies.
+        """
+        if self._closed:
+            raise TransportError("The shared memory transport is closed.")
+        pending = deque()  # (ring, end, entries) per group, oldest first
+        records = iter(records)
+        turn = 0
+        try:
+            while True:
+                chunk = [(record, command_registry.get(record.operation)) for record in
+                         islice(records, self.group_size)]
+                if not chunk:
+                    break
+                ring = self._rings[turn % self.workers]
+                turn += 1
+                entries = [self._slot_for(record, command_class) for record, command_class in chunk]
+                needed = sum(1 for entry in entries if entry is None)
+                while ring.head + needed - ring.consumed > self.capacity:
+                    yield from self._collect(*pending.popleft())
+                pending.append((ring, *self._write(ring, chunk, entries)))
+            while pending:
+                yield from self._collect(*pending.popleft())
+        finally:
+            # Abandoned mid-stream: wait for the workers so the rings start empty next time
+            for ring in self._rings:
+                if ring.consumed < ring.head:
+                    self._wait(ring, ring.head)
+                    ring.consumed = ring.head
+
+    @staticmethod
+    def _slot_for(record: Record, command_class):
+        """Return None if the record can travel through a ring, else the (record, command class) to run locally."""
+        if (record.a is not None and command_class is not None and record.operation in _OPCODES
+                and command_class is BUILTIN_COMMANDS[record.operation]
+                and len(record.a) <= OPERAND_WIDTH and len(record.b) <= OPERAND_WIDTH
+                and record.a.isascii() and record.b.isascii()):
+            return None
+        return record, command_class
+
+    def _write(self, ring: _Ring, chunk: List[tuple], entries: List):
+        """Write a group's ring records, ring the doorbell, and return (end, entries) for collection."""
+        slots = ring.offset + RING_HEADER_SIZE
+        head = ring.head
+        for index, ((record, _), entry) in enumerate(zip(chunk, entries)):
+            if entry is None:
+                RECORD.pack_into(self._buffer, slots + (head % self.capacity) * RECORD.size,
+                                 _OPCODES[record.operation], STATUS_PENDING,
+                                 record.a.encode("ascii"), record.b.encode("ascii"), b"")
+                entries[index] = (record, head)
+                head += 1
+        ring.head = head
+        COUNTER.pack_into(self._buffer, ring.offset, head)
+        ring.doorbell.release()
+        return head, entries
+
+    def _wait(self, ring: _Ring, end: int):
+        """Block until the ring's worker has processed every record before `end`."""
+        while COUNTER.unpack_from(self._buffer, ring.offset + TAIL_OFFSET)[0] < end:
+            if not ring.done.acquire(timeout=self.poll_interval) and not ring.process.is_alive():
+                raise TransportError(f"Transport worker {ring.process.pid} exited with code {ring.process.exitcode}.")
+
+    def _collect(self, ring: _Ring, end: int, entries: List) -> Iterator[Outcome]:
+        """Read back one group's outcomes, in order."""
+        self._wait(ring, end)
+        slots = ring.offset + RING_HEADER_SIZE
+        with localcontext(self._context) as active:
+            for record, slot in entries:
+                if isinstance(slot, int):
+                    position = slots + (slot % self.capacity) * RECORD.size
+                    if FLAG.unpack_from(self._buffer, position + STATUS_OFFSET)[0] == STATUS_OK:
+                        text = RESULT.unpack_from(self._buffer, position + RESULT_OFFSET)[0]
+                        yield Outcome(record, Decimal(text.rstrip(b"\0").decode("ascii")), None)
+                        continue
+                    slot = command_registry.get(record.operation)
+                yield _execute_record(record, slot, active, self._lossy)
+        ring.consumed = end
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stop the workers and release the shared memory segment.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for ring in self._rings:
+            FLAG.pack_into(self._buffer, ring.offset + CLOSING_OFFSET, 1)
+            ring.doorbell.release()
+        deadline = time.monotonic() + timeout
+        for ring in self._rings:
+            ring.process.join(max(0.0, deadline - time.monotonic()))
+            if ring.process.is_alive():
+                ring.process.terminate()
+                ring.process.join()
+        self._buffer = None
+        self._segment.close()
+        self._segment.unlink()
@@ -0,0 +1,291 @@
+"""
+Sinks Module
+
+This module writes calculation results in machine-readable formats.
+
+A sink takes rows of (operation, a, b, result, error) and buffers them. Each
+chunk of rows is encoded in one pass and written with a single write() call,
+then the stream is flushed, so the output is flushed once per chunk rather than
+once per line. Four formats are available:
+
+    text      '<operation> <a> <b> = <result>' or '... ! <error>', as in batch mode
+    csv       a header line, then one row per result
+    jsonl     one JSON object per line; numbers are strings so no precision is lost
+    columnar  a compact binary format (see below); needs a binary stream
+
+The columnar format is laid out like an Arrow record batch stream. Each chunk
+is stored column by column. A file starts with MAGIC, followed by batches,
+and ends with an empty batch. A batch is:
+
+    BATCH_HEADER    rows, dictionary size (two little-endian uint32s)
+    dictionary      the distinct operation names of the batch, as a string column
+    codes           one uint16 per row indexing the dictionary
+    a, b, result, error
+                    nullable string columns
+
+A string column is a uint32 offsets array (rows + 1 entries) followed by the
+UTF-8 data. A nullable column is preceded by one validity byte per row.
+read_columnar reads the format back.
+
+Usage:
+    with open_sink("jsonl", sys.stdout) as sink:
+        for outcome in outcomes:
+            sink.write_outcome(outcome)
+"""
+
+import csv
+import io
+import json
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from collections import namedtuple
+from itertools import accumulate
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+DEFAULT_SINK_CHUNK = 1024
+
+Row = namedtuple("Row", ["operation", "a", "b", "result", "error"])
+
+MAGIC = b"CALCCOL1"
+BATCH_HEADER = struct.Struct("<II")
+_SWAP = sys.byteorder != "little"  # arrays are stored little-endian
+
+
+class Sink(ABC):
+    """
+    Buffers rows and writes them one chunk at a time.
+
+    Attributes:
+        stream: The output stream (text, or binary when `binary` is True).
+        chunk_size (int): Rows buffered before a chunk is written.
+    """
+
+    binary = False
+
+    def __init__(self, stream, chunk_size: int = DEFAULT_SINK_CHUNK):
+        """
+        Raises:
+            ValueError: If the chunk size is not positive.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._written = 0
+        self._buffer: List[tuple] = []  # plain (operation, a, b, result, error) tuples
+        self._started = False
+
+    @property
+    def rows(self) -> int:
+        """Rows written so far, including buffered ones."""
+        return self._written + len(self._buffer)
+
+    def write(self, operation: str, a, b, result=None, error: Optional[str] = None):
+        """
+        Buffer one row; a or b is None for input that could not be parsed into operands.
+        """
+        self._buffer.append((operation, a, b, result, error))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_outcome(self, outcome):
+        """
+        Buffer a batch outcome (see calculator.streaming.Outcome).
+        """
+        (_, operation, a, b), result, error = outcome
+        self._buffer.append((operation, a, b, result, error))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[Row]):
+        """
+        Buffer many rows.
+        """
+        for row in rows:
+            self.write(*row)
+
+    def flush(self):
+        """
+        Encode and write the buffered rows as one chunk, then flush the stream.
+        """
+        if not self._started:
+            self._started = True
+            self._start()
+        if self._buffer:
+            rows, self._buffer = self._buffer, []
+            self._written += len(rows)
+            self.stream.write(self._encode(rows))
+        self.stream.flush()
+
+    def close(self):
+        """
+        Write the remaining rows and any trailer. The stream itself is left open.
+        """
+        self.flush()
+        self._finish()
+        self.stream.flush()
+
+    def _start(self):
+        """Write a header before the first chunk."""
+
+    def _finish(self):
+        """Write a trailer after the last chunk."""
+
+    @abstractmethod
+    def _encode(self, rows: List[tuple]):
+        """Encode a chunk of (operation, a, b, result, error) tuples as one str (or bytes, for binary sinks)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def format_text_row(row: tuple) -> str:
+    """
+    Format a row as '<operation> <a> <b> = <result>' or '<operation> <a> <b> ! <error>'.
+    """
+    operation, a, b, result, error = row
+    source = operation if a is None else f"{operation} {a} {b}"
+    if error is not None:
+        return f"{source} ! {error}\n"
+    return f"{source} = {result}\n"
+
+
+class TextSink(Sink):
+    """The batch mode's line format."""
+
+    def _encode(self, rows: List[tuple]) -> str:
+        return "".join(map(format_text_row, rows))
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class CsvSink(Sink):
+    """Comma-separated values with a header line. Missing values are empty fields."""
+
+    def __init__(self, stream, chunk_size: int = DEFAULT_SINK_CHUNK):
+        super().__init__(stream, chunk_size)
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text, lineterminator="\n")
+
+    def _start(self):
+        self.stream.write(",".join(Row._fields) + "\n")
+
+    def _encode(self, rows: List[tuple]) -> str:
+        self._text.seek(0)
+        self._text.truncate()
+        self._writer.writerows(rows)
+        return self._text.getvalue()
+
+
+class JsonLinesSink(Sink):
+    """One JSON object per row. Numbers are written as strings to keep them exact."""
+
+    def _encode(self, rows: List[tuple]) -> str:
+        dumps = json.dumps
+        return "".join(dumps({"operation": operation, "a": _text(a), "b": _text(b),
+                              "result": _text(result), "error": error}) + "\n"
+                       for operation, a, b, result, error in rows)
+
+
+def _string_column(values: List[Optional[str]], nullable: bool) -> bytes:
+    """Encode a string column as [validity bytes] + uint32 offsets + UTF-8 data."""
+    data = [b"" if value is None else str(value).encode() for value in values]
+    offsets = array("I", accumulate(map(len, data), initial=0))
+    if _SWAP:
+        offsets.byteswap()
+    parts = [offsets.tobytes(), b"".join(data)]
+    if nullable:
+        parts.insert(0, bytes(value is not None for value in values))
+    return b"".join(parts)
+
+
+class ColumnarSink(Sink):
+    """The compact binary columnar format described in the module docstring."""
+
+    binary = True
+
+    def _start(self):
+        self.stream.write(MAGIC)
+
+    def _encode(self, rows: List[tuple]) -> bytes:
+        operation, a, b, result, error = zip(*rows)
+        dictionary = list(dict.fromkeys(operation))
+        index = {name: code for code, name in enumerate(dictionary)}
+        codes = array("H", (index[name] for name in operation))
+        if _SWAP:
+            codes.byteswap()
+        return b"".join([BATCH_HEADER.pack(len(rows), len(dictionary)),
+                         _string_column(dictionary, False), codes.tobytes(),
+                         *(_string_column(column, True) for column in (a, b, result, error))])
+
+    def _finish(self):
+        self.stream.write(BATCH_HEADER.pack(0, 0))
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated columnar stream.")
+    return data
+
+
+def _read_string_column(stream: BinaryIO, rows: int, nullable: bool) -> List[Optional[str]]:
+    valid = _read_exact(stream, rows) if nullable else None
+    offsets = array("I")
+    offsets.frombytes(_read_exact(stream, 4 * (rows + 1)))
+    if _SWAP:
+        offsets.byteswap()
+    data = _read_exact(stream, offsets[-1])
+    return [None if valid is not None and not valid[i] else data[offsets[i]:offsets[i + 1]].decode()
+            for i in range(rows)]
+
+
+def read_columnar(stream: BinaryIO) -> Iterator[Row]:
+    """
+    Read rows written by ColumnarSink. Every value is returned as a string (or None).
+
+    Raises:
+        ValueError: If the stream is not in the columnar format or is truncated.
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a columnar results stream.")
+    while True:
+        rows, dictionary_size = BATCH_HEADER.unpack(_read_exact(stream, BATCH_HEADER.size))
+        if rows == 0:
+            return
+        dictionary = _read_string_column(stream, dictionary_size, False)
+        codes = array("H")
+        codes.frombytes(_read_exact(stream, 2 * rows))
+        if _SWAP:
+            codes.byteswap()
+        columns = [_read_string_column(stream, rows, True) for _ in range(4)]
+        yield from (Row(dictionary[code], *values) for code, *values in zip(codes, *columns))
+
+
+SINKS = {
+    "text": TextSink,
+    "csv": CsvSink,
+    "jsonl": JsonLinesSink,
+    "columnar": ColumnarSink,
+}
+
+
+def open_sink(output_format: str, stream, chunk_size: int = DEFAULT_SINK_CHUNK) -> Sink:
+    """
+    Create a sink for one of the SINKS formats.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    try:
+        sink_class = SINKS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {output_format}. Choose from {', '.join(SINKS)}.") from None
+    return sink_class(stream, chunk_size)
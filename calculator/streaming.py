@@ -0,0 +1,191 @@
+"""
+Streaming Batch Module
+
+This module processes large streams of '<operation> <num1> <num2>' records with
+bounded memory. Records are read lazily, grouped into chunks, and each chunk is
+executed on an executor. Only a fixed window of chunks is ever in flight, so the
+memory used does not grow with the size of the input. Results are written as soon
+as their chunk completes, either in input order or in completion order, through
+an output sink (see calculator.sinks) in text, CSV, JSON-lines or columnar form.
+"""
+
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from decimal import Context, InvalidOperation, getcontext, localcontext
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from calculator.command_registry import command_registry
+from calculator.executor import InlineExecutor
+from calculator.precision import compute, is_lossy, parse_operand, uses_fast_path
+from calculator.sinks import format_text_row, open_sink
+
+Record = namedtuple("Record", ["line_number", "operation", "a", "b"])
+Outcome = namedtuple("Outcome", ["record", "result", "error"])
+BatchStats = namedtuple("BatchStats", ["records", "errors", "elapsed", "throughput"])
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_WINDOW = 8
+
+
+def read_records(lines: Iterable[str]) -> Iterator[Record]:
+    """
+    Lazily split input lines into records, skipping blank lines and '#' comments.
+
+    A line that does not have exactly three fields is still yielded, with the
+    missing fields set to None, so the error can be reported in order.
+
+    Args:
+        lines (Iterable[str]): The input lines, e.g. an open file or sys.stdin.
+
+    Yields:
+        Record: One record per non-empty line.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        if len(parts) != 3:
+            yield Record(line_number, line.strip(), None, None)
+            continue
+        yield Record(line_number, parts[0], parts[1], parts[2])
+
+
+def execute_chunk(chunk: List[tuple], context: Optional[Context] = None, lossy: bool = False) -> List[Outcome]:
+    """
+    Execute a chunk of resolved records. This runs on a worker.
+
+    Args:
+        chunk (List[tuple]): (record, command class or None) pairs.
+        context (Optional[Context]): The decimal context to run under.
+        lossy (bool): Use float arithmetic.
+
+    Returns:
+        List[Outcome]: One outcome per record, in the same order.
+    """
+    with localcontext(context or getcontext()) as active:
+        return [_execute_record(record, command_class, active, lossy) for record, command_class in chunk]
+
+
+def _execute_record(record: Record, command_class, context: Context, lossy: bool) -> Outcome:
+    """Execute one record, turning failures into an error message."""
+    if record.a is None:
+        return Outcome(record, None, "Invalid input format. Use: <operation> <num1> <num2>")
+    if command_class is None:
+        return Outcome(record, None, f"Invalid operation type: {record.operation}")
+    try:
+        a, b = parse_operand(record.a), parse_operand(record.b)
+        # Integer operands (parsed to int) and lossy mode go through the fast-path dispatcher
+        result = compute(command_class, a, b, context, lossy) if uses_fast_path(a, b, lossy) \
+            else command_class.compute(a, b)
+        return Outcome(record, result, None)
+    except InvalidOperation:
+        return Outcome(record, None, f"Invalid input: {record.a} or {record.b} is not a valid number.")
+    except Exception as e:  # pylint: disable=broad-except
+        return Outcome(record, None, str(e))
+
+
+def _resolved_chunks(records: Iterable[Record], chunk_size: int) -> Iterator[List[tuple]]:
+    """Group records into chunks, resolving each operation against the registry."""
+    records = iter(records)
+    while True:
+        chunk = [(record, command_registry.get(record.operation)) for record in islice(records, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def execute_records(records: Iterable[Record], executor: Optional[Executor] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, window: int = DEFAULT_WINDOW,
+                    ordered: bool = True, context: Optional[Context] = None,
+                    lossy: Optional[bool] = None) -> Iterator[Outcome]:
+    """
+    Execute a stream of records with at most `window` chunks in flight.
+
+    Args:
+        records (Iterable[Record]): The records to execute.
+        executor (Optional[Executor]): Where chunks run; defaults to inline execution.
+        chunk_size (int): Number of records submitted per task.
+        window (int): Maximum number of chunks in flight at once.
+        ordered (bool): Yield outcomes in input order (True) or completion order (False).
+        context (Optional[Context]): The decimal context for every record; defaults to the caller's.
+        lossy (Optional[bool]): Use float arithmetic; defaults to the configured mode.
+
+    Yields:
+        Outcome: The outcome of every record.
+    """
+    executor = executor or InlineExecutor()
+    context = context or getcontext()
+    lossy = is_lossy() if lossy is None else lossy
+    pending = deque()
+    for chunk in _resolved_chunks(records, chunk_size):
+        pending.append(executor.submit(execute_chunk, chunk, context, lossy))
+        while len(pending) >= window:
+            for future in _next_completed(pending, ordered):
+                yield from future.result()
+    while pending:
+        for future in _next_completed(pending, ordered):
+            yield from future.result()
+
+
+def _next_completed(pending: deque, ordered: bool) -> list:
+    """Remove and return the next future(s) to consume from the in-flight window."""
+    if ordered:
+        return [pending.popleft()]
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+    return list(done)
+
+
+def format_outcome(outcome: Outcome) -> str:
+    """
+    Format an outcome as a single output line.
+
+    Returns:
+        str: '<operation> <num1> <num2> = <result>' or '<operation> <num1> <num2> ! <error>'.
+    """
+    (_, operation, a, b), result, error = outcome
+    return format_text_row((operation, a, b, result, error))
+
+
+def run_batch(lines: Iterable[str], output, executor: Optional[Executor] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, window: int = DEFAULT_WINDOW,
+              ordered: bool = True, context: Optional[Context] = None,
+              lossy: Optional[bool] = None, transport=None, output_format: str = "text") -> BatchStats:
+    """
+    Stream records from `lines`, execute them and write results to `output`.
+
+    Args:
+        lines (Iterable[str]): Input lines in '<operation> <num1> <num2>' form.
+        output: A writable stream; binary for the columnar format, text otherwise.
+        executor (Optional[Executor]): Where chunks run; defaults to inline execution.
+        chunk_size (int): Number of records submitted per task.
+        window (int): Maximum number of chunks in flight at once.
+        ordered (bool): Preserve input order in the output.
+        context (Optional[Context]): The decimal context for every record; defaults to the caller's.
+        lossy (Optional[bool]): Use float arithmetic; defaults to the configured mode.
+        transport: Run the records through this transport (a SharedMemoryTransport or a
+            distributed Coordinator) instead of the executor. It keeps input order and uses the
+            context and lossy mode it was created with (by default, those of its creator).
+        output_format (str): One of calculator.sinks.SINKS; results are written a chunk at a time.
+
+    Returns:
+        BatchStats: Record and error counts, elapsed seconds and records per second.
+    """
+    started = time.perf_counter()
+    count = errors = 0
+    if transport is not None:
+        outcomes = transport.execute_records(read_records(lines))
+    else:
+        outcomes = execute_records(read_records(lines), executor, chunk_size, window, ordered, context, lossy)
+    with open_sink(output_format, output, chunk_size) as sink:
+        write = sink.write_outcome
+        for outcome in outcomes:
+            count += 1
+            if outcome[2] is not None:
+                errors += 1
+            write(outcome)
+    elapsed = time.perf_counter() - started
+    return BatchStats(count, errors, elapsed, count / elapsed if elapsed > 0 else 0.0)
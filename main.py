@@ -1,44 +1,90 @@
 import sys
 import os
+import time
+import argparse
+import contextlib
 import importlib
 from decimal import Decimal, InvalidOperation
+import calculator.command  # Registers the builtin commands
 from calculator.command_registry import command_registry  # Import the registry
-import multiprocessing
+from calculator.expressions import ExpressionSession
+from calculator.plugin_manifest import load_manifest
+from calculator.cache import MISSING, configure_cache, get_result_cache
+from calculator.log_pipeline import EVENTS_LOGGER, DeferredHandler, configure_pipeline
+from calculator.executor import EXECUTOR_MODES, configure_executor, get_executor, shutdown_executor
+from calculator.metrics import configure_metrics, export_metrics, get_metrics
+from calculator.reductions import DEFAULT_REDUCE_CHUNK
+from calculator.precision import ROUNDING_MODES, configure_precision, parse_operand
+from calculator.scheduler import POLICIES, configure_scheduler, get_scheduler
+from calculator.settings import DEFAULT_ADDRESS, get_settings
+from calculator.sinks import SINKS, open_sink
+from calculator.streaming import DEFAULT_CHUNK_SIZE, run_batch
 
 import logging
-import logging.config
-from dotenv import load_dotenv
+
+# Per-calculation events; sampled and formatted lazily (see calculator.log_pipeline)
+events = logging.getLogger(EVENTS_LOGGER)
 
 
 def load_environment_variables():
-    load_dotenv()
-    settings = {key: value for key, value in os.environ.items()}
+    """
+    Loads .env (if present) and returns the typed settings the calculator reads from the environment.
+    """
+    settings = get_settings()
     logging.info("Environment variables loaded.")
-    logging.debug(f"Loaded environment variables: {settings}")
     return settings
 
 
-def configure_logging():
+def configure_logging(mode=None, log_format=None, sample_rate=None, deferred=False):
+    """
+    Loads logging.conf (or a basic console configuration) and arranges the handlers.
+
+    Args:
+        mode: 'sync' (default) or 'queue', which writes log records on a background thread ($CALCULATOR_LOG_MODE).
+        log_format: 'text' (default) or 'json' for JSON lines ($CALCULATOR_LOG_FORMAT).
+        sample_rate: Keep one in every N per-calculation events below WARNING ($CALCULATOR_LOG_SAMPLE).
+        deferred: Fast start ($CALCULATOR_FAST_START): log warnings and errors only, and build the
+            handlers when the first one is logged.
+    """
+    if deferred:
+        root = logging.getLogger()
+        root.setLevel(logging.WARNING)
+        root.addHandler(DeferredHandler(lambda: configure_logging(mode, log_format, sample_rate)))
+        return
     os.makedirs("logs", exist_ok=True)
     logging_conf_path = "logging.conf"
     if os.path.exists(logging_conf_path):
-        logging.config.fileConfig(logging_conf_path, disable_existing_loggers=False)
+        from logging.config import fileConfig  # pylint: disable=import-outside-toplevel
+        fileConfig(logging_conf_path, disable_existing_loggers=False)
         logging.info("Logging configuration loaded from 'logging.conf'.")
     else:
         logging.basicConfig(
             level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
         )
         logging.info("Default logging configuration applied.")
+    settings = get_settings()
+    configure_pipeline(mode or settings.log_mode, log_format or settings.log_format,
+                       sample_rate or settings.log_sample)
     logging.info("Logging configured.")
 
 
-def load_plugins():
+def load_plugins(lazy=True):
     """
-    Dynamically loads all command plugins from the plugins folder.
+    Registers all command plugins from the plugins folder.
+
+    By default plugins are registered lazily from a cached manifest and each
+    module is only imported when its command is first looked up. With
+    lazy=False every plugin module is imported immediately.
     """
     plugins_dir = os.path.join(os.path.dirname(__file__), 'calculator', 'plugins')
     logging.info(f"Loading plugins from directory: {plugins_dir}")
-    for filename in os.listdir(plugins_dir):
+    if lazy:
+        manifest = load_manifest(plugins_dir)
+        for command_name, module_name in manifest["commands"].items():
+            command_registry.register_lazy(command_name, module_name)
+        logging.info(f"Registered {len(manifest['commands'])} plugin commands lazily.")
+        return
+    for filename in sorted(os.listdir(plugins_dir)):
         if filename.endswith('.py') and filename != '__init__.py':
             module_name = f"calculator.plugins.{filename[:-3]}"  # Remove .py extension
             logging.debug(f"Importing plugin: {module_name}")
@@ -46,55 +92,231 @@ def load_plugins():
     logging.info("All plugins loaded.")
 
 
-def perform_calculation_and_display(value1, value2, operation_type):
+def profile_startup(started):
+    """
+    Imports every pending plugin and reports per-plugin import times to stderr.
+    """
+    manifest_ready = time.perf_counter()
+    command_registry.load_all()
+    print(f"Startup profile: {1000 * (manifest_ready - started):.2f} ms before plugin imports", file=sys.stderr)
+    for module_name, seconds in sorted(command_registry.import_times.items(), key=lambda item: -item[1]):
+        print(f"  {module_name}: {1000 * seconds:.2f} ms", file=sys.stderr)
+    total = sum(command_registry.import_times.values())
+    print(f"  total plugin import time: {1000 * total:.2f} ms", file=sys.stderr)
+
+
+def _display(sink, sentence, operation_type, value1, value2, result=None, error=None):
+    """
+    Prints the sentence, or writes the outcome as a row when an output sink is given.
+    """
+    if sink is None:
+        print(sentence)
+    else:
+        sink.write(operation_type, value1, value2, result, error)
+
+
+def perform_calculation_and_display(value1, value2, operation_type, *more_values, sink=None):
     """
-    Executes the specified arithmetic operation on two inputs using multiprocessing
-    and displays the outcome.
+    Executes the specified arithmetic operation on two inputs (or more, for
+    reduction commands such as sum) using the shared worker pool and displays
+    the outcome, or writes it as a row to `sink` (see calculator.sinks).
     """
+    # Stage timings are only recorded when metrics are enabled; otherwise the stopwatch is a no-op
+    stopwatch = get_metrics().stopwatch()
+    stopwatch.count("requests")
     try:
-        logging.info(f"Performing calculation: {operation_type} with values {value1} and {value2}")
+        events.info("Performing calculation: %s with values %s and %s", operation_type, value1, value2)
         
         # Convert inputs to Decimal
         decimal_value1 = Decimal(value1)
         decimal_value2 = Decimal(value2)
-        logging.debug(f"Converted values to Decimal: {decimal_value1}, {decimal_value2}")
+        stopwatch.lap("parse")
+        events.debug("Converted values to Decimal: %s, %s", decimal_value1, decimal_value2)
+        if more_values:
+            perform_reduction_and_display([value1, value2, *more_values], operation_type, sink=sink)
+            return
+
+        # Answer repeated calculations from the result cache when it is enabled
+        cache = get_result_cache()
+        if cache is not None:
+            cache_key = cache.make_key(operation_type, decimal_value1, decimal_value2)
+            cached = cache.get(cache_key)
+            if cached is not MISSING:
+                stopwatch.count("cache_hits")
+                events.info("Cache hit: %s %s %s = %s", value1, operation_type, value2, cached)
+                _display(sink, f"The result of {value1} {operation_type} {value2} is {cached}",
+                         operation_type, value1, value2, result=cached)
+                return
 
         # Get the command class from the registry
         command_class = command_registry.get(operation_type)
+        stopwatch.lap("lookup")
         if not command_class:
-            logging.error(f"Invalid operation type: {operation_type}")
-            print(f"Invalid operation type: {operation_type}")
+            stopwatch.count("errors")
+            events.error("Invalid operation type: %s", operation_type)
+            message = f"Invalid operation type: {operation_type}"
+            _display(sink, message, operation_type, value1, value2, error=message)
             return
 
         # Create an instance of the command with the provided arguments
-        command_instance = command_class(decimal_value1, decimal_value2)
-        logging.debug(f"Command instance created: {command_instance}")
+        # Integer text takes the exact int fast path for commands that have one
+        operands = (parse_operand(value1), parse_operand(value2)) if getattr(command_class, "int_kernel", None) \
+            else (decimal_value1, decimal_value2)
+        command_instance = command_class(*operands)
+        events.debug("Command instance created: %s", command_instance)
 
-        # Set up multiprocessing to execute the command
-        result_queue = multiprocessing.Queue()
-        logging.info("Starting process to execute the command.")
-        process = multiprocessing.Process(target=command_instance.execute_in_process, args=(result_queue,))
-        process.start()
-        process.join()
-
-        # Get the result from the process
-        result = result_queue.get()
-        logging.info(f"Process completed. Result: {result}")
+        # Let the scheduler run cheap commands inline and offload expensive ones
+        events.debug("Submitting the command to the scheduler.")
+        future = get_scheduler().submit(command_instance, name=operation_type)
+        try:
+            result = future.result()
+        except Exception as e:  # pylint: disable=broad-except
+            result = e
+        events.debug("Execution completed. Result: %s", result)
 
         # Display the result or handle any errors
         if isinstance(result, Exception):
-            logging.error(f"An error occurred during the operation: {result}")
-            print(f"An error occurred: {result}")
+            stopwatch.count("errors")
+            events.error("An error occurred during the operation: %s", result)
+            _display(sink, f"An error occurred: {result}", operation_type, value1, value2, error=str(result))
         else:
-            logging.info(f"Calculation result: {value1} {operation_type} {value2} = {result}")
-            print(f"The result of {value1} {operation_type} {value2} is {result}")
+            if cache is not None:
+                cache.put(cache_key, result)
+            events.info("Calculation result: %s %s %s = %s", value1, operation_type, value2, result)
+            _display(sink, f"The result of {value1} {operation_type} {value2} is {result}",
+                     operation_type, value1, value2, result=result)
 
     except InvalidOperation:
-        logging.error(f"Invalid input: {value1} or {value2} is not a valid number.")
-        print(f"Invalid input: {value1} or {value2} is not a valid number.")
+        stopwatch.count("errors")
+        events.error("Invalid input: %s or %s is not a valid number.", value1, value2)
+        message = f"Invalid input: {value1} or {value2} is not a valid number."
+        _display(sink, message, operation_type, value1, value2, error=message)
     except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
-        print(f"An unexpected error occurred: {e}")
+        stopwatch.count("errors")
+        events.error("An unexpected error occurred: %s", e)
+        _display(sink, f"An unexpected error occurred: {e}", operation_type, value1, value2, error=str(e))
+    finally:
+        stopwatch.finish(operation_type)
+
+
+def perform_reduction_and_display(values, operation_type, sink=None):
+    """
+    Runs a reduction command (sum, mean, variance, ...) over any number of
+    operands and displays the outcome, or writes it as a row to `sink`. In a
+    row, `a` holds the first operand and `b` the rest, separated by spaces.
+    """
+    first, rest = values[0], " ".join(values[1:])
+    command_class = command_registry.get(operation_type)
+    if not command_class:
+        events.error("Invalid operation type: %s", operation_type)
+        message = f"Invalid operation type: {operation_type}"
+        _display(sink, message, operation_type, first, rest, error=message)
+        return
+    if not getattr(command_class, "variadic", False):
+        events.error("%s takes exactly two operands, got %d", operation_type, len(values))
+        message = f"Invalid input format. {operation_type} takes exactly two operands."
+        _display(sink, message, operation_type, first, rest, error=message)
+        return
+    try:
+        future = get_scheduler().submit(command_class(*(Decimal(value) for value in values)), name=operation_type)
+        result = future.result()
+    except InvalidOperation:
+        events.error("Invalid input: one of %s is not a valid number.", " ".join(values))
+        message = f"Invalid input: one of {' '.join(values)} is not a valid number."
+        _display(sink, message, operation_type, first, rest, error=message)
+        return
+    except Exception as e:  # pylint: disable=broad-except
+        events.error("An error occurred during the operation: %s", e)
+        _display(sink, f"An error occurred: {e}", operation_type, first, rest, error=str(e))
+        return
+    events.info("Calculation result: %s %s = %s", operation_type, " ".join(values), result)
+    _display(sink, f"The result of {operation_type} {' '.join(values)} is {result}",
+             operation_type, first, rest, result=result)
+
+
+def run_reduce_mode(operation_type, source, chunk_size):
+    """
+    Streams numbers from a file (or stdin for '-') through a reduction command,
+    reducing chunks in parallel on the executor, and prints the result.
+    """
+    command_class = command_registry.get(operation_type)
+    if not command_class or not hasattr(command_class, "reduce"):
+        print(f"Invalid operation type: {operation_type} is not a reduction command.")
+        return None
+    started = time.perf_counter()
+    lines = None
+    try:
+        lines = sys.stdin if source == "-" else open(source, encoding="utf-8")
+        result = command_class.reduce(lines, get_executor(), chunk_size=chunk_size, parse=True)
+    except Exception as e:  # pylint: disable=broad-except
+        logging.error(f"An error occurred during the reduction: {e}")
+        print(f"An error occurred: {e}")
+        return None
+    finally:
+        if lines is not None and lines is not sys.stdin:
+            lines.close()
+    elapsed = time.perf_counter() - started
+    print(f"The result of {operation_type} over {source} is {result}")
+    logging.info(f"Reduced {source} with {operation_type} in {elapsed:.3f}s")
+    print(f"Reduced in {elapsed:.3f}s", file=sys.stderr)
+    return result
+
+
+def run_replay_mode(source):
+    """
+    Re-executes an exported history file on the executor and reports results
+    that differ from the recorded ones.
+    """
+    from calculator.history_io import replay  # pylint: disable=import-outside-toplevel
+    try:
+        report = replay(source, get_executor())
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not replay {source}: {e}")
+        print(f"An error occurred: {e}")
+        return None
+    for mismatch in report.examples:
+        row = mismatch.row
+        print(f"Mismatch at entry {mismatch.index}: {row.operation} {row.a} {row.b} recorded "
+              f"{row.result if row.error is None else row.error}, replayed {mismatch.replayed}")
+    summary = (f"Replayed {report.records} entries ({report.mismatches} mismatches) "
+               f"in {report.elapsed:.3f}s: {report.throughput:.0f} entries/s")
+    logging.info(summary)
+    print(summary)
+    return report
+
+
+def run_batch_mode(source, ordered=True, chunk_size=DEFAULT_CHUNK_SIZE, transport="executor", workers=None,
+                   nodes=None, output_format="text"):
+    """
+    Streams '<operation> <num1> <num2>' records from a file (or stdin for '-')
+    through the executor (or the shared memory or distributed transport), writing
+    results to stdout in the given output format and throughput to stderr.
+    """
+    logging.info(f"Starting batch mode from {source}")
+    with contextlib.ExitStack() as stack:
+        remote = None
+        if transport == "shm":
+            from calculator.shm_transport import SharedMemoryTransport  # pylint: disable=import-outside-toplevel
+            remote = stack.enter_context(SharedMemoryTransport(workers=workers))
+        elif transport == "distributed":
+            from calculator.distributed import Coordinator, LocalCluster  # pylint: disable=import-outside-toplevel
+            if not nodes:
+                nodes = stack.enter_context(LocalCluster(workers or os.cpu_count() or 1)).addresses
+            remote = stack.enter_context(Coordinator(nodes, shard_size=chunk_size))
+        lines = sys.stdin if source == "-" else stack.enter_context(open(source, encoding="utf-8"))
+        executor = get_executor() if remote is None else None
+        output = sys.stdout.buffer if SINKS[output_format].binary else sys.stdout
+        stats = run_batch(lines, output, executor, chunk_size=chunk_size, ordered=ordered, transport=remote,
+                          output_format=output_format)
+        if transport == "distributed":
+            for node in remote.stats():
+                print(f"  {node.node}: {node.records} records in {node.shards} shards, "
+                      f"{node.throughput:.0f} records/s{'' if node.alive else ' (lost)'}", file=sys.stderr)
+    summary = (f"Processed {stats.records} records ({stats.errors} errors) "
+               f"in {stats.elapsed:.3f}s: {stats.throughput:.0f} records/s")
+    logging.info(summary)
+    print(summary, file=sys.stderr)
+    return stats
 
 
 def display_menu():
@@ -105,12 +327,68 @@ def display_menu():
     print("Available commands:", ", ".join(command_registry.keys()))
 
 
+def display_policy_decisions(limit=10):
+    """
+    Displays the most recent execution policy decisions.
+    """
+    policy = get_scheduler().policy
+    print(f"Execution policy: {policy.name}")
+    for decision in list(policy.decisions)[-limit:]:
+        where = "offload" if decision.offload else "inline"
+        print(f"  {decision.command}: {where} (cost={decision.cost}, predicted={decision.predicted}, {decision.reason})")
+
+
+def display_cache_stats():
+    """
+    Displays the result cache counters.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        print("Result cache is disabled. Start with --cache to enable it.")
+        return
+    stats = cache.stats()
+    print(f"Cache: {stats['size']}/{stats['maxsize']} entries, {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['evictions']} evictions, {stats['expirations']} expirations, hit rate {stats['hit_rate']:.1%}")
+
+
+def display_metrics():
+    """
+    Displays the collected metrics and refreshes the Prometheus export file, if one was configured.
+    """
+    metrics = get_metrics()
+    if not metrics.enabled:
+        print("Metrics are disabled. Start with --metrics to enable them.")
+        return
+    print("Metrics:")
+    for line in metrics.summary() or ["  nothing recorded yet"]:
+        print(line)
+    path = export_metrics()
+    if path:
+        print(f"Metrics written to {path}")
+
+
+def evaluate_expression_and_display(session, text, name=None):
+    """
+    Evaluates an infix expression (optionally assigning it to a variable) and
+    displays the outcome.
+    """
+    try:
+        result = session.assign(name, text) if name else session.evaluate(text)
+        logging.info(f"Expression result: {text} = {result}")
+        print(f"The result of {text} is {result}" + (f" (stored in {name})" if name else ""))
+    except Exception as e:  # pylint: disable=broad-except
+        logging.error(f"An error occurred evaluating {text}: {e}")
+        print(f"An error occurred: {e}")
+
+
 def repl():
     """
     Interactive REPL loop for the calculator using command pattern.
     """
     print("Welcome to the Interactive Calculator. Type 'exit' to quit or 'menu' to see available commands.")
+    print("Use 'eval <expression>' or 'let <name> = <expression>' for formulas, e.g. 'eval (2 + x) * mean(4, $1)'.")
     display_menu()  # Display menu at the start
+    session = ExpressionSession()
 
     while True:
         user_input = input("Enter command (e.g., 'add 5 3'): ").strip()
@@ -118,33 +396,235 @@ def repl():
 
         if user_input.lower() == 'exit':
             logging.info("Exiting the REPL.")
+            shutdown_executor()
             print("Goodbye!")
             break
         elif user_input.lower() == 'menu':
             display_menu()
             continue
+        elif user_input.lower() == 'policy':
+            display_policy_decisions()
+            continue
+        elif user_input.lower() == 'stats':
+            display_cache_stats()
+            continue
+        elif user_input.lower() == 'metrics':
+            display_metrics()
+            continue
+        keyword, _, rest = user_input.partition(' ')
+        if keyword.lower() == 'eval':
+            evaluate_expression_and_display(session, rest.strip())
+            continue
+        if keyword.lower() == 'let':
+            name, _, text = rest.partition('=')
+            evaluate_expression_and_display(session, text.strip(), name.strip())
+            continue
         parts = user_input.split()
         if len(parts) < 3:
             logging.warning(f"Invalid input format: {user_input}. Expected format: <operation> <num1> <num2>")
             print("Invalid input format. Use: <operation> <num1> <num2>")
             continue
         operation, num1, num2 = parts[0], parts[1], parts[2]
-        logging.info(f"Processing command: {operation} {num1} {num2}")
-        perform_calculation_and_display(num1, num2, operation)
+        logging.info(f"Processing command: {' '.join(parts)}")
+        perform_calculation_and_display(num1, num2, operation, *parts[3:])
+
+
+def display_jobs(engine):
+    """
+    Displays every job submitted in the asynchronous REPL and its status.
+    """
+    jobs = engine.jobs()
+    if not jobs:
+        print("No jobs submitted yet.")
+    for job in jobs:
+        print(f"  [{job.id}] {job.operation} {job.value1} {job.value2}: {job.status}")
+
+
+async def async_repl():
+    """
+    Asynchronous REPL: each calculation is submitted as a job and its id is
+    returned immediately. Results are printed as they complete; 'wait <id>'
+    (or 'await <id>') blocks on one job and 'jobs' lists them all.
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+    from calculator.jobs import AsyncEngine  # pylint: disable=import-outside-toplevel
+    loop = asyncio.get_running_loop()
+    engine = AsyncEngine(on_complete=lambda job: print(f"[{job.id}] {job.describe()}"))
+    print("Welcome to the Asynchronous Calculator. Type 'exit' to quit or 'menu' to see available commands.")
+    display_menu()
+
+    while True:
+        try:
+            user_input = (await loop.run_in_executor(None, input, "Enter command (e.g., 'add 5 3'): ")).strip()
+        except EOFError:
+            user_input = "exit"
+        logging.info(f"User input received: {user_input}")
+        command = user_input.lower()
+
+        if command == 'exit':
+            logging.info("Exiting the asynchronous REPL.")
+            await engine.wait_all()
+            shutdown_executor()
+            print("Goodbye!")
+            break
+        elif command == 'menu':
+            display_menu()
+            continue
+        elif command == 'policy':
+            display_policy_decisions()
+            continue
+        elif command == 'stats':
+            display_cache_stats()
+            continue
+        elif command == 'metrics':
+            display_metrics()
+            continue
+        elif command == 'jobs':
+            display_jobs(engine)
+            continue
+        parts = user_input.split()
+        if parts and parts[0].lower() in ('wait', 'await'):
+            try:
+                job = await engine.wait(int(parts[1]))
+                print(f"[{job.id}] {job.describe()}")
+            except (IndexError, ValueError, KeyError):
+                print("Usage: wait <job id> (see 'jobs' for ids)")
+            continue
+        if len(parts) < 3:
+            logging.warning(f"Invalid input format: {user_input}. Expected format: <operation> <num1> <num2>")
+            print("Invalid input format. Use: <operation> <num1> <num2>")
+            continue
+        job = engine.submit(parts[0], parts[1], parts[2])
+        logging.info(f"Submitted job {job.id}: {parts[0]} {parts[1]} {parts[2]}")
+        print(f"Submitted job {job.id}")
 
 
-def main():
+def parse_arguments(argv):
+    """
+    Parses command-line arguments: an optional '<num1> <num2> <operation>' triple
+    plus execution options.
+    """
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Interactive calculator.")
+    parser.add_argument("operands", nargs="*", help="<num1> <num2> [<num3> ...] <operation> for a one-shot calculation")
+    parser.add_argument("--executor", choices=list(EXECUTOR_MODES),
+                        default=settings.executor,
+                        help="How commands are executed (default: process, or $CALCULATOR_EXECUTOR)")
+    parser.add_argument("--workers", type=int,
+                        default=settings.workers,
+                        help="Number of pooled workers (default: $CALCULATOR_WORKERS or CPU count)")
+    parser.add_argument("--policy", choices=list(POLICIES),
+                        default=settings.policy,
+                        help="When to offload commands to the executor (default: adaptive, or $CALCULATOR_POLICY)")
+    parser.add_argument("--cache", action="store_true",
+                        default=settings.cache,
+                        help="Memoize command results (default: $CALCULATOR_CACHE)")
+    parser.add_argument("--cache-size", type=int,
+                        default=settings.cache_size,
+                        help="Maximum number of cached results")
+    parser.add_argument("--cache-ttl", type=float,
+                        default=settings.cache_ttl,
+                        help="Seconds before a cached result expires (default: never)")
+    parser.add_argument("--precision", type=int,
+                        default=settings.precision,
+                        help="Significant digits for Decimal results (default: 28, or $CALCULATOR_PRECISION)")
+    parser.add_argument("--rounding", choices=list(ROUNDING_MODES),
+                        default=settings.rounding,
+                        help="Decimal rounding mode (default: half_even, or $CALCULATOR_ROUNDING)")
+    parser.add_argument("--lossy", action="store_true",
+                        default=settings.lossy,
+                        help="Compute in binary floating point, trading exactness for speed (default: $CALCULATOR_LOSSY)")
+    parser.add_argument("--metrics", action="store_true",
+                        default=settings.metrics,
+                        help="Collect per-command counters and stage timings (default: $CALCULATOR_METRICS)")
+    parser.add_argument("--metrics-file", metavar="FILE", default=settings.metrics_file,
+                        help="Write metrics in Prometheus text format to FILE on 'metrics' and at exit; "
+                             "implies --metrics (default: $CALCULATOR_METRICS_FILE)")
+    parser.add_argument("--eager-plugins", action="store_true",
+                        help="Import every plugin at startup instead of on first use")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-plugin import times on stderr")
+    parser.add_argument("--async", dest="async_repl", action="store_true",
+                        help="Start the asynchronous REPL, which accepts new commands while others run")
+    parser.add_argument("--serve", nargs="?", const=DEFAULT_ADDRESS, metavar="ADDRESS",
+                        help=f"Run as a calculation server on host:port or unix:/path (default: {DEFAULT_ADDRESS})")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="Stream '<operation> <num1> <num2>' records from FILE (or stdin)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="In batch mode, write results as they complete instead of in input order")
+    parser.add_argument("--transport", choices=["executor", "shm", "distributed"], default="executor",
+                        help="In batch mode, send builtin commands to the executor, to long-lived workers "
+                             "through shared memory ring buffers, or to calculation server nodes "
+                             "(default: executor)")
+    parser.add_argument("--nodes", type=lambda value: [node for node in value.split(",") if node],
+                        metavar="ADDRESS[,ADDRESS...]",
+                        help="Calculation servers for --transport distributed; without it, one localhost "
+                             "node per worker is started")
+    parser.add_argument("--output-format", choices=list(SINKS), default="text",
+                        help="Write batch and one-shot results as text, CSV, JSON lines or the binary "
+                             "columnar format (default: text)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help=f"Records per task in batch mode (default: {DEFAULT_CHUNK_SIZE}), or numbers "
+                             f"per chunk with --reduce (default: {DEFAULT_REDUCE_CHUNK})")
+    parser.add_argument("--reduce", nargs=2, metavar=("OPERATION", "FILE"),
+                        help="Stream whitespace-separated numbers from FILE (or '-' for stdin) through a "
+                             "reduction command such as sum, mean or variance")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="Re-execute a history exported by calculator.history_io on the worker pool "
+                             "and report results that differ from the recorded ones")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Main function to either process command-line arguments or start the REPL loop.
     """
-    # Load plugins dynamically at startup
-    load_plugins()
+    started = time.perf_counter()
+    args = parse_arguments(sys.argv[1:] if argv is None else argv)
+    configure_precision(args.precision, args.rounding, args.lossy)
+    # The pool (and multiprocessing) is only created once something is offloaded
+    configure_executor(args.executor, args.workers, lazy=True)
+    configure_scheduler(args.policy)
+    configure_cache(args.cache, args.cache_size, args.cache_ttl)
+    configure_metrics(args.metrics, args.metrics_file)
 
+    # Register plugins; modules are imported on first use unless requested otherwise
+    load_plugins(lazy=not args.eager_plugins)
+    if args.profile_startup:
+        profile_startup(started)
+
+    if args.serve:
+        from calculator.server import run_server  # pylint: disable=import-outside-toplevel
+        run_server(args.serve)
+        shutdown_executor()
+    elif args.reduce:
+        run_reduce_mode(args.reduce[0], args.reduce[1], args.chunk_size or DEFAULT_REDUCE_CHUNK)
+        shutdown_executor()
+    elif args.replay:
+        report = run_replay_mode(args.replay)
+        shutdown_executor()
+        if report is None or report.mismatches:
+            sys.exit(1)
+    elif args.batch:
+        run_batch_mode(args.batch, ordered=not args.unordered, chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE,
+                       transport=args.transport, workers=args.workers, nodes=args.nodes,
+                       output_format=args.output_format)
+        shutdown_executor()
     # If command-line arguments are provided, execute once and exit
-    if len(sys.argv) == 4:
-        _, value1, value2, operation_type = sys.argv
-        logging.info(f"Command-line input detected: {value1}, {value2}, {operation_type}")
-        perform_calculation_and_display(value1, value2, operation_type)
+    elif len(args.operands) >= 3:
+        *values, operation_type = args.operands
+        logging.info(f"Command-line input detected: {', '.join(values)}, {operation_type}")
+        if args.output_format == "text":
+            perform_calculation_and_display(values[0], values[1], operation_type, *values[2:])
+        else:
+            output = sys.stdout.buffer if SINKS[args.output_format].binary else sys.stdout
+            with open_sink(args.output_format, output) as sink:
+                perform_calculation_and_display(values[0], values[1], operation_type, *values[2:], sink=sink)
+        shutdown_executor()
+    elif args.async_repl:
+        logging.info("Starting asynchronous REPL loop.")
+        import asyncio  # pylint: disable=import-outside-toplevel
+        asyncio.run(async_repl())
     else:
         # Start the REPL if no command-line arguments are provided
         logging.info("Starting REPL loop.")
@@ -152,9 +632,9 @@ def main():
 
 
 if __name__ == '__main__':
-    configure_logging()
+    configure_logging(deferred=get_settings().fast_start)
     settings = load_environment_variables()
 
-    logging.info(f"Environment: {settings.get('ENVIRONMENT')}")
+    logging.info(f"Environment: {settings.environment}")
     logging.info("Application started.")
     main()
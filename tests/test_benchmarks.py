@@ -0,0 +1,47 @@
+'''Tests for the benchmark harness'''
+import pytest
+from benchmarks.harness import CASES, compare, load_results, main, run_benchmarks, save_results
+
+def test_every_case_runs_and_round_trips(tmp_path):
+    '''Each case produces sane measurements that survive a JSON round trip'''
+    results = run_benchmarks(list(CASES), [200], repeat=1)
+    assert [result.case for result in results] == list(CASES)
+    for result in results:
+        assert result.operations > 0 and result.throughput > 0
+        assert 0 < result.p50_us <= result.p99_us
+    path = tmp_path / "results.json"
+    save_results(results, str(path))
+    assert load_results(str(path)) == results
+
+def test_compare_flags_only_real_regressions():
+    '''Throughput drops and latency rises beyond the tolerance are reported'''
+    baseline = run_benchmarks(["execute"], [100], repeat=1)
+    slower = [result._replace(throughput=result.throughput / 2, p99_us=result.p99_us * 1.1) for result in baseline]
+    assert compare(baseline, baseline) == []
+    regressions = compare(slower, baseline, tolerance=0.25)
+    assert [(regression.case, regression.metric) for regression in regressions] == [("execute", "throughput")]
+
+def test_cli_fails_on_regression(tmp_path, capsys):
+    '''The command line exits non-zero when a baseline comparison regresses'''
+    baseline = tmp_path / "baseline.json"
+    assert main(["--cases", "history_latest", "--scales", "1e2", "--repeat", "1", "--output", str(baseline)]) == 0
+    faster = [result._replace(throughput=result.throughput * 100) for result in load_results(str(baseline))]
+    save_results(faster, str(baseline))
+    code = main(["--cases", "history_latest", "--scales", "1e2", "--repeat", "1",
+                 "--output", str(tmp_path / "out.json"), "--baseline", str(baseline)])
+    assert code == 1
+    assert "REGRESSION history_latest" in capsys.readouterr().err
+    with pytest.raises(ValueError, match="Unknown benchmark case"):
+        run_benchmarks(["nope"], [10])
+
+def test_display_case_restores_the_scheduler_and_cache():
+    '''The display case leaves the shared scheduler and result cache as it found them'''
+    from calculator.cache import configure_cache, get_result_cache
+    from calculator.scheduler import configure_scheduler, get_scheduler
+    scheduler, cache = configure_scheduler("offload"), configure_cache(True)
+    try:
+        run_benchmarks(["display"], [50], repeat=1)
+        assert get_scheduler() is scheduler and get_result_cache() is cache
+    finally:
+        configure_scheduler()
+        configure_cache(False)
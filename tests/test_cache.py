@@ -0,0 +1,65 @@
+'''Tests for the command result cache'''
+from decimal import Decimal, localcontext
+import pytest
+from calculator.cache import MISSING, ResultCache, configure_cache
+from main import perform_calculation_and_display, load_plugins
+
+load_plugins()
+
+def test_hit_and_miss_counters():
+    '''Lookups are counted as hits or misses'''
+    cache = ResultCache(maxsize=4)
+    key = cache.make_key("add", Decimal("1"), Decimal("2"))
+    assert cache.get(key) is MISSING
+    cache.put(key, Decimal("3"))
+    assert cache.get(key) == Decimal("3")
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_lru_eviction():
+    '''The least recently used entry is evicted first'''
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is MISSING and cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry(monkeypatch):
+    '''Entries older than the TTL are treated as misses'''
+    clock = [100.0]
+    monkeypatch.setattr("calculator.cache.time.monotonic", lambda: clock[0])
+    cache = ResultCache(ttl=5)
+    cache.put("k", 1)
+    clock[0] += 10
+    assert cache.get("k") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+def test_key_includes_representation_and_precision():
+    '''Equal values with different exponents, or different precision, do not collide'''
+    cache = ResultCache()
+    assert cache.make_key("add", Decimal("1"), Decimal("2")) != cache.make_key("add", Decimal("1.0"), Decimal("2"))
+    with localcontext() as ctx:
+        ctx.prec = 50
+        high = cache.make_key("divide", Decimal("1"), Decimal("3"))
+    assert high != cache.make_key("divide", Decimal("1"), Decimal("3"))
+
+def test_invalid_configuration():
+    '''Non-positive sizes and TTLs are rejected'''
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
+    with pytest.raises(ValueError):
+        ResultCache(ttl=0)
+
+def test_perform_calculation_uses_cache(capsys):
+    '''Repeated calculations are answered from the cache with the same output'''
+    cache = configure_cache(True, maxsize=8)
+    try:
+        perform_calculation_and_display("6", "7", "multiply")
+        perform_calculation_and_display("6", "7", "multiply")
+        perform_calculation_and_display("1", "0", "divide")
+        out = capsys.readouterr().out
+        assert out.count("The result of 6 multiply 7 is 42") == 2
+        assert cache.stats()["hits"] == 1 and cache.stats()["size"] == 1
+    finally:
+        configure_cache(False)
@@ -64,3 +64,13 @@ def test_divide_by_zero():
     calc = Calculation(Decimal('8'), Decimal('0'), divide)
     with pytest.raises(ValueError, match="Error: Cannot divide by zero!"):
         calc.operate()
+
+def test_calculation_has_no_instance_dict():
+    """
+    Verify that Calculation records use slots instead of a per-instance dict.
+
+    Args:
+        None
+    """
+    calc = Calculation(Decimal('1'), Decimal('2'), add)
+    assert not hasattr(calc, '__dict__')
@@ -11,6 +11,7 @@ import pytest
 
 from calculator.calculation import Calculation
 from calculator.calculations import calculations
+from calculator.history import DEFAULT_HISTORY_CAPACITY, ColumnarHistory
 from calculator.operations import add, subtract, multiply, divide
 
 @pytest.fixture
@@ -90,3 +91,31 @@ def test_find_by_operation(sample_operations):
     assert len(add_results) == 1, "Incorrect count of 'add' operations."
     divide_results = calculations.filter_with_operation("divide")
     assert len(divide_results) == 1, "Incorrect count of 'divide' operations."
+
+def test_set_capacity_bounds_history():
+    '''
+    Test that the history can be bounded to a fixed capacity.
+
+    This test shrinks the history and verifies that only the most recent
+    calculations are kept.
+    '''
+    calculations.set_capacity(2)
+    try:
+        for value in ('1', '2', '3'):
+            calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+        assert [calc.a for calc in calculations.print_all_calculation()] == [Decimal('2'), Decimal('3')]
+    finally:
+        calculations.set_capacity(DEFAULT_HISTORY_CAPACITY)
+
+def test_set_capacity_keeps_the_backend():
+    '''
+    Test that resizing the history keeps the current store backend.
+    '''
+    previous = calculations.history
+    calculations.use_store(ColumnarHistory(None))
+    try:
+        calculations.set_capacity(3)
+        assert isinstance(calculations.history, ColumnarHistory)
+        assert calculations.history.capacity == 3
+    finally:
+        calculations.use_store(previous)
@@ -47,3 +47,64 @@ def test_execute_in_process_error_handling():
     assert isinstance(result, ValueError)
     assert str(result) == "Cannot divide by zero"
 
+
+def test_execute_batch_decimal():
+    # Test the exact Decimal batch path over small chunks
+    a_values = [Decimal(i) for i in range(10)]
+    b_values = [Decimal(2)] * 10
+    results = AddCommand.execute_batch(a_values, b_values, chunk_size=3)
+    assert results == [Decimal(i + 2) for i in range(10)]
+
+def test_execute_batch_reports_errors_per_element():
+    # Test that division by zero fails only the affected element
+    results = DivideCommand.execute_batch([Decimal("4"), Decimal("1"), Decimal("9")],
+                                          [Decimal("2"), Decimal("0"), Decimal("3")])
+    assert results[0] == Decimal("2") and results[2] == Decimal("3")
+    assert isinstance(results[1], ValueError)
+
+def test_execute_batch_with_executor():
+    # Test spreading batch chunks across an executor
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = MultiplyCommand.execute_batch([Decimal(i) for i in range(100)], [Decimal(3)] * 100,
+                                                chunk_size=7, executor=executor)
+    assert results == [Decimal(i * 3) for i in range(100)]
+
+class LazyExecutor:
+    # Runs each task only when its result is asked for, and tracks how many are outstanding
+    def __init__(self):
+        self.outstanding = self.peak = 0
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        executor, future = self, Future()
+        self.outstanding += 1
+        self.peak = max(self.peak, self.outstanding)
+        def result(timeout=None):
+            executor.outstanding -= 1
+            return fn(*args)
+        future.result = result
+        return future
+
+def test_execute_batch_bounds_chunks_in_flight():
+    # Test that only a window of chunks is submitted ahead of the consumer
+    executor = LazyExecutor()
+    results = AddCommand.execute_batch(range(1000), range(1000), chunk_size=10, executor=executor, window=4)
+    assert results == [2 * i for i in range(1000)]
+    assert executor.peak == 4 and executor.outstanding == 0
+
+def test_execute_batch_every_registered_plugin():
+    # Test that every registered command supports the Decimal batch path
+    from main import load_plugins
+    load_plugins()
+    for name, command_class in command_registry.items():
+        results = command_class.execute_batch([Decimal("6")], [Decimal("3")])
+        assert results == [command_class(Decimal("6"), Decimal("3")).execute()], name
+
+def test_execute_batch_float64():
+    # Test the NumPy float64 fast path, including per-element division by zero
+    np = pytest.importorskip("numpy")
+    sums = SubtractCommand.execute_batch([5.0, 1.5], [2.0, 0.5], exact=False)
+    assert sums.dtype == np.float64 and sums.tolist() == [3.0, 1.0]
+    quotients = DivideCommand.execute_batch([1.0, 4.0], [0.0, 2.0], exact=False)
+    assert np.isnan(quotients[0]) and quotients[1] == 2.0
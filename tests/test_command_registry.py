@@ -0,0 +1,58 @@
+'''Tests for command registration priorities and conflict reporting'''
+from calculator.command import BUILTIN_COMMANDS, BUILTIN_PRIORITY, AddCommand
+from calculator.command_registry import CommandRegistry, command_registry, register_command
+
+class FirstCommand:
+    '''Stand-in command class'''
+
+class SecondCommand:
+    '''Another stand-in command class'''
+
+def test_builtins_are_registered_once():
+    '''Builtin commands come from the static table with builtin priority'''
+    for name, command_class in BUILTIN_COMMANDS.items():
+        assert command_registry.get(name) is command_class
+        assert command_registry.priorities[name] == BUILTIN_PRIORITY
+
+def test_plugin_cannot_silently_replace_builtin():
+    '''A default-priority registration of a builtin name is rejected and reported'''
+    before = len(command_registry.conflicts)
+    register_command("add", SecondCommand)
+    assert command_registry.get("add") is AddCommand
+    assert command_registry.conflicts[before:] == [("add", AddCommand, SecondCommand)]
+    del command_registry.conflicts[before:]
+
+def test_higher_priority_wins_regardless_of_order():
+    '''Dispatch follows priority, not import order'''
+    for order in ([(FirstCommand, 5), (SecondCommand, 1)], [(SecondCommand, 1), (FirstCommand, 5)]):
+        registry = CommandRegistry()
+        for command_class, priority in order:
+            registry.register("op", command_class, priority)
+        assert registry.get("op") is FirstCommand
+        assert len(registry.conflicts) == 1
+
+def test_reregistering_same_class_is_not_a_conflict():
+    '''Registering the same class twice is harmless'''
+    registry = CommandRegistry()
+    registry.register("op", FirstCommand)
+    registry.register("op", FirstCommand)
+    assert not registry.conflicts
+
+def test_reregistering_same_class_keeps_the_higher_priority():
+    '''A lower-priority re-registration does not lower the stored priority'''
+    registry = CommandRegistry()
+    registry.register("op", FirstCommand, 5)
+    registry.register("op", FirstCommand, 1)
+    assert registry.priorities["op"] == 5
+    registry.register("op", SecondCommand, 3)
+    assert registry.get("op") is FirstCommand
+
+def test_entries_set_directly_have_the_default_priority():
+    '''A name set with item assignment can still be overridden by priority'''
+    registry = CommandRegistry()
+    registry["late"] = FirstCommand
+    registry.register("late", SecondCommand, priority=50)
+    assert registry.get("late") is SecondCommand and registry.priorities["late"] == 50
+    registry["other"] = FirstCommand
+    registry.register("other", SecondCommand)
+    assert registry.get("other") is FirstCommand
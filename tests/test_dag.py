@@ -0,0 +1,83 @@
+'''Tests for dependency-graph evaluation'''
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from calculator.command import AddCommand
+from calculator.command_registry import command_registry
+from calculator.dag import CalculationGraph, GraphError
+from calculator.executor import InlineExecutor
+from calculator.operations import multiply
+
+class SlowAddCommand(AddCommand):
+    '''Addition that takes long enough for overlap to be measurable, recording when it ran'''
+    events = []
+
+    def execute(self) -> Decimal:
+        started = time.perf_counter()
+        time.sleep(0.05)
+        self.events.append((started, time.perf_counter()))
+        return super().execute()
+
+def test_results_flow_to_dependents():
+    '''Nodes see the results of the nodes they name, with commands and Calculation operations'''
+    graph = CalculationGraph()
+    graph.add("total", "subtract", "product", "x").add("x", "add", 1, 2).add("product", multiply, "x", Decimal("4"))
+    streamed = []
+    result = graph.run(InlineExecutor(), on_result=lambda name, value: streamed.append(name))
+    assert result.values == {"x": Decimal(3), "product": Decimal(12), "total": Decimal(9)}
+    assert streamed == ["x", "product", "total"]
+    assert result.critical_path == ["x", "product", "total"]
+
+def test_independent_nodes_run_in_parallel(monkeypatch):
+    '''Independent nodes overlap on the pool and the slowest chain is reported as critical'''
+    monkeypatch.setitem(command_registry, "slow_add", SlowAddCommand)
+    graph = CalculationGraph()
+    for index in range(4):
+        graph.add(f"leaf{index}", "slow_add", index, 1)
+    graph.add("left", "add", "leaf0", "leaf1").add("right", "add", "leaf2", "leaf3")
+    graph.add("root", "slow_add", "left", "right")
+    SlowAddCommand.events = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        result = graph.run(executor)
+    assert result.values["root"] == Decimal(10)
+    assert result.max_parallelism == 4
+    assert result.critical_path[0].startswith("leaf") and result.critical_path[-1] == "root"
+    *leaves, root = SlowAddCommand.events
+    assert max(start for start, _ in leaves) < min(end for _, end in leaves)
+    assert root[0] >= max(end for _, end in leaves)
+
+def test_parallelism_counts_running_nodes_only(monkeypatch):
+    '''Nodes queued behind a busy pool do not count as running in parallel'''
+    monkeypatch.setitem(command_registry, "slow_add", SlowAddCommand)
+    graph = CalculationGraph()
+    for index in range(4):
+        graph.add(f"leaf{index}", "slow_add", index, 1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = graph.run(executor)
+    assert len(result.values) == 4 and result.max_parallelism == 1
+
+def test_long_failing_chain():
+    '''A failure at the head of a long chain fails every node without deep recursion'''
+    graph = CalculationGraph().add("node0", "divide", 1, 0)
+    for index in range(1, 5000):
+        graph.add(f"node{index}", "add", f"node{index - 1}", 1)
+    result = graph.run(InlineExecutor())
+    assert len(result.errors) == 5000 and not result.values
+
+def test_failures_propagate_to_dependents_only():
+    '''A failing node fails its dependents but not unrelated nodes'''
+    graph = CalculationGraph().add("bad", "divide", 1, 0).add("after", "add", "bad", 1).add("other", "add", 2, 2)
+    result = graph.run(InlineExecutor())
+    assert result.values == {"other": Decimal(4)}
+    assert str(result.errors["bad"]) == "Cannot divide by zero"
+    assert "Dependency bad failed" in str(result.errors["after"])
+
+def test_invalid_graphs_are_rejected():
+    '''Unknown references, cycles and duplicate names raise GraphError'''
+    with pytest.raises(GraphError, match="unknown node"):
+        CalculationGraph().add("a", "add", "missing", 1).run(InlineExecutor())
+    with pytest.raises(GraphError, match="cycle"):
+        CalculationGraph().add("a", "add", "b", 1).add("b", "add", "a", 1).run(InlineExecutor())
+    with pytest.raises(GraphError, match="Duplicate"):
+        CalculationGraph().add("a", "add", 1, 1).add("a", "add", 1, 1)
@@ -0,0 +1,149 @@
+'''Tests for the distributed coordinator and its localhost stand-in cluster'''
+import io
+import random
+import threading
+from decimal import Decimal
+import pytest
+from calculator.client import CalculationError
+from calculator.distributed import Coordinator, DistributedError, LocalCluster, Transport
+from calculator.precision import make_context
+from calculator.streaming import execute_records, read_records, run_batch
+from main import load_plugins
+
+def lines(count=2000, seed=11):
+    '''Random builtin records plus failing and malformed ones'''
+    rng = random.Random(seed)
+    operations = ["add", "subtract", "multiply", "divide"]
+    result = [f"{operations[index % 4]} {rng.uniform(-1e6, 1e6):.4f} {rng.uniform(-1e3, 1e3):.4f}\n"
+              for index in range(count)]
+    result[5:5] = ["divide 1 0\n", "mean 2 4\n", "add x 1\n", "bad line\n", "power 2 3\n"]
+    result.append("bad line\n")
+    return result
+
+class LocalTransport(Transport):
+    '''Computes in-process; loses the connection after `fail_after` shards, or waits for `after` first'''
+    def __init__(self, name, fail_after=None, after=None):
+        self.name = name
+        self.fail_after = fail_after
+        self.after = after
+        self.lost = threading.Event()
+        self.sent = 0
+
+    def send_batch(self, requests):
+        if self.after is not None:
+            assert self.after.lost.wait(5)
+        if self.fail_after is not None and self.sent >= self.fail_after:
+            self.lost.set()
+            raise ConnectionError(f"{self.name} went away")
+        self.sent += 1
+        return [outcome.result if outcome.error is None else CalculationError(outcome.error)
+                for outcome in execute_records(read_records(f"{op} {a} {b}" for op, a, b in requests))]
+
+@pytest.fixture(scope="module")
+def cluster():
+    load_plugins()
+    with LocalCluster(nodes=2) as nodes:
+        yield nodes
+
+def test_results_match_local_execution_in_order(cluster):
+    '''Shards come back in input order with the same results and errors as the local batch path'''
+    source = lines()
+    with Coordinator(cluster.addresses, shard_size=64) as coordinator:
+        remote = [(o.record, o.result, o.error) for o in coordinator.execute_records(read_records(source))]
+        stats = coordinator.stats()
+    assert remote == [(o.record, o.result, o.error) for o in execute_records(read_records(source))]
+    assert sum(node.records for node in stats) == len(source) - 2  # the two malformed lines stay local
+    assert all(node.alive and node.failures == 0 for node in stats)
+
+def test_nodes_compute_under_the_coordinator_context(cluster):
+    '''Remote results follow the coordinator's precision and rounding, like the local path'''
+    source = ["divide 2 3\n", "multiply 1.23456 7.891\n", "add 1 2\n"]
+    context = make_context(5, "down")
+    with Coordinator(cluster.addresses, context=context) as coordinator:
+        remote = [outcome.result for outcome in coordinator.execute_records(read_records(source))]
+    assert remote == [outcome.result for outcome in execute_records(read_records(source), context=context)]
+    assert str(remote[0]) == "0.66666"
+
+def test_run_batch_through_the_coordinator(cluster):
+    '''The coordinator plugs into run_batch as a transport'''
+    output = io.StringIO()
+    with Coordinator(cluster.addresses) as coordinator:
+        stats = run_batch(["add 1 2\n", "divide 1 0\n"], output, transport=coordinator)
+    assert output.getvalue() == "add 1 2 = 3\ndivide 1 0 ! Cannot divide by zero\n"
+    assert stats.records == 2 and stats.errors == 1
+
+def test_lost_node_shards_are_retried_elsewhere():
+    '''When a node drops, its shard is re-sent to a surviving node and nothing is lost'''
+    flaky = LocalTransport("flaky", fail_after=2)
+    steady = LocalTransport("steady", after=flaky)
+    requests = [("add", index, 1) for index in range(500)]
+    with Coordinator([flaky, steady], shard_size=10) as coordinator:
+        results = list(coordinator.run(requests))
+        stats = {node.node: node for node in coordinator.stats()}
+    assert results == [Decimal(index + 1) for index in range(500)]
+    assert stats["flaky"].failures == 1 and not stats["flaky"].alive
+    assert stats["flaky"].records == 20 and stats["steady"].records == 480
+    assert stats["steady"].throughput > 0
+
+def test_killed_local_node_is_survived():
+    '''Killing a localhost node mid-run moves its work to the other node'''
+    load_plugins()
+    with LocalCluster(nodes=2) as nodes, Coordinator(nodes.addresses, shard_size=50) as coordinator:
+        results = coordinator.run(("multiply", index, 2) for index in range(2000))
+        head = [next(results) for _ in range(100)]
+        nodes.kill(0)
+        assert head + list(results) == [Decimal(index * 2) for index in range(2000)]
+        assert sum(node.records for node in coordinator.stats()) >= 2000
+
+def test_fails_when_every_node_is_lost():
+    '''A batch fails with DistributedError once no node is left'''
+    with Coordinator([LocalTransport("a", fail_after=0), LocalTransport("b", fail_after=0)]) as coordinator:
+        with pytest.raises(DistributedError):
+            list(coordinator.run([("add", 1, 2)]))
+
+def test_rejects_empty_node_list():
+    '''A coordinator needs nodes'''
+    with pytest.raises(ValueError):
+        Coordinator([])
+
+class BrokenTransport(Transport):
+    '''Raises a non-connection error for the first `failures` shards'''
+    name = "broken"
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    def send_batch(self, requests):
+        if self.failures:
+            self.failures -= 1
+            raise ValueError("boom")
+        return [Decimal(a) + Decimal(b) for _, a, b in requests]
+
+def run_with_timeout(coordinator, requests, timeout=5):
+    '''Runs a batch on a helper thread so a hang fails the test instead of the suite'''
+    outcome = {}
+    def target():
+        try:
+            outcome["results"] = list(coordinator.run(requests))
+        except Exception as e:  # pylint: disable=broad-except
+            outcome["error"] = e
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "the coordinator hung"
+    return outcome
+
+def test_transport_errors_are_retried_without_retiring_the_node():
+    '''A shard failing with a non-connection error is retried, and the node stays in service'''
+    with Coordinator([BrokenTransport(failures=2)], max_retries=3) as coordinator:
+        outcome = run_with_timeout(coordinator, [("add", 1, 2), ("add", 3, 4)])
+        [stats] = coordinator.stats()
+    assert outcome == {"results": [Decimal(3), Decimal(7)]}
+    assert stats.failures == 2 and stats.alive
+
+def test_persistent_transport_errors_fail_the_batch():
+    '''A shard that keeps failing raises DistributedError instead of hanging'''
+    with Coordinator([BrokenTransport(failures=10)], max_retries=2) as coordinator:
+        outcome = run_with_timeout(coordinator, [("add", 1, 2)])
+    assert isinstance(outcome.get("error"), DistributedError)
+    assert "boom" in str(outcome["error"])
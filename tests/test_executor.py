@@ -0,0 +1,48 @@
+'''Tests for the shared executor subsystem'''
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from calculator.command import AddCommand, DivideCommand
+from calculator.executor import (InlineExecutor, configure_executor, create_executor,
+                                 get_executor, get_executor_mode, shutdown_executor)
+
+@pytest.fixture(autouse=True)
+def reset_executor():
+    '''Make sure every test starts and ends without a shared executor.'''
+    shutdown_executor()
+    yield
+    shutdown_executor()
+
+@pytest.mark.parametrize("mode, expected_type", [
+    ("inline", InlineExecutor),
+    ("thread", ThreadPoolExecutor),
+    ("process", ProcessPoolExecutor),
+])
+def test_create_executor_modes(mode, expected_type):
+    '''Each mode builds the matching executor type'''
+    executor = create_executor(mode, max_workers=1)
+    try:
+        assert isinstance(executor, expected_type)
+        assert executor.submit(AddCommand(Decimal("2"), Decimal("3")).execute).result() == Decimal("5")
+    finally:
+        executor.shutdown()
+
+def test_unknown_mode():
+    '''An unknown mode is rejected'''
+    with pytest.raises(ValueError, match="Unknown executor mode"):
+        create_executor("gpu")
+
+def test_shared_executor_is_reused():
+    '''get_executor returns the same warm executor until it is shut down'''
+    configure_executor("thread", max_workers=2)
+    first = get_executor()
+    assert get_executor() is first
+    assert get_executor_mode() == "thread"
+    shutdown_executor()
+    assert get_executor_mode() is None
+
+def test_inline_executor_captures_exceptions():
+    '''Errors raised inline surface through the Future, like pooled execution'''
+    future = InlineExecutor().submit(DivideCommand(Decimal("1"), Decimal("0")).execute)
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        future.result()
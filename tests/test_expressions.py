@@ -0,0 +1,87 @@
+'''Tests for the expression engine'''
+from decimal import Decimal
+import pytest
+from calculator.expressions import (ExpressionError, ExpressionSession, compile_expression,
+                                    evaluate, tokenize)
+from main import load_plugins
+
+load_plugins()
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 + 2 * 3", Decimal("7")),
+    ("(1 + 2) * 3", Decimal("9")),
+    ("10 - 4 - 3", Decimal("3")),
+    ("-2 * -(3 - 5)", Decimal("-4")),
+    ("mean(2, 4) / 2", Decimal("1.5")),
+    ("1.5e2 + .5", Decimal("150.5")),
+])
+def test_evaluate(text, expected):
+    '''Precedence, associativity, unary minus and command calls'''
+    assert evaluate(text) == expected
+
+def test_constant_folding():
+    '''A fully constant expression compiles to no instructions'''
+    plan = compile_expression("(2 + 3) * mean(4, 6)")
+    assert plan.instructions == [] and plan.evaluate() == Decimal("25")
+
+def test_common_subexpressions_are_computed_once():
+    '''Repeated sub-expressions share one instruction'''
+    plan = compile_expression("(x + y) * (x + y) - (x + y)")
+    assert [instruction[0] for instruction in plan.instructions] == ["add", "multiply", "subtract"]
+    assert plan.evaluate({"x": Decimal("1"), "y": Decimal("2")}) == Decimal("6")
+
+def test_plans_are_cached_by_text():
+    '''Compiling the same text twice returns the same plan'''
+    assert compile_expression("a * 2 + 1") is compile_expression("a * 2 + 1")
+
+def test_division_by_zero_is_not_folded():
+    '''Failing constants are left for evaluation to report'''
+    plan = compile_expression("1 / 0")
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        plan.evaluate()
+
+@pytest.mark.parametrize("text", ["1 +", "(1 + 2", "2 $ 3", "power(2, 3)", ""])
+def test_invalid_expressions(text):
+    '''Syntax errors and unknown commands are reported'''
+    with pytest.raises(ExpressionError):
+        compile_expression(text)
+
+def test_missing_variable():
+    '''Evaluating with an unbound variable is an error'''
+    with pytest.raises(ExpressionError, match="Unknown variable"):
+        evaluate("z + 1")
+
+def test_session_results_and_variables():
+    '''Sessions resolve variables, '_' and '$n' references'''
+    session = ExpressionSession()
+    session.assign("rate", "1 / 4")
+    assert session.evaluate("100 * rate") == Decimal("25.00")
+    assert session.evaluate("_ + $1") == Decimal("25.25")
+    with pytest.raises(ExpressionError):
+        session.assign("9lives", "1")
+
+def test_tokenize():
+    '''Tokens keep their kind'''
+    assert tokenize("$2*x") == [("reference", "$2"), ("symbol", "*"), ("name", "x")]
+
+class HalfCommand:
+    '''Stand-in plugin: half of the first operand'''
+    @staticmethod
+    def compute(a, b):
+        return a / 2
+
+class DoubleCommand:
+    '''Stand-in plugin replacing it: double the first operand'''
+    @staticmethod
+    def compute(a, b):
+        return a * 2
+
+def test_cached_plans_follow_registry_changes(monkeypatch):
+    '''Registering or replacing a command invalidates plans that resolved the old one'''
+    from calculator.command_registry import command_registry
+    with pytest.raises(ExpressionError, match="Unknown command"):
+        evaluate("scale(x, 1)", {"x": Decimal(8)})
+    monkeypatch.setitem(command_registry, "scale", HalfCommand)
+    assert evaluate("scale(x, 1)", {"x": Decimal(8)}) == Decimal(4)
+    monkeypatch.setitem(command_registry, "scale", DoubleCommand)
+    assert evaluate("scale(x, 1)", {"x": Decimal(8)}) == Decimal(16)
@@ -0,0 +1,90 @@
+'''
+History Store Test Module
+
+This module contains unit tests for the bounded, indexed history backend.
+'''
+
+import time
+from decimal import Decimal
+import pytest
+
+from calculator.calculation import Calculation
+from calculator.history import ColumnarHistory, RingBufferHistory, create_history
+from calculator.operations import add, subtract, multiply
+
+def make_calculation(value, operation=add):
+    '''Build a Calculation with a recognisable first operand.'''
+    return Calculation(Decimal(value), Decimal('1'), operation)
+
+def test_capacity_evicts_oldest():
+    '''Once full, the oldest entries are evicted first.'''
+    store = RingBufferHistory(capacity=3)
+    for value in range(5):
+        store.append(make_calculation(value))
+    assert len(store) == 3
+    assert [calc.a for calc in store] == [Decimal(2), Decimal(3), Decimal(4)]
+    assert store.latest().a == Decimal(4)
+
+def test_operation_index_follows_eviction():
+    '''The per-operation index drops evicted entries.'''
+    store = RingBufferHistory(capacity=2)
+    store.append(make_calculation(1, subtract))
+    store.append(make_calculation(2, add))
+    store.append(make_calculation(3, multiply))
+    assert store.by_operation('subtract') == []
+    assert [calc.a for calc in store.by_operation('add')] == [Decimal(2)]
+
+def test_between_uses_insertion_time():
+    '''Time-range queries return only entries added within the range.'''
+    store = RingBufferHistory()
+    store.append(make_calculation(1))
+    start = time.time()
+    store.append(make_calculation(2))
+    store.append(make_calculation(3))
+    end = time.time()
+    assert [calc.a for calc in store.between(start, end)] == [Decimal(2), Decimal(3)]
+
+def test_clear_and_unbounded():
+    '''Clearing empties the store; None capacity never evicts.'''
+    store = RingBufferHistory(capacity=None)
+    for value in range(10):
+        store.append(make_calculation(value))
+    assert len(store) == 10
+    store.clear()
+    assert store.latest() is None and len(store) == 0
+
+def test_invalid_capacity():
+    '''A non-positive capacity is rejected.'''
+    with pytest.raises(ValueError):
+        RingBufferHistory(capacity=0)
+
+def test_columnar_matches_ring_buffer():
+    '''The columnar backend answers queries exactly like the ring buffer.'''
+    ring, columnar = RingBufferHistory(capacity=7), ColumnarHistory(capacity=7)
+    operations = [add, subtract, multiply]
+    for value in range(40):
+        calc = Calculation(Decimal(value) / 4, Decimal('-1.5'), operations[value % 3])
+        ring.append(calc)
+        columnar.append(calc)
+    def fields(calcs):
+        return [(calc.a, calc.b, calc.operation) for calc in calcs]
+    assert len(columnar) == len(ring) == 7
+    assert fields(columnar) == fields(ring)
+    assert fields(columnar.by_operation('add')) == fields(ring.by_operation('add'))
+    assert fields([columnar.latest()]) == fields([ring.latest()])
+    assert fields(columnar.between(0, time.time())) == fields(ring.between(0, time.time()))
+
+def test_columnar_views_operate():
+    '''Views handed out by the columnar backend behave like Calculations.'''
+    store = ColumnarHistory()
+    store.append(Calculation(Decimal('6'), Decimal('4'), multiply))
+    latest = store.latest()
+    assert isinstance(latest, Calculation)
+    assert latest.operate() == Decimal('24')
+    assert latest.__strrepr__() == "Calculation(6, 4, multiply)"
+
+def test_create_history_backends():
+    '''Backends are selected by name.'''
+    assert isinstance(create_history('columnar', 5), ColumnarHistory)
+    with pytest.raises(ValueError, match="Unknown history backend"):
+        create_history('btree')
@@ -0,0 +1,108 @@
+'''Tests for streaming history export, import and replay'''
+import gzip
+import io
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from calculator.calculation import Calculation
+from calculator.calculations import calculations
+from calculator.history import ColumnarHistory, RingBufferHistory
+from calculator.history_io import export_history, import_history, read_history, replay, zstd
+from calculator.operations import add, divide, multiply, subtract
+from calculator.sinks import open_sink
+
+def history(count=1000):
+    '''A history of every builtin operation, including failing divisions'''
+    store = RingBufferHistory(None)
+    operations = [add, subtract, multiply, divide]
+    for index in range(count):
+        store.append(Calculation(Decimal(index), Decimal(index % 7) / 4, operations[index % 4]))
+    return store
+
+def entries(store):
+    return [(calculation.a, calculation.b, calculation.operation) for calculation in store]
+
+@pytest.mark.parametrize("output_format", ["columnar", "csv", "jsonl"])
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_round_trip(tmp_path, output_format, compression):
+    '''Export then import restores every entry, in order, in every format'''
+    source, path = history(), tmp_path / "history"
+    assert export_history(str(path), source, output_format, compression, chunk_size=64) == 1000
+    restored = ColumnarHistory(None)
+    assert import_history(str(path), restored, chunk_size=100) == 1000
+    assert entries(restored) == entries(source)
+
+def test_auto_compression(tmp_path):
+    '''The default compression is zstd where the standard library has it, gzip otherwise'''
+    path = tmp_path / "history"
+    export_history(str(path), history(10))
+    magic = path.read_bytes()[:4]
+    if zstd is not None:
+        assert magic == b"\x28\xb5\x2f\xfd"
+    else:
+        assert magic.startswith(b"\x1f\x8b")
+        with gzip.open(path) as stream:
+            assert stream.read(8) == b"CALCCOL1"
+        with pytest.raises(ValueError):
+            export_history(str(path), history(10), compression="zstd")
+
+def test_read_history_is_chunked_and_lazy(tmp_path):
+    '''Rows arrive in chunks of the requested size'''
+    path = tmp_path / "history"
+    export_history(str(path), history(250), chunk_size=50)
+    chunks = read_history(str(path), chunk_size=100)
+    first = next(chunks)
+    assert len(first) == 100 and first[0].operation == "add" and first[7].error == "Error: Cannot divide by zero!"
+    assert [len(chunk) for chunk in chunks] == [100, 50]
+
+def test_replay_verifies_on_a_pool(tmp_path):
+    '''A faithful export replays cleanly on a worker pool'''
+    path = tmp_path / "history"
+    export_history(str(path), history(2000))
+    with ThreadPoolExecutor(2) as executor:
+        report = replay(str(path), executor, chunk_size=128, window=3)
+    assert report.records == 2000 and report.mismatches == 0 and report.examples == []
+
+def test_replay_reports_mismatches(tmp_path):
+    '''Tampered results and errors are reported with their position'''
+    path = tmp_path / "history.jsonl"
+    with open(path, "w", encoding="utf-8") as stream, open_sink("jsonl", stream) as sink:
+        sink.write("add", "1", "2", "3")
+        sink.write("add", "1", "2", "4")
+        sink.write("divide", "1", "0", None, "wrong message")
+    report = replay(str(path), chunk_size=2)
+    assert report.records == 3 and report.mismatches == 2
+    assert [(mismatch.index, mismatch.replayed) for mismatch in report.examples] == \
+        [(1, "3"), (2, "Error: Cannot divide by zero!")]
+
+def test_defaults_to_the_calculations_history(tmp_path):
+    '''Without a store, the calculations history is exported and filled'''
+    path = tmp_path / "history"
+    calculations.delete_calculation()
+    calculations.add_calculation(Calculation(Decimal("7"), Decimal("2"), add))
+    assert export_history(str(path)) == 1
+    calculations.delete_calculation()
+    assert import_history(str(path)) == 1
+    assert calculations.get_latest().operate() == Decimal("9")
+
+def test_rejects_unknown_files(tmp_path):
+    '''Files that are not exports, and rows the history cannot hold, are rejected'''
+    path = tmp_path / "notes.txt"
+    path.write_text("hello\n")
+    with pytest.raises(ValueError):
+        list(read_history(str(path)))
+    path.write_text("operation,a,b,result,error\npower,2,3,8,\n")
+    with pytest.raises(ValueError):
+        import_history(str(path), RingBufferHistory(None))
+
+def test_calculations_export_matches_export_history(tmp_path):
+    '''Both export paths write the same rows'''
+    path = tmp_path / "history.csv"
+    calculations.delete_calculation()
+    for calculation in history(20):
+        calculations.add_calculation(calculation)
+    stream = io.StringIO()
+    assert calculations.export(open_sink("csv", stream)) == 20
+    export_history(str(path), output_format="csv", compression="none")
+    assert path.read_text(encoding="utf-8") == stream.getvalue()
+    calculations.delete_calculation()
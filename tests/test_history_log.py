@@ -0,0 +1,178 @@
+'''
+History Log Test Module
+
+This module contains unit tests for the persistent, memory-mapped history log.
+'''
+
+import operator
+import time
+from decimal import Decimal
+import pytest
+
+from calculator.calculation import Calculation
+from calculator.calculations import calculations
+from calculator.codec import decode_decimal, encode_decimal
+from calculator.history_log import ESCAPE_CODE, RECORD, MappedLogHistory
+from calculator.operations import add, subtract, multiply, divide
+
+def test_codec_round_trip():
+    '''Decimals survive fixed-width encoding exactly.'''
+    for value in (Decimal('0'), Decimal('-1.50'), Decimal('1E+30'), Decimal('3.14159265358979')):
+        assert decode_decimal(encode_decimal(value)) == value
+        assert str(decode_decimal(encode_decimal(value))) == str(value)
+    with pytest.raises(ValueError):
+        encode_decimal(Decimal('1' * 60))
+
+def test_history_survives_reopen(tmp_path):
+    '''Committed entries are read back after the log is reopened.'''
+    path = tmp_path / 'history.log'
+    with MappedLogHistory(str(path)) as log:
+        log.append(Calculation(Decimal('7'), Decimal('2'), add))
+        log.append(Calculation(Decimal('8.5'), Decimal('2'), divide))
+    with MappedLogHistory(str(path)) as log:
+        assert len(log) == 2
+        latest = log.latest()
+        assert (latest.a, latest.b, latest.operation) == (Decimal('8.5'), Decimal('2'), divide)
+
+def test_group_commit_batches_fsyncs(tmp_path, monkeypatch):
+    '''Appends are fsynced once per group, not once per record.'''
+    syncs = []
+    monkeypatch.setattr('calculator.history_log.os.fsync', syncs.append)
+    log = MappedLogHistory(str(tmp_path / 'history.log'), sync_every=10, sync_interval=3600)
+    syncs.clear()
+    for value in range(25):
+        log.append(Calculation(Decimal(value), Decimal('1'), add))
+    assert len(syncs) == 2
+    assert len(log) == 25 and log.latest().a == Decimal('24')
+    log.close()
+    assert len(syncs) == 3
+
+def test_queries_span_committed_and_pending(tmp_path):
+    '''Operation, time and raw range queries see both committed and buffered records.'''
+    log = MappedLogHistory(str(tmp_path / 'history.log'), sync_every=3, sync_interval=3600)
+    start = time.time()
+    for value, operation in enumerate([add, subtract, add, multiply, add]):
+        log.append(Calculation(Decimal(value), Decimal('1'), operation))
+    assert [calc.a for calc in log.by_operation('add')] == [Decimal(0), Decimal(2), Decimal(4)]
+    assert len(log.between(start, time.time())) == 5
+    raw = log.raw_range(1, 3)
+    assert len(raw) == 2 * RECORD.size
+    assert decode_decimal(RECORD.unpack_from(raw, RECORD.size)[2]) == Decimal(2)
+    log.close()
+
+def test_calculations_use_log_store(tmp_path):
+    '''The log plugs in behind the calculations classmethods.'''
+    previous = calculations.history
+    log = MappedLogHistory(str(tmp_path / 'history.log'))
+    calculations.use_store(log)
+    try:
+        calculations.add_calculation(Calculation(Decimal('3'), Decimal('9'), add))
+        assert calculations.get_latest().b == Decimal('9')
+        assert len(calculations.filter_with_operation('add')) == 1
+        calculations.delete_calculation()
+        assert calculations.get_latest() is None
+    finally:
+        calculations.use_store(previous)
+        log.close()
+
+def test_log_store_cannot_be_resized(tmp_path):
+    '''set_capacity refuses the unbounded log instead of reopening it with the capacity as a path.'''
+    previous = calculations.history
+    log = MappedLogHistory(str(tmp_path / 'history.log'))
+    calculations.use_store(log)
+    try:
+        with pytest.raises(ValueError, match='does not support a capacity'):
+            calculations.set_capacity(5)
+        assert calculations.history is log
+    finally:
+        calculations.use_store(previous)
+        log.close()
+
+def test_wide_operands_and_other_operations_are_escaped(tmp_path):
+    '''Entries the fixed-width record cannot hold go to the overflow file and survive reopen.'''
+    path = tmp_path / 'history.log'
+    wide = Decimal('1' * 60)
+    with MappedLogHistory(str(path), sync_every=2) as log:
+        log.append(Calculation(wide, Decimal('1'), add))
+        log.append(Calculation(Decimal('2'), Decimal('3'), operator.pow))
+        log.append(Calculation(Decimal('4'), Decimal('5'), lambda a, b: a % b))
+        log.append(Calculation(Decimal('6'), Decimal('1'), add))
+        assert RECORD.unpack_from(log.raw_range(0, 1))[1] == ESCAPE_CODE
+        assert [calc.operate() for calc in log.by_operation('add')] == [wide + 1, Decimal('7')]
+    assert (tmp_path / 'history.log.overflow').exists()
+    with MappedLogHistory(str(path)) as log:
+        first, power, local, last = list(log)
+        assert first.a == wide and first.operation is add
+        assert power.operation is operator.pow and power.operate() == Decimal('8')
+        assert local.operation.__name__ == '<lambda>'
+        with pytest.raises(ValueError, match='not available'):
+            local.operate()
+        assert last.operate() == Decimal('7')
+        assert [calc.b for calc in log.by_operation('pow')] == [Decimal('3')]
+        log.clear()
+        assert len(log) == 0 and (tmp_path / 'history.log.overflow').stat().st_size == 0
+
+def test_calculations_keep_working_after_a_wide_operand(tmp_path):
+    '''A wide operand does not break later calculations on the log store.'''
+    previous = calculations.history
+    log = MappedLogHistory(str(tmp_path / 'history.log'))
+    calculations.use_store(log)
+    try:
+        calculations.add_calculation(Calculation(Decimal('9' * 50), Decimal('1'), add))
+        calculations.add_calculation(Calculation(Decimal('3'), Decimal('9'), add))
+        assert len(calculations.filter_with_operation('add')) == 2
+        assert calculations.get_latest().b == Decimal('9')
+    finally:
+        calculations.use_store(previous)
+        log.close()
+
+def test_rejects_foreign_file(tmp_path):
+    '''A file that is not a history log is refused.'''
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a history log at all')
+    with pytest.raises(ValueError, match='not a compatible history log'):
+        MappedLogHistory(str(path))
+    path.write_bytes(b'short')
+    with pytest.raises(ValueError, match='not a compatible history log'):
+        MappedLogHistory(str(path))
+
+def test_partial_records_are_truncated_on_open(tmp_path):
+    '''A fragment left by a crash is dropped, so later appends stay aligned.'''
+    path = tmp_path / 'history.log'
+    with MappedLogHistory(str(path)) as log:
+        log.append(Calculation(Decimal('1'), Decimal('2'), add))
+        log.append(Calculation(Decimal('3'), Decimal('4'), operator.pow))
+    with open(path, 'ab') as stream:
+        stream.write(b'xx')
+    with open(str(path) + '.overflow', 'ab') as stream:
+        stream.write(b'partial')
+    with MappedLogHistory(str(path)) as log:
+        log.append(Calculation(Decimal('5'), Decimal('6'), multiply))
+    with MappedLogHistory(str(path)) as log:
+        assert [(calc.a, calc.operate()) for calc in log] == \
+            [(Decimal('1'), Decimal('3')), (Decimal('3'), Decimal('81')), (Decimal('5'), Decimal('30'))]
+    assert (tmp_path / 'history.log.overflow').read_bytes().endswith(b'4')
+
+def test_buffered_records_are_committed_at_exit(tmp_path, monkeypatch):
+    '''An open log registers a close at exit, so the last group is not lost.'''
+    at_exit = []
+    monkeypatch.setattr('calculator.history_log.atexit.register', at_exit.append)
+    path = tmp_path / 'history.log'
+    log = MappedLogHistory(str(path), sync_every=100, sync_interval=3600)
+    log.append(Calculation(Decimal('1'), Decimal('2'), add))
+    assert at_exit == [log.close]
+    at_exit[0]()
+    with MappedLogHistory(str(path)) as reopened:
+        assert len(reopened) == 1
+
+def test_opcode_index_follows_appends(tmp_path):
+    '''Operation queries keep seeing new records after the index is built.'''
+    with MappedLogHistory(str(tmp_path / 'history.log'), sync_every=2) as log:
+        log.append(Calculation(Decimal('1'), Decimal('1'), add))
+        assert len(log.by_operation('add')) == 1
+        for value in range(5):
+            log.append(Calculation(Decimal(value), Decimal('1'), add if value % 2 else subtract))
+        assert [calc.a for calc in log.by_operation('add')] == [Decimal('1'), Decimal('1'), Decimal('3')]
+        log.clear()
+        log.append(Calculation(Decimal('9'), Decimal('1'), subtract))
+        assert not log.by_operation('add') and len(log.by_operation('subtract')) == 1
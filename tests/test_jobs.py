@@ -0,0 +1,57 @@
+'''Tests for the asynchronous job engine'''
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from calculator.command import Command
+from calculator.command_registry import command_registry
+from calculator.jobs import AsyncEngine
+from calculator.scheduler import OffloadPolicy, Scheduler
+
+release = threading.Event()
+
+class BlockingCommand(Command):
+    '''Command that does not finish until the test releases it'''
+    def __init__(self, a: Decimal, b: Decimal):
+        self.a = a
+        self.b = b
+
+    def execute(self) -> Decimal:
+        release.wait(5)
+        return self.a + self.b
+
+def test_submit_returns_before_slow_job_finishes(monkeypatch):
+    '''A slow job does not stop the next job from being accepted and completing'''
+    monkeypatch.setitem(command_registry, "blocking", BlockingCommand)
+    async def scenario():
+        completed = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            engine = AsyncEngine(Scheduler(OffloadPolicy(), executor), on_complete=completed.append)
+            slow = engine.submit("blocking", "1", "2")
+            fast = engine.submit("add", "5", "3")
+            await engine.wait(fast.id)
+            assert slow.status == "running"
+            assert [job.id for job in completed] == [fast.id]
+            release.set()
+            await engine.wait_all()
+            return slow, fast, completed
+    slow, fast, completed = asyncio.run(scenario())
+    assert fast.describe() == "The result of 5 add 3 is 8"
+    assert slow.describe() == "The result of 1 blocking 2 is 3"
+    assert [job.id for job in completed] == [fast.id, slow.id]
+
+def test_failed_jobs_are_reported():
+    '''Invalid input, unknown operations and command errors all become failed jobs'''
+    async def scenario():
+        engine = AsyncEngine()
+        jobs = [engine.submit("add", "x", "1"), engine.submit("power", "2", "3"), engine.submit("divide", "1", "0")]
+        await engine.wait_all()
+        return jobs, engine.jobs()
+    jobs, listed = asyncio.run(scenario())
+    assert [job.status for job in jobs] == ["failed"] * 3
+    assert [job.describe() for job in jobs] == [
+        "Invalid input: x or 1 is not a valid number.",
+        "Invalid operation type: power",
+        "An error occurred: Cannot divide by zero",
+    ]
+    assert [job.id for job in listed] == [1, 2, 3]
@@ -0,0 +1,85 @@
+'''Tests for the queue-based logging pipeline'''
+import io
+import json
+import logging
+import threading
+import pytest
+from calculator.log_pipeline import (EVENTS_LOGGER, DeferredHandler, JsonLinesFormatter, SamplingFilter,
+                                     configure_pipeline, stop_queue_logging)
+
+@pytest.fixture
+def root_stream():
+    '''The root logger writing to a string buffer only; the original handlers are restored afterwards'''
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    stream = io.StringIO()
+    root.handlers = [logging.StreamHandler(stream)]
+    root.setLevel(logging.INFO)
+    yield stream
+    configure_pipeline("sync")
+    root.handlers, root.level = saved_handlers, saved_level
+
+class ThreadRecorder:
+    '''Remembers which thread turned it into a string'''
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread()
+        return "recorded"
+
+def test_queue_mode_formats_on_the_listener_thread(root_stream):
+    '''Records reach the original handlers, formatted off the calling thread'''
+    configure_pipeline("queue")
+    recorder = ThreadRecorder()
+    logging.getLogger(EVENTS_LOGGER).info("value: %s", recorder)
+    stop_queue_logging()
+    assert root_stream.getvalue() == "value: recorded\n"
+    assert recorder.thread is not threading.current_thread()
+    assert isinstance(logging.getLogger().handlers[0], logging.StreamHandler)
+
+def test_sampling_keeps_warnings(root_stream):
+    '''One in N events is kept; warnings always pass'''
+    configure_pipeline("sync", sample_rate=3)
+    events = logging.getLogger(EVENTS_LOGGER)
+    for index in range(9):
+        events.info("event %d", index)
+    events.warning("warning")
+    assert root_stream.getvalue().splitlines() == ["event 0", "event 3", "event 6", "warning"]
+    with pytest.raises(ValueError, match="at least 1"):
+        SamplingFilter(0)
+
+def test_json_lines_format(root_stream):
+    '''JSON mode writes one object per record'''
+    configure_pipeline("sync", log_format="json")
+    logging.getLogger(EVENTS_LOGGER).info("%s + %s", 1, 2)
+    document = json.loads(root_stream.getvalue())
+    assert document["message"] == "1 + 2"
+    assert document["level"] == "INFO"
+    assert document["logger"] == EVENTS_LOGGER
+    assert isinstance(logging.getLogger().handlers[0].formatter, JsonLinesFormatter)
+
+def test_invalid_settings():
+    '''Unknown modes and formats are rejected'''
+    with pytest.raises(ValueError, match="Unknown log mode"):
+        configure_pipeline("carrier-pigeon")
+    with pytest.raises(ValueError, match="Unknown log format"):
+        configure_pipeline("sync", "xml")
+
+def test_deferred_handler_configures_on_first_record(root_stream):
+    '''The real handlers are only built when the first record reaches the root logger'''
+    calls = []
+    root = logging.getLogger()
+    def configure():
+        calls.append(True)
+        root.addHandler(logging.StreamHandler(root_stream))
+        root.setLevel(logging.INFO)  # as fileConfig does
+    root.handlers = [DeferredHandler(configure)]
+    root.setLevel(logging.WARNING)
+    assert not calls
+    logging.getLogger(EVENTS_LOGGER).warning("first")
+    logging.getLogger(EVENTS_LOGGER).info("dropped")
+    logging.getLogger(EVENTS_LOGGER).warning("second")
+    assert calls == [True]
+    assert root.level == logging.WARNING
+    assert root_stream.getvalue() == "first\nsecond\n"
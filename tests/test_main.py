@@ -58,3 +58,53 @@ def test_menu_display(capsys):
     display_menu()
     captured = capsys.readouterr()
     assert "Available commands: add, subtract, multiply, divide" in captured.out
+
+def test_main_one_shot_with_executor_flag(capsys):
+    # Test a one-shot calculation through the --executor option
+    from main import main
+    main(["5", "3", "add", "--executor", "inline"])
+    captured = capsys.readouterr()
+    assert "The result of 5 add 3 is 8" in captured.out
+
+def test_batch_mode_from_file(tmp_path, capsys):
+    # Test streaming a batch file through main
+    from main import main
+    batch_file = tmp_path / "jobs.txt"
+    batch_file.write_text("add 1 2\nmultiply 3 4\n")
+    main(["--batch", str(batch_file), "--executor", "inline"])
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ["add 1 2 = 3", "multiply 3 4 = 12"]
+    assert "Processed 2 records (0 errors)" in captured.err
+
+def test_one_shot_reduction_with_output_format(capsys):
+    # Test that a one-shot reduction writes a row instead of the sentence
+    from main import main
+    main(["1", "2", "3", "sum", "--output-format", "csv", "--executor", "inline"])
+    captured = capsys.readouterr()
+    assert captured.out == "operation,a,b,result,error\nsum,1,2 3,6,\n"
+
+def test_one_shot_reduction_columnar(capsysbinary):
+    # Test that columnar one-shot output stays a readable stream for reductions
+    import io
+    from main import main
+    from calculator.sinks import Row, read_columnar
+    main(["1", "2", "3", "sum", "--output-format", "columnar", "--executor", "inline"])
+    captured = capsysbinary.readouterr()
+    assert list(read_columnar(io.BytesIO(captured.out))) == [Row("sum", "1", "2 3", "6", None)]
+
+def test_reduce_mode_missing_file(capsys):
+    # Test that a missing reduce input is reported instead of raising
+    from main import main
+    main(["--reduce", "sum", "no/such/file.txt", "--executor", "inline"])
+    captured = capsys.readouterr()
+    assert "An error occurred" in captured.out
+
+def test_reduce_mode_uses_chunk_size(tmp_path, monkeypatch):
+    # Test that --chunk-size reaches the reduction, with its own default otherwise
+    import main as main_module
+    from calculator.reductions import DEFAULT_REDUCE_CHUNK
+    calls = []
+    monkeypatch.setattr(main_module, "run_reduce_mode", lambda *args: calls.append(args))
+    main_module.main(["--reduce", "sum", "numbers.txt", "--chunk-size", "7", "--executor", "inline"])
+    main_module.main(["--reduce", "sum", "numbers.txt", "--executor", "inline"])
+    assert calls == [("sum", "numbers.txt", 7), ("sum", "numbers.txt", DEFAULT_REDUCE_CHUNK)]
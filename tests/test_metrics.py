@@ -0,0 +1,85 @@
+'''Tests for the metrics registry and the instrumented hot paths'''
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from multiprocessing import Queue
+import pytest
+from calculator.command import AddCommand, DivideCommand
+from calculator.metrics import NULL_METRICS, Histogram, configure_metrics, export_metrics, get_metrics
+from calculator.scheduler import OffloadPolicy, Scheduler, configure_scheduler
+from main import display_metrics, perform_calculation_and_display
+
+@pytest.fixture
+def metrics():
+    '''A fresh, enabled registry, disabled again afterwards'''
+    yield configure_metrics(True)
+    configure_metrics(False)
+
+def test_disabled_metrics_record_nothing(capsys):
+    '''The default registry is a no-op'''
+    assert get_metrics() is NULL_METRICS
+    perform_calculation_and_display("1", "2", "add")
+    display_metrics()
+    assert "Metrics are disabled" in capsys.readouterr().out
+
+def test_display_records_stages_and_counters(metrics, capsys):
+    '''perform_calculation_and_display records parse, lookup and execute per command, plus counters'''
+    configure_scheduler("inline")
+    try:
+        perform_calculation_and_display("1", "2", "add")
+        perform_calculation_and_display("1", "0", "divide")
+        perform_calculation_and_display("x", "1", "add")
+    finally:
+        configure_scheduler()
+    assert metrics.counters[("requests", "add")] == 2
+    assert metrics.counters[("errors", "add")] == 1
+    assert metrics.counters[("errors", "divide")] == 1
+    assert metrics.histograms[("parse", "add")].count == 1
+    assert metrics.histograms[("lookup", "divide")].count == 1
+    assert metrics.histograms[("execute", "add")].count == 1
+    display_metrics()
+    assert "add execute: n=1" in capsys.readouterr().out
+
+def test_offloaded_commands_record_spawn_wait_and_transfer(metrics):
+    '''A process worker's first command counts as spawn; later ones as queue wait'''
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        scheduler = Scheduler(OffloadPolicy(), executor)
+        for _ in range(3):
+            assert scheduler.submit(AddCommand(Decimal(1), Decimal(2)), name="add").result() == 3
+    assert metrics.histograms[("spawn", "add")].count == 1
+    assert metrics.histograms[("queue_wait", "add")].count == 2
+    assert metrics.histograms[("transfer", "add")].count == 3
+
+def test_execute_in_process_records_nothing(metrics):
+    '''execute_in_process leaves metrics to the scheduler, whose registry lives in the parent'''
+    queue = Queue()
+    DivideCommand(Decimal(1), Decimal(0)).execute_in_process(queue)
+    assert isinstance(queue.get(), ValueError)
+    assert not metrics.counters and not metrics.histograms
+
+def test_prometheus_export(tmp_path):
+    '''The export uses cumulative buckets and the Prometheus text format'''
+    path = tmp_path / "metrics.prom"
+    registry = configure_metrics(path=str(path))
+    try:
+        registry.increment("requests", "add", 3)
+        registry.observe("execute", "add", 3e-6)
+        registry.observe("execute", "add", 20.0)
+        assert export_metrics() == str(path)
+    finally:
+        configure_metrics(False)
+    text = path.read_text()
+    assert '# TYPE calculator_requests_total counter' in text
+    assert 'calculator_requests_total{command="add"} 3' in text
+    assert 'calculator_stage_seconds_bucket{command="add",stage="execute",le="5e-06"} 1' in text
+    assert 'calculator_stage_seconds_bucket{command="add",stage="execute",le="10"} 1' in text
+    assert 'calculator_stage_seconds_bucket{command="add",stage="execute",le="+Inf"} 2' in text
+    assert 'calculator_stage_seconds_count{command="add",stage="execute"} 2' in text
+
+def test_histogram_quantiles():
+    '''Quantiles are estimated as bucket upper bounds'''
+    histogram = Histogram((1.0, 2.0))
+    for value in (0.5, 0.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.75) == 2.0
+    assert histogram.quantile(1.0) == float("inf")
@@ -0,0 +1,50 @@
+'''Tests for lazy plugin discovery'''
+import json
+import os
+import sys
+from calculator.command_registry import CommandRegistry
+from calculator.plugin_manifest import build_manifest, load_manifest
+
+PLUGINS_DIR = os.path.join(os.path.dirname(__file__), '..', 'calculator', 'plugins')
+
+def write_plugin(directory, name, command):
+    '''Write a minimal plugin module registering one command'''
+    (directory / f"{name}.py").write_text(
+        "from calculator.command_registry import register_command\n"
+        f"register_command('{command}', object)\n")
+
+def test_build_manifest_finds_registrations():
+    '''The shipped plugins are discovered without importing them'''
+    manifest = build_manifest(PLUGINS_DIR)
+    assert manifest["commands"]["mean"] == "calculator.plugins.mean_command"
+
+def test_manifest_is_cached_until_a_plugin_changes(tmp_path):
+    '''The manifest is reused until a plugin file's mtime changes'''
+    write_plugin(tmp_path, "one", "first")
+    manifest_path = tmp_path / "cache" / "manifest.json"
+    assert load_manifest(str(tmp_path), str(manifest_path))["commands"] == {"first": "calculator.plugins.one"}
+    cached = json.loads(manifest_path.read_text())
+    cached["commands"]["marker"] = "unchanged"
+    manifest_path.write_text(json.dumps(cached))
+    assert "marker" in load_manifest(str(tmp_path), str(manifest_path))["commands"]
+    write_plugin(tmp_path, "two", "second")
+    rebuilt = load_manifest(str(tmp_path), str(manifest_path))["commands"]
+    assert "marker" not in rebuilt and rebuilt["second"] == "calculator.plugins.two"
+
+def test_lazy_registry_imports_on_first_lookup(tmp_path, monkeypatch):
+    '''A lazy command's module is imported only when it is looked up'''
+    package = tmp_path / "lazyplugins"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "late.py").write_text(
+        "from calculator.command_registry import command_registry\n"
+        "command_registry['late'] = int\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = CommandRegistry()
+    monkeypatch.setattr("calculator.command_registry.command_registry", registry)
+    registry.register_lazy("late", "lazyplugins.late")
+    assert "late" in registry and list(registry.keys()) == ["late"]
+    assert "lazyplugins.late" not in sys.modules
+    assert registry.get("late") is int
+    assert "lazyplugins.late" in registry.import_times
+    assert not registry.lazy
@@ -0,0 +1,104 @@
+'''Tests for decimal context propagation and the int/float fast paths'''
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal, getcontext, localcontext
+import pytest
+from calculator.command import AddCommand, DivideCommand, MultiplyCommand, SubtractCommand
+from calculator.plugins.mean_command import MeanCommand
+from calculator.precision import compute, make_context, parse_operand, parse_rounding
+from calculator.scheduler import OffloadPolicy, Scheduler
+from calculator.streaming import execute_records, read_records
+
+COMMANDS = [AddCommand, SubtractCommand, MultiplyCommand, DivideCommand]
+
+def int_pairs(count=2000):
+    '''Random int operands, including zeros, negatives and values past the precision'''
+    rng = random.Random(42)
+    pairs = [(0, 5), (-5, 0), (5, -5), (-6, 3), (7, 2), (10**30, 1), (-(10**27), 10)]
+    for _ in range(count):
+        digits = rng.choice([1, 3, 9, 15, 30])
+        pairs.append((rng.randint(-10**digits, 10**digits), rng.randint(-10**digits, 10**digits)))
+    return pairs
+
+@pytest.mark.parametrize("command_class", COMMANDS + [MeanCommand])
+@pytest.mark.parametrize("precision, rounding", [(28, "half_even"), (10, "floor"), (5, "up")])
+def test_int_fast_path_matches_decimal(command_class, precision, rounding):
+    '''For ints, the fast path gives exactly the Decimal result (value and representation)'''
+    context = make_context(precision, rounding)
+    for a, b in int_pairs():
+        with localcontext(context):
+            try:
+                expected = command_class.compute(Decimal(a), Decimal(b))
+            except (ValueError, ArithmeticError) as e:
+                expected = type(e)
+        try:
+            result = compute(command_class, a, b, context)
+        except (ValueError, ArithmeticError) as e:
+            result = type(e)
+        assert str(result) == str(expected), (a, b)
+
+@pytest.mark.parametrize("command_class", COMMANDS)
+def test_float_fast_path_is_close_to_decimal(command_class):
+    '''Lossy results stay within float64 rounding of the exact result'''
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = Decimal(str(round(rng.uniform(-1e6, 1e6), 6)))
+        b = Decimal(str(round(rng.uniform(-1e6, 1e6), 6)))
+        exact = command_class.compute(a, b)
+        lossy = compute(command_class, a, b, lossy=True)
+        assert abs(lossy - exact) <= abs(exact) * Decimal("1e-12") + Decimal("1e-9")
+
+def test_contexts_follow_requests_to_workers():
+    '''The submitter's context is used on thread and process workers, not the worker default'''
+    command = DivideCommand(Decimal(1), Decimal(3))
+    for executor_class in (ThreadPoolExecutor, ProcessPoolExecutor):
+        with executor_class(max_workers=1) as executor:
+            scheduler = Scheduler(OffloadPolicy(), executor)
+            with localcontext() as context:
+                context.prec = 6
+                captured = scheduler.submit(command).result()
+            explicit = scheduler.submit(command, context=make_context(3, "up")).result()
+            assert str(captured) == "0.333333"
+            assert str(explicit) == "0.334"
+    assert getcontext().prec == 28
+
+def test_batches_run_under_their_context():
+    '''Batch helpers take a per-batch context and the int fast path'''
+    records = read_records(["divide 2 3", "add 1 2"])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        outcomes = list(execute_records(records, executor, context=make_context(4, "down")))
+    assert [str(outcome.result) for outcome in outcomes] == ["0.6666", "3"]
+    results = MultiplyCommand.execute_batch([2, 10**20], [3, 10**20], context=make_context(5))
+    assert results == [Decimal(6), Decimal("1.0000E+40")]
+
+def test_parse_operand():
+    '''Plain integer text parses to int; everything else, including a signed zero, to Decimal'''
+    assert [type(parse_operand(text)) for text in ["42", "-7", "+007", "0"]] == [int] * 4
+    for text in ["-0", "1.5", "1e3", "10.0", "1" * 30, "NaN"]:
+        assert str(parse_operand(text)) == str(Decimal(text))
+
+def test_int_path_runs_for_parsed_text(monkeypatch):
+    '''Records with integer text reach the int kernel and match the Decimal results exactly'''
+    calls = []
+    kernel = AddCommand.int_kernel
+    monkeypatch.setattr(AddCommand, "int_kernel", staticmethod(lambda a, b: calls.append(a) or kernel(a, b)))
+    lines = ["add 2 3", "add -0 -0", "add 1.5 2", "add 007 -7", f"add {10**17} {10**17}"]
+    outcomes = list(execute_records(read_records(lines), context=make_context(10)))
+    with localcontext(make_context(10)):
+        expected = [str(Decimal(a) + Decimal(b)) for a, b in (line.split()[1:] for line in lines)]
+    assert [str(outcome.result) for outcome in outcomes] == expected
+    assert calls == [2, 7, 10**17]
+
+def test_execute_batch_lossy():
+    '''execute_batch reaches the float kernel when lossy is requested'''
+    exact, lossy = (DivideCommand.execute_batch([Decimal(1)], [Decimal(3)], lossy=flag) for flag in (False, True))
+    assert exact == [Decimal(1) / Decimal(3)]
+    assert lossy == [Decimal(repr(1 / 3))]
+
+def test_rounding_names():
+    '''Rounding modes accept short or full names'''
+    assert parse_rounding("half_up") == parse_rounding("ROUND_HALF_UP") == "ROUND_HALF_UP"
+    with pytest.raises(ValueError, match="Unknown rounding mode"):
+        parse_rounding("sideways")
+    with pytest.raises(ValueError, match="Precision"):
+        make_context(0)
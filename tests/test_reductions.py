@@ -0,0 +1,64 @@
+'''Tests for chunked, parallel reductions and the reduction commands'''
+import random
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from calculator.command_registry import command_registry
+from calculator.reductions import (MaxReducer, MeanReducer, MinReducer, ProductReducer, SumReducer,
+                                   VarianceReducer, parallel_reduce)
+from main import load_plugins, perform_calculation_and_display
+
+def sample(count=5000, seed=11):
+    '''Values around a large offset, where naive variance formulas lose precision'''
+    rng = random.Random(seed)
+    return [Decimal(f"{rng.gauss(1e9, 2):.6f}") for _ in range(count)]
+
+def test_chunked_results_match_reference():
+    '''Chunked and tree-merged reductions agree with direct computation'''
+    values = sample()
+    assert parallel_reduce(SumReducer(), values, chunk_size=7) == sum(values, Decimal(0))
+    assert parallel_reduce(MinReducer(), values, chunk_size=7) == min(values)
+    assert parallel_reduce(MaxReducer(), values, chunk_size=7) == max(values)
+    assert parallel_reduce(MeanReducer(), values, chunk_size=7) == sum(values, Decimal(0)) / len(values)
+    small = [Decimal("1.5"), Decimal(-2), Decimal("0.25"), Decimal(3)]
+    assert parallel_reduce(ProductReducer(), small, chunk_size=1) == Decimal("-2.250")
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 10000])
+def test_variance_is_stable_across_chunkings(chunk_size):
+    '''Welford partials merged pairwise match the exact sample variance'''
+    values = sample()
+    expected = statistics.variance(values)
+    result = parallel_reduce(VarianceReducer(), values, chunk_size=chunk_size)
+    assert abs(result - expected) <= expected * Decimal("1e-18")
+
+def test_parallel_matches_inline_and_parses_text():
+    '''Reducing across an executor, from text lines, gives the inline result'''
+    values = sample(2000)
+    lines = ["# header\n"] + [f"{a} {b}\n" for a, b in zip(values[::2], values[1::2])]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        result = parallel_reduce(VarianceReducer(), lines, executor, chunk_size=64, window=3, parse=True)
+    assert result == parallel_reduce(VarianceReducer(), lines, chunk_size=64, parse=True)
+
+def test_empty_and_short_inputs():
+    '''Identity results for sum and product; errors where the reduction is undefined'''
+    assert parallel_reduce(SumReducer(), []) == 0
+    assert parallel_reduce(ProductReducer(), []) == 1
+    with pytest.raises(ValueError, match="mean requires at least one value"):
+        parallel_reduce(MeanReducer(), [])
+    with pytest.raises(ValueError, match="at least two values"):
+        parallel_reduce(VarianceReducer(), [Decimal(1)])
+
+def test_reduction_commands_are_registered_plugins(capsys):
+    '''Reduction plugins register by name, still reduce pairs, and take n operands in the REPL'''
+    load_plugins()
+    for name in ["sum", "product", "min", "max", "mean", "variance"]:
+        assert name in command_registry
+    assert command_registry["mean"].compute(Decimal(2), Decimal(3)) == Decimal("2.5")
+    assert command_registry["variance"](Decimal(1), Decimal(2), Decimal(3), Decimal(4)).execute() == Decimal(5) / 3
+    perform_calculation_and_display("1", "2", "sum", "3", "4")
+    perform_calculation_and_display("1", "2", "add", "3")
+    assert capsys.readouterr().out.splitlines() == [
+        "The result of sum 1 2 3 4 is 10",
+        "Invalid input format. add takes exactly two operands.",
+    ]
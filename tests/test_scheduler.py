@@ -0,0 +1,67 @@
+'''Tests for the adaptive execution scheduler'''
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, localcontext
+import pytest
+from calculator.command import AddCommand, DivideCommand
+from calculator.scheduler import (AdaptivePolicy, InlinePolicy, OffloadPolicy, Scheduler,
+                                  configure_scheduler, operand_digits)
+
+class RecordingExecutor(ThreadPoolExecutor):
+    '''Thread pool that counts how many tasks were offloaded to it'''
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+def test_operand_digits():
+    '''Digits are counted across all Decimal operands'''
+    assert operand_digits(AddCommand(Decimal("123"), Decimal("4.5"))) == 5
+
+def test_adaptive_runs_small_commands_inline():
+    '''Small additions stay in the calling thread'''
+    with RecordingExecutor() as executor:
+        scheduler = Scheduler(AdaptivePolicy(), executor)
+        assert scheduler.submit(AddCommand(Decimal("2"), Decimal("3"))).result() == Decimal("5")
+        assert executor.submitted == 0
+        assert scheduler.policy.decisions[-1].offload is False
+
+def test_adaptive_offloads_high_precision_divide():
+    '''Division at very high precision is sent to the executor'''
+    with RecordingExecutor() as executor, localcontext() as ctx:
+        ctx.prec = 10000
+        scheduler = Scheduler(AdaptivePolicy(), executor)
+        result = scheduler.submit(DivideCommand(Decimal("1"), Decimal("3"))).result()
+        assert executor.submitted == 1
+        assert scheduler.policy.decisions[-1].offload is True
+        assert str(result).startswith("0.333")
+
+def test_adaptive_uses_recorded_timings():
+    '''Once timings exist the decision is based on the predicted run time'''
+    policy = AdaptivePolicy(offload_seconds=1.0)
+    command = AddCommand(Decimal("2"), Decimal("3"))
+    policy.record(command, 10.0)
+    decision = policy.evaluate(command)
+    assert decision.reason == "recorded timings"
+    assert decision.offload is True
+
+@pytest.mark.parametrize("policy, offloaded", [(InlinePolicy(), 0), (OffloadPolicy(), 1)])
+def test_fixed_policies(policy, offloaded):
+    '''The fixed policies always choose the same route'''
+    with RecordingExecutor() as executor:
+        scheduler = Scheduler(policy, executor)
+        assert scheduler.submit(AddCommand(Decimal("1"), Decimal("1"))).result() == Decimal("2")
+        assert executor.submitted == offloaded
+
+def test_errors_propagate_through_future():
+    '''Command errors surface from the returned Future'''
+    future = Scheduler(InlinePolicy()).submit(DivideCommand(Decimal("1"), Decimal("0")))
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        future.result()
+
+def test_unknown_policy():
+    '''An unknown policy name is rejected'''
+    with pytest.raises(ValueError, match="Unknown execution policy"):
+        configure_scheduler("random")
@@ -0,0 +1,89 @@
+'''Tests for the calculation server and its pooled client'''
+import asyncio
+import threading
+from decimal import Decimal
+import pytest
+from calculator.client import CalculationError, CalculatorClient
+from calculator.scheduler import InlinePolicy, Scheduler
+from calculator.server import CalculationServer, format_response, parse_address
+
+@pytest.fixture
+def server_address(tmp_path):
+    '''Run a server on an ephemeral localhost port in a background thread'''
+    loop = asyncio.new_event_loop()
+    server = CalculationServer("127.0.0.1:0", Scheduler(InlinePolicy()))
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server.bound_address
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.run_until_complete(asyncio.sleep(0.01))
+    loop.close()
+
+def test_parse_address():
+    '''TCP and Unix addresses are recognised'''
+    assert parse_address("localhost:9000") == ("tcp", "localhost", 9000)
+    assert parse_address("unix:/tmp/calc.sock") == ("unix", "/tmp/calc.sock")
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+def test_calculate_reuses_connection(server_address):
+    '''Sequential calls share one pooled connection'''
+    with CalculatorClient(server_address, pool_size=1) as client:
+        assert client.calculate("add", 5, 3) == Decimal("8")
+        connection = client._idle.queue[0]
+        assert client.calculate("divide", "20", "5") == Decimal("4")
+        assert client._idle.queue[0] is connection
+
+def test_errors_are_reported(server_address):
+    '''Server-side errors are raised as CalculationError'''
+    with CalculatorClient(server_address) as client:
+        with pytest.raises(CalculationError, match="Cannot divide by zero"):
+            client.calculate("divide", 1, 0)
+        with pytest.raises(CalculationError, match="Invalid operation type: power"):
+            client.calculate("power", 2, 3)
+
+def test_calculate_many_pipelines_in_order(server_address):
+    '''Pipelined requests come back in request order, with per-request errors'''
+    requests = [("multiply", i, 2) for i in range(600)] + [("add", "x", 1)]
+    with CalculatorClient(server_address) as client:
+        results = client.calculate_many(requests, window=64)
+    assert results[:600] == [Decimal(i * 2) for i in range(600)]
+    assert isinstance(results[600], CalculationError)
+
+def test_overlong_line_is_answered_and_closed(server_address):
+    '''A line past the stream limit gets an error response, then the connection closes'''
+    import socket
+    host, port = server_address.rsplit(":", 1)
+    with socket.create_connection((host, int(port)), timeout=5) as connection:
+        connection.sendall(b"add 1 " + b"1" * 100000 + b"\n")
+        received = b""
+        while chunk := connection.recv(4096):
+            received += chunk
+    assert received == b"err Request line too long.\n"
+
+def test_error_messages_stay_on_one_line():
+    '''Multi-line error messages are folded so the response is a single line'''
+    loop = asyncio.new_event_loop()
+    try:
+        future = loop.create_future()
+        future.set_exception(ValueError("first line\nsecond line"))
+        assert format_response(future) == b"err first line second line\n"
+    finally:
+        loop.close()
+
+def test_connections_use_the_client_context(server_address):
+    '''A client's precision, rounding and lossy mode apply to its requests'''
+    from calculator.precision import make_context
+    with CalculatorClient(server_address, context=make_context(4, "down")) as client:
+        assert str(client.calculate("divide", 2, 3)) == "0.6666"
+    with CalculatorClient(server_address, context=make_context(4), lossy=True) as client:
+        assert client.calculate("divide", 2, 3) == Decimal(repr(2 / 3))
+    with CalculatorClient(server_address) as client:
+        assert client.calculate("divide", 2, 3) == Decimal(2) / Decimal(3)
+    with CalculatorClient(server_address, context=make_context(4, "down")) as client:
+        client._setup = [b"@context 4 sideways 0\n"]
+        with pytest.raises(CalculationError, match="Unknown rounding mode"):
+            client.calculate("add", 1, 2)
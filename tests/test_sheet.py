@@ -0,0 +1,90 @@
+'''Tests for incremental sheet recomputation'''
+from decimal import Decimal
+import pytest
+from calculator.operations import multiply
+from calculator.sheet import Sheet, SheetError
+
+def build_sheet(width: int = 10) -> Sheet:
+    '''Independent columns: col_i = x_i * 2, plus total = col_0 + rate'''
+    sheet = Sheet()
+    sheet.set("rate", 1)
+    for index in range(width):
+        sheet.set(f"x{index}", index)
+        sheet.define(f"col{index}", multiply, f"x{index}", 2)
+    sheet.define("total", "add", "col0", "rate")
+    return sheet
+
+def test_reads_compute_lazily_and_once():
+    '''Formulas run on first read, then serve their cached value'''
+    sheet = build_sheet()
+    assert sheet.recomputations == 0
+    assert sheet.get("col3") == Decimal(6)
+    assert sheet.recomputations == 1
+    assert sheet.get("col3") == Decimal(6)
+    assert sheet.recomputations == 1
+
+def test_update_recomputes_only_affected_cells():
+    '''Changing one input dirties and recomputes just its downstream cells'''
+    sheet = build_sheet()
+    for index in range(10):
+        sheet.get(f"col{index}")
+    sheet.get("total")
+    before = sheet.recomputations
+    sheet.set("x0", 5)
+    assert sorted(sheet.dirty()) == ["col0", "total"]
+    assert sheet.get("total") == Decimal(11)
+    assert sheet.recomputations - before == 2
+    assert sheet.get("col9") == Decimal(18)
+    assert sheet.recomputations - before == 2
+
+def test_unchanged_results_stop_propagation():
+    '''A formula whose inputs recompute to the same values is not evaluated again'''
+    sheet = Sheet()
+    sheet.set("a", 2)
+    sheet.define("sign", "divide", "a", "a")
+    sheet.define("scaled", "multiply", "sign", 100)
+    assert sheet.get("scaled") == Decimal(100)
+    sheet.set("a", 3)
+    assert sheet.get("scaled") == Decimal(100)
+    assert sheet.recomputations == 3
+
+def test_errors_and_redefinition():
+    '''Errors surface on read and clear once the input is fixed; cycles are rejected'''
+    sheet = Sheet()
+    sheet.set("d", 0)
+    sheet.define("q", "divide", 1, "d")
+    sheet.define("r", "add", "q", 1)
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        sheet.get("r")
+    sheet.set("d", 4)
+    assert sheet.get("r") == Decimal("1.25")
+    sheet.define("q", "subtract", 1, "d")
+    assert sheet.get("r") == Decimal(-2)
+    with pytest.raises(SheetError, match="Circular"):
+        sheet.define("d", "add", "r", 1)
+    with pytest.raises(SheetError, match="Unknown cell"):
+        sheet.get("missing")
+
+def test_overwriting_a_dirty_formula_with_an_input():
+    '''A dirty formula turned into an input reads its new value, and its dependents recompute'''
+    sheet = Sheet()
+    sheet.set("a", 1)
+    sheet.define("b", "add", "a", 1)
+    sheet.define("c", "add", "b", 1)
+    assert sheet.get("c") == Decimal(3)
+    sheet.set("a", 5)
+    sheet.set("b", 10)
+    assert sheet.get("b") == Decimal(10)
+    assert sheet.get("c") == Decimal(11)
+    assert sheet.dirty() == []
+
+def test_reading_a_referenced_but_unset_cell():
+    '''A cell that only appears in a formula has no value until it is set'''
+    sheet = Sheet()
+    sheet.define("b", "add", "a", 1)
+    with pytest.raises(SheetError, match="Cell a has no value"):
+        sheet.get("a")
+    with pytest.raises(SheetError, match="has no value"):
+        sheet.get("b")
+    sheet.set("a", 2)
+    assert sheet.get("b") == Decimal(3)
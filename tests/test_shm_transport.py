@@ -0,0 +1,63 @@
+'''Tests for the shared memory batch transport'''
+import io
+import random
+from decimal import Decimal
+import pytest
+from calculator.precision import make_context
+from calculator.shm_transport import SharedMemoryTransport, TransportError
+from calculator.streaming import execute_records, read_records, run_batch
+from main import load_plugins
+
+def lines(count=3000, seed=5):
+    '''Random builtin records plus records only the parent can run'''
+    rng = random.Random(seed)
+    operations = ["add", "subtract", "multiply", "divide"]
+    result = [f"{operations[index % 4]} {rng.uniform(-1e6, 1e6):.4f} {rng.uniform(-1e3, 1e3):.4f}\n"
+              for index in range(count)]
+    result[10:10] = ["divide 1 0\n", "mean 2 4\n", "add x 1\n", "bad line\n", f"add {'9' * 60} 1\n", "power 2 3\n"]
+    return result
+
+def outcomes(results):
+    return [(outcome.record, outcome.result, outcome.error) for outcome in results]
+
+def test_matches_executor_path_across_ring_wraps():
+    '''Small rings wrap many times; results and errors match the executor path in order'''
+    load_plugins()
+    source = lines()
+    with SharedMemoryTransport(workers=2, capacity=64, group_size=16) as transport:
+        shared = outcomes(transport.execute_records(read_records(source)))
+    assert shared == outcomes(execute_records(read_records(source)))
+    assert len(shared) == len(source)
+
+def test_wide_results_fall_back_to_the_parent():
+    '''A result wider than the ring's field is recomputed in the parent'''
+    context = make_context(100)
+    with SharedMemoryTransport(workers=1, context=context) as transport:
+        [outcome] = transport.execute_records(read_records(["divide 1 3"]))
+    assert outcome.result == Decimal("0." + "3" * 100)
+
+def test_abandoned_batches_leave_the_transport_usable():
+    '''Closing a generator early drains the rings, so the next batch starts clean'''
+    with SharedMemoryTransport(workers=1, capacity=32, group_size=8) as transport:
+        partial = transport.execute_records(read_records(lines(500)))
+        next(partial)
+        partial.close()
+        output = io.StringIO()
+        stats = run_batch(["add 1 2", "multiply 2 3"], output, transport=transport)
+    assert output.getvalue() == "add 1 2 = 3\nmultiply 2 3 = 6\n"
+    assert stats.records == 2
+
+def test_dead_workers_and_closed_transports_raise():
+    '''Waiting on a dead worker raises instead of hanging'''
+    transport = SharedMemoryTransport(workers=1, poll_interval=0.05)
+    try:
+        transport._rings[0].process.kill()  # pylint: disable=protected-access
+        transport._rings[0].process.join()  # pylint: disable=protected-access
+        with pytest.raises(TransportError, match="exited"):
+            list(transport.execute_records(read_records(["add 1 2"])))
+    finally:
+        transport.close()
+    with pytest.raises(TransportError, match="closed"):
+        list(transport.execute_records(read_records(["add 1 2"])))
+    with pytest.raises(ValueError, match="Invalid ring sizes"):
+        SharedMemoryTransport(capacity=4, group_size=8)
@@ -0,0 +1,105 @@
+'''Tests for the buffered output sinks'''
+import csv
+import io
+import json
+from decimal import Decimal
+import pytest
+from calculator.calculation import Calculation
+from calculator.calculations import calculations
+from calculator.operations import add, divide
+from calculator.sinks import ColumnarSink, Row, TextSink, open_sink, read_columnar
+from calculator.streaming import run_batch
+
+ROWS = [
+    Row("add", "1", "2", Decimal("3"), None),
+    Row("divide", "1", "0", None, "Cannot divide by zero"),
+    Row("bad", None, None, None, "Invalid input format. Use: <operation> <num1> <num2>"),
+    Row("multiply", "1.5", "-2", Decimal("-3.0"), None),
+]
+
+class CountingStream(io.StringIO):
+    '''Counts write() calls'''
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+def test_writes_once_per_chunk():
+    '''Rows are buffered and written one chunk per write() call'''
+    stream = CountingStream()
+    with TextSink(stream, chunk_size=100) as sink:
+        for index in range(250):
+            sink.write("add", index, 1, Decimal(index + 1))
+        assert stream.writes == 2
+    assert stream.writes == 3 and sink.rows == 250
+    assert stream.getvalue().splitlines()[-1] == "add 249 1 = 250"
+
+def test_csv_round_trip():
+    '''CSV has a header, and missing values are empty fields'''
+    stream = io.StringIO()
+    with open_sink("csv", stream, chunk_size=3) as sink:
+        sink.write_rows(ROWS)
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [row["result"] for row in rows] == ["3", "", "", "-3.0"]
+    assert rows[1]["error"] == "Cannot divide by zero"
+
+def test_jsonl_keeps_numbers_exact():
+    '''Numbers are JSON strings, errors and missing values are null'''
+    stream = io.StringIO()
+    with open_sink("jsonl", stream) as sink:
+        sink.write("divide", Decimal("1"), Decimal("3"), Decimal("0.3333333333333333333333333333"))
+        sink.write_rows(ROWS[1:3])
+    documents = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert documents[0]["result"] == "0.3333333333333333333333333333" and documents[0]["error"] is None
+    assert documents[2] == {"operation": "bad", "a": None, "b": None, "result": None, "error": ROWS[2].error}
+
+def test_columnar_round_trip_across_chunks():
+    '''The binary format reads back every value, including nulls and non-ASCII text'''
+    stream = io.BytesIO()
+    rows = ROWS * 5 + [Row("add", "1", "2", None, "Résultat invalide")]
+    with ColumnarSink(stream, chunk_size=7) as sink:
+        sink.write_rows(rows)
+    stream.seek(0)
+    expected = [Row(*(None if value is None else str(value) for value in row)) for row in rows]
+    assert list(read_columnar(stream)) == expected
+
+def test_columnar_is_more_compact_than_jsonl():
+    '''Dictionary-encoded operations and offset arrays beat per-line JSON'''
+    rows = [Row("add", str(index), "1", str(index + 1), None) for index in range(1000)]
+    binary, text = io.BytesIO(), io.StringIO()
+    for sink in (ColumnarSink(binary), open_sink("jsonl", text)):
+        with sink:
+            sink.write_rows(rows)
+    assert len(binary.getvalue()) * 2 < len(text.getvalue())
+
+def test_columnar_rejects_foreign_and_truncated_streams():
+    '''Only complete columnar streams are accepted'''
+    with pytest.raises(ValueError):
+        list(read_columnar(io.BytesIO(b"not columnar")))
+    stream = io.BytesIO()
+    with ColumnarSink(stream) as sink:
+        sink.write_rows(ROWS)
+    with pytest.raises(ValueError):
+        list(read_columnar(io.BytesIO(stream.getvalue()[:-12])))
+
+def test_unknown_format():
+    '''An unknown format is rejected'''
+    with pytest.raises(ValueError):
+        open_sink("xml", io.StringIO())
+
+def test_run_batch_output_formats():
+    '''Batch mode writes through the sink of the requested format'''
+    output = io.StringIO()
+    stats = run_batch(["add 1 2\n", "divide 1 0\n"], output, output_format="jsonl")
+    assert [json.loads(line)["result"] for line in output.getvalue().splitlines()] == ["3", None]
+    assert stats.errors == 1
+
+def test_history_export():
+    '''The history is exported oldest first with each result or error'''
+    calculations.delete_calculation()
+    calculations.add_calculation(Calculation(Decimal("7"), Decimal("2"), add))
+    calculations.add_calculation(Calculation(Decimal("8"), Decimal("0"), divide))
+    stream = io.StringIO()
+    assert calculations.export(open_sink("csv", stream)) == 2
+    assert stream.getvalue() == "operation,a,b,result,error\nadd,7,2,9,\ndivide,8,0,,Error: Cannot divide by zero!\n"
@@ -0,0 +1,58 @@
+'''Startup-time regression tests and typed settings'''
+import os
+import statistics
+import subprocess
+import sys
+import time
+import pytest
+from calculator.settings import Settings, find_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous enough for slow CI machines; a one-shot calculation takes well under 0.1s locally
+STARTUP_BUDGET_SECONDS = 0.5
+DEFERRED_MODULES = ("numpy", "asyncio", "multiprocessing", "dotenv", "logging.config", "concurrent.futures.process")
+
+def run_cli(*extra_args):
+    '''Run a one-shot fast-start calculation and return (seconds, completed process)'''
+    env = {**os.environ, "CALCULATOR_FAST_START": "1"}
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, *extra_args, "main.py", "2", "3", "add"], cwd=ROOT, env=env,
+                               capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, completed
+
+def test_one_shot_calculation_stays_within_budget():
+    '''The median of several one-shot runs stays under the startup budget'''
+    run_cli()  # warm the bytecode cache
+    timings = []
+    for _ in range(3):
+        seconds, completed = run_cli()
+        assert completed.stdout == "The result of 2 add 3 is 5\n"
+        timings.append(seconds)
+    assert statistics.median(timings) < STARTUP_BUDGET_SECONDS
+
+def test_heavy_modules_are_not_imported():
+    '''Inline one-shot calculations never import the pool, async, NumPy, dotenv or logging.config machinery'''
+    _, completed = run_cli("-X", "importtime")
+    imported = {line.split("|")[-1].strip() for line in completed.stderr.splitlines() if "|" in line}
+    assert not imported & set(DEFERRED_MODULES)
+    assert not completed.stdout.startswith("Traceback")
+
+def test_settings_parse_only_known_variables():
+    '''Typed fields, zero meaning unset, and clear errors for bad values'''
+    settings = Settings.from_environ({"CALCULATOR_WORKERS": "0", "CALCULATOR_CACHE": "Yes",
+                                      "CALCULATOR_CACHE_TTL": "2.5", "CALCULATOR_PRECISION": "50",
+                                      "UNRELATED": "ignored"})
+    assert settings.workers is None
+    assert settings.cache is True
+    assert settings.cache_ttl == 2.5
+    assert settings.precision == 50
+    assert settings.log_mode == "sync"
+    with pytest.raises(ValueError, match="CALCULATOR_WORKERS"):
+        Settings.from_environ({"CALCULATOR_WORKERS": "many"})
+
+def test_find_dotenv_walks_up(tmp_path):
+    '''The nearest .env in the directory or its parents is found'''
+    (tmp_path / ".env").write_text("ENVIRONMENT=test\n")
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    assert find_dotenv(str(nested)) == str(tmp_path / ".env")
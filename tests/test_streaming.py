@@ -0,0 +1,45 @@
+'''Tests for the streaming batch pipeline'''
+import io
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from calculator.streaming import execute_records, read_records, run_batch
+from main import load_plugins
+
+load_plugins()
+
+def test_read_records_skips_blank_and_comments():
+    '''Blank lines and comments are skipped; malformed lines are kept'''
+    records = list(read_records(["add 1 2\n", "\n", "# note\n", "oops\n"]))
+    assert [r.line_number for r in records] == [1, 4]
+    assert records[1].a is None
+
+def test_read_records_is_lazy():
+    '''Records are produced on demand from an unbounded source'''
+    def endless():
+        while True:
+            yield "add 1 1\n"
+    records = read_records(endless())
+    assert next(records).operation == "add"
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_execute_records_on_executor(ordered):
+    '''Every record is executed once, in input order when requested'''
+    lines = [f"add {i} 1\n" for i in range(50)]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        outcomes = list(execute_records(read_records(lines), executor, chunk_size=4, window=2, ordered=ordered))
+    results = [o.result for o in outcomes]
+    expected = [Decimal(i + 1) for i in range(50)]
+    assert results == expected if ordered else sorted(results) == expected
+
+def test_run_batch_reports_errors_and_stats():
+    '''Errors are written in line and counted in the returned stats'''
+    output = io.StringIO()
+    stats = run_batch(["add 5 3\n", "divide 1 0\n", "power 2 3\n", "add x 1\n"], output)
+    assert output.getvalue().splitlines() == [
+        "add 5 3 = 8",
+        "divide 1 0 ! Cannot divide by zero",
+        "power 2 3 ! Invalid operation type: power",
+        "add x 1 ! Invalid input: x or 1 is not a valid number.",
+    ]
+    assert stats.records == 4 and stats.errors == 3